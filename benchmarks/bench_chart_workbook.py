@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Chart Workbook Benchmark
+
+Compares the time create_chart spends per chart with each workbook mode
+(element option workbook: embedded, minimal or none) on a deck of charts
+with distinct data.
+
+Usage:
+    python benchmarks/bench_chart_workbook.py [--charts CHARTS] [--points POINTS] [--series SERIES]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+from pptx import Presentation
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.element_factory import ElementFactory
+
+THEME_SETTINGS = {
+    'body_font': 'Calibri',
+    'body_font_size': 18,
+    'text_color': (0, 0, 0),
+    'title_color': (0, 0, 0),
+    'accent_color': (0, 112, 192)
+}
+
+def make_elements(charts, points, series, workbook):
+    """
+    Build chart elements whose data differs from chart to chart.
+    """
+    return [
+        {
+            'chart_type': 'column',
+            'workbook': workbook,
+            'data': {
+                'categories': [f"Item {i + 1}" for i in range(points)],
+                'series': [
+                    {'name': f"Series {s + 1}", 'values': [(c + 1) * (s + 1) * (i + 1) * 0.5 for i in range(points)]}
+                    for s in range(series)
+                ]
+            }
+        }
+        for c in range(charts)
+    ]
+
+def time_it(elements):
+    """
+    Return the mean wall time of create_chart in milliseconds.
+    """
+    factory = ElementFactory()
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    start = time.perf_counter()
+    for element_data in elements:
+        factory.create_chart(slide, None, None, None, None, element_data, THEME_SETTINGS)
+    return (time.perf_counter() - start) * 1000 / len(elements)
+
+def main():
+    """
+    Run the benchmark and print the results.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark chart workbook modes.')
+    parser.add_argument('--charts', type=int, default=100, help='Number of charts')
+    parser.add_argument('--points', type=int, default=12, help='Number of categories per chart')
+    parser.add_argument('--series', type=int, default=3, help='Number of series per chart')
+    args = parser.parse_args()
+    
+    # Warm up imports
+    time_it(make_elements(2, args.points, args.series, 'embedded'))
+    
+    results = {}
+    for workbook in ('embedded', 'minimal', 'none'):
+        results[workbook] = time_it(make_elements(args.charts, args.points, args.series, workbook))
+    
+    print(f"Charts:        {args.charts} x {args.points} points x {args.series} series")
+    for workbook, ms in results.items():
+        print(f"{workbook + ':':<14} {ms:8.2f} ms/chart ({results['embedded'] / ms:5.2f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Configuration Parsing Benchmark
+
+Compares the original double-parse pipeline (validate_yaml_file followed by
+a second yaml.safe_load in the generator) with the single-parse pipeline
+(load_config_file once, then validate_config on the in-memory data).
+
+Usage:
+    python benchmarks/bench_config_parse.py [yaml_file] [-n ITERATIONS]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.utils import load_config_file, YamlLoader
+from src.validators import validate_config, YAML_SCHEMA
+from jsonschema import validate
+
+DEFAULT_INPUT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'examples', 'web_development_presentation.yaml'
+)
+
+def double_parse(file_path):
+    """
+    Parse and validate the way the pipeline originally did: two safe_load calls.
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        validate(instance=yaml.safe_load(f), schema=YAML_SCHEMA)
+    
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+def single_parse(file_path):
+    """
+    Parse once with the fastest loader and validate the in-memory data.
+    """
+    config = load_config_file(file_path)
+    validate_config(config)
+    return config
+
+def time_it(func, file_path, iterations):
+    """
+    Return the mean wall time of func(file_path) in milliseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(file_path)
+    return (time.perf_counter() - start) * 1000 / iterations
+
+def main():
+    """
+    Run the benchmark and print the results.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark YAML configuration parsing.')
+    parser.add_argument('input_file', nargs='?', default=DEFAULT_INPUT, help='YAML file to parse')
+    parser.add_argument('-n', '--iterations', type=int, default=20, help='Number of iterations')
+    args = parser.parse_args()
+    
+    # Warm up imports and caches
+    single_parse(args.input_file)
+    double_parse(args.input_file)
+    
+    before = time_it(double_parse, args.input_file, args.iterations)
+    after = time_it(single_parse, args.input_file, args.iterations)
+    
+    print(f"Input:         {args.input_file}")
+    print(f"Loader:        {YamlLoader.__name__}")
+    print(f"Double parse:  {before:8.2f} ms")
+    print(f"Single parse:  {after:8.2f} ms")
+    print(f"Speedup:       {before / after:8.2f}x")
+
+if __name__ == '__main__':
+    main()
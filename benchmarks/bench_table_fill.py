@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Table Fill Benchmark
+
+Compares the cell-by-cell create_table path with the bulk table writer
+(element option bulk: true) on a table of plain text cells with a header
+row and zebra striping. The bulk writer must produce the same package as
+the cell-by-cell path; the script exits with status 1 if it does not.
+
+Usage:
+    python benchmarks/bench_table_fill.py [--rows ROWS] [--cols COLS] [-n ITERATIONS]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+from pptx import Presentation
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.element_factory import ElementFactory
+from package_diff import report_identity
+
+THEME_SETTINGS = {
+    'body_font': 'Calibri',
+    'body_font_size': 18,
+    'text_color': (0, 0, 0),
+    'accent_color': (0, 112, 192)
+}
+
+def make_element(rows, cols, bulk):
+    """
+    Build a table element with a header row and numeric body cells.
+    """
+    data = [[f"Column {j + 1}" for j in range(cols)]]
+    data.extend([f"${(i + 1) * (j + 1) * 1234:,}" for j in range(cols)] for i in range(rows - 1))
+    return {'data': data, 'style': {'zebra_striping': True}, 'bulk': bulk}
+
+def build_package(element_data):
+    """
+    Build a one-table presentation and return its package.
+    """
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    ElementFactory().create_table(slide, None, None, None, None, element_data, THEME_SETTINGS)
+    return prs.part.package
+
+def time_it(element_data, iterations):
+    """
+    Return the mean wall time of create_table in milliseconds.
+    """
+    factory = ElementFactory()
+    total = 0.0
+    for _ in range(iterations):
+        prs = Presentation()
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        start = time.perf_counter()
+        factory.create_table(slide, None, None, None, None, element_data, THEME_SETTINGS)
+        total += time.perf_counter() - start
+    return total * 1000 / iterations
+
+def main():
+    """
+    Run the benchmark and print the results.
+    
+    Returns:
+        int: 0, or 1 if the bulk writer's output differs.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark table filling.')
+    parser.add_argument('--rows', type=int, default=200, help='Number of table rows')
+    parser.add_argument('--cols', type=int, default=12, help='Number of table columns')
+    parser.add_argument('-n', '--iterations', type=int, default=5, help='Number of iterations')
+    args = parser.parse_args()
+    
+    cells = make_element(args.rows, args.cols, bulk=False)
+    bulk = make_element(args.rows, args.cols, bulk=True)
+    
+    # Warm up imports and caches
+    time_it(cells, 1)
+    time_it(bulk, 1)
+    
+    before = time_it(cells, args.iterations)
+    after = time_it(bulk, args.iterations)
+    
+    print(f"Table:         {args.rows}x{args.cols}")
+    print(f"Cell by cell:  {before:8.2f} ms")
+    print(f"Bulk writer:   {after:8.2f} ms")
+    print(f"Speedup:       {before / after:8.2f}x")
+    
+    return report_identity(build_package(cells), build_package(bulk))
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Text Formatting Benchmark
+
+Compares per-run formatting through python-pptx Font proxies (the original
+format_text_frame) with the cached rPr engine, on the cells of a table
+formatted the way create_table does it (body style on every cell, then the
+header style on the first row). The cached engine must produce the same
+package as the proxies; the script exits with status 1 if it does not.
+
+Usage:
+    python benchmarks/bench_text_format.py [--rows ROWS] [--cols COLS] [-n ITERATIONS]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+from pptx import Presentation
+from pptx.util import Inches, Pt
+from pptx.dml.color import RGBColor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.utils import format_text_frame
+from package_diff import report_identity
+
+BODY_STYLE = {'font': 'Calibri', 'size': 18, 'color': (0, 0, 0)}
+HEADER_STYLE = {'bold': True, 'color': (0, 112, 192)}
+
+def proxy_format_text_frame(text_frame, font=None, size=None, color=None, bold=None,
+                            italic=None, underline=None, alignment=None, line_spacing=None):
+    """
+    Format a text frame the way the pipeline originally did: one proxy
+    assignment per property per run.
+    """
+    if alignment is not None:
+        for paragraph in text_frame.paragraphs:
+            paragraph.alignment = alignment
+    
+    if line_spacing is not None:
+        for paragraph in text_frame.paragraphs:
+            paragraph.line_spacing = line_spacing
+    
+    for paragraph in text_frame.paragraphs:
+        for run in paragraph.runs:
+            if font is not None:
+                run.font.name = font
+            if size is not None:
+                run.font.size = Pt(size)
+            if color is not None:
+                run.font.color.rgb = RGBColor(*color)
+            if bold is not None:
+                run.font.bold = bold
+            if italic is not None:
+                run.font.italic = italic
+            if underline is not None:
+                run.font.underline = underline
+
+def build_table(rows, cols):
+    """
+    Create a slide with an unformatted rows x cols table of text cells.
+    """
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    table = slide.shapes.add_table(rows, cols, Inches(0.5), Inches(0.5), Inches(9), Inches(6)).table
+    
+    for i in range(rows):
+        for j in range(cols):
+            table.cell(i, j).text = f"R{i}C{j}"
+    
+    return table
+
+def format_table(table, formatter):
+    """
+    Apply body and header formatting to every cell, as create_table does.
+    """
+    for i, row in enumerate(table.rows):
+        for cell in row.cells:
+            formatter(cell.text_frame, **BODY_STYLE)
+            if i == 0:
+                formatter(cell.text_frame, **HEADER_STYLE)
+
+def build_package(formatter, rows, cols):
+    """
+    Format a table with a formatter and return the presentation's package.
+    """
+    table = build_table(rows, cols)
+    format_table(table, formatter)
+    return table.part.package
+
+def time_it(formatter, rows, cols, iterations):
+    """
+    Return the mean wall time of formatting a fresh table in milliseconds.
+    """
+    total = 0.0
+    for _ in range(iterations):
+        table = build_table(rows, cols)
+        start = time.perf_counter()
+        format_table(table, formatter)
+        total += time.perf_counter() - start
+    return total * 1000 / iterations
+
+def main():
+    """
+    Run the benchmark and print the results.
+    
+    Returns:
+        int: 0, or 1 if the cached engine's output differs.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark text frame formatting on a table.')
+    parser.add_argument('--rows', type=int, default=50, help='Number of table rows')
+    parser.add_argument('--cols', type=int, default=10, help='Number of table columns')
+    parser.add_argument('-n', '--iterations', type=int, default=20, help='Number of iterations')
+    args = parser.parse_args()
+    
+    # Warm up imports and caches
+    time_it(format_text_frame, args.rows, args.cols, 1)
+    time_it(proxy_format_text_frame, args.rows, args.cols, 1)
+    
+    before = time_it(proxy_format_text_frame, args.rows, args.cols, args.iterations)
+    after = time_it(format_text_frame, args.rows, args.cols, args.iterations)
+    
+    print(f"Table:         {args.rows}x{args.cols}")
+    print(f"Font proxies:  {before:8.2f} ms")
+    print(f"Cached rPr:    {after:8.2f} ms")
+    print(f"Speedup:       {before / after:8.2f}x")
+    
+    return report_identity(
+        build_package(proxy_format_text_frame, args.rows, args.cols),
+        build_package(format_text_frame, args.rows, args.cols)
+    )
+
+if __name__ == '__main__':
+    sys.exit(main())
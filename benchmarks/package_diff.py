@@ -0,0 +1,54 @@
+"""
+Package Comparison
+
+Helpers for benchmarks whose fast path must produce the same package as
+the path it replaces. Presentations are compared part by part rather than
+as saved files, since the ZIP entries of a saved file carry the time they
+were written.
+"""
+
+def package_parts(package):
+    """
+    Get the parts of a package by name.
+    
+    Args:
+        package: The presentation package, e.g. prs.part.package.
+    
+    Returns:
+        dict: Mapping of partname to the part's serialized bytes.
+    """
+    return {str(part.partname): part.blob for part in package.iter_parts()}
+
+def different_parts(expected, actual):
+    """
+    Find the parts that differ between two packages.
+    
+    Args:
+        expected: The package built by the reference path.
+        actual: The package built by the fast path.
+    
+    Returns:
+        list: Sorted names of parts that are missing from either package
+            or whose bytes differ.
+    """
+    expected, actual = package_parts(expected), package_parts(actual)
+    return sorted(name for name in expected.keys() | actual.keys() if expected.get(name) != actual.get(name))
+
+def report_identity(expected, actual):
+    """
+    Print whether two packages are identical.
+    
+    Args:
+        expected: The package built by the reference path.
+        actual: The package built by the fast path.
+    
+    Returns:
+        int: 0 if they are identical, 1 otherwise, for use as an exit status.
+    """
+    different = different_parts(expected, actual)
+    if different:
+        print(f"Output:        MISMATCH in {', '.join(different)}")
+        return 1
+    
+    print("Output:        identical")
+    return 0
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite
+
+Generates synthetic decks of several sizes (see synthetic_deck.py), builds
+each one in a fresh process and records the time spent in every pipeline
+stage (validation, parsing, variable resolution, slide creation, each
+create_* call and saving) together with the peak RSS. Results are compared
+with a stored baseline and the suite exits with status 1 when a metric
+got slower (or bigger) than the baseline by more than the threshold.
+
+Everything runs offline: decks and images are generated locally into a
+work directory. Baselines are machine specific, so record one with
+--update-baseline on the machine that runs the comparison.
+
+Usage:
+    python benchmarks/suite.py [--scenarios small,medium] [--repeats N] [--baseline PATH]
+        [--update-baseline] [--threshold FRACTION] [--rss-threshold FRACTION]
+        [--output PATH] [--workdir DIR]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import tempfile
+import statistics
+import multiprocessing
+from contextlib import nullcontext
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from synthetic_deck import write_deck
+
+# Deck parameters of each scenario
+SCENARIOS = {
+    'small': {
+        'slides': 20, 'table_rows': 10, 'table_cols': 5, 'chart_points': 50, 'images': 4, 'variables': 10
+    },
+    'medium': {
+        'slides': 200, 'table_rows': 30, 'table_cols': 8, 'chart_points': 500, 'images': 10, 'variables': 50
+    },
+    'large': {
+        'slides': 1000, 'table_rows': 50, 'table_cols': 10, 'chart_points': 2000, 'images': 20, 'variables': 200
+    }
+}
+
+# Scenarios run when none are named; 'large' takes minutes and is opt-in
+DEFAULT_SCENARIOS = ('small', 'medium')
+
+# Profiler stages reported by the suite
+STAGES = (
+    'validate', 'parse', 'resolve_variables', 'create_slide',
+    'create_table', 'create_chart', 'create_image', 'save'
+)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Default relative slowdown (and RSS growth) treated as a regression
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_RSS_THRESHOLD = 0.25
+
+# Differences below these are noise, whatever the relative change
+MIN_DELTA_SECONDS = 0.005
+MIN_DELTA_RSS = 8 * 1024 * 1024
+
+def run_once(deck_path, output_path):
+    """
+    Build a deck once with profiling enabled.
+    
+    Runs in a fresh process, so caches and the peak RSS start from scratch.
+    
+    Args:
+        deck_path (str): Path of the YAML deck.
+        output_path (str): Path of the presentation to write.
+    
+    Returns:
+        dict: Seconds per stage plus 'total' and 'peak_rss' (bytes).
+    """
+    from src.profiling import Profiler, stage
+    from src.validators import validate_yaml_file
+    from src.utils import load_config_file
+    from src.ppt_generator import PresentationGenerator
+    
+    # Relative image paths resolve against the deck's directory
+    os.chdir(os.path.dirname(deck_path))
+    
+    profiler = Profiler(trace_memory=False).start()
+    start = time.perf_counter()
+    
+    with stage('validate'):
+        result = validate_yaml_file(deck_path)
+    if not result['valid']:
+        raise RuntimeError(f"Synthetic deck failed validation: {result['errors']}")
+    
+    with stage('parse'):
+        config = load_config_file(deck_path)
+    
+    if not PresentationGenerator().generate_from_config(config, output_path):
+        raise RuntimeError("Synthetic deck failed to generate")
+    
+    total = time.perf_counter() - start
+    profiler.stop()
+    
+    stages = {entry['stage']: entry['seconds'] for entry in profiler.report()['stages']}
+    metrics = {name: stages.get(name, 0.0) for name in STAGES}
+    metrics['total'] = total
+    
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    metrics['peak_rss'] = rss if sys.platform == 'darwin' else rss * 1024
+    return metrics
+
+def run_scenario(name, params, workdir, repeats):
+    """
+    Generate a scenario's deck and build it 'repeats' times.
+    
+    Args:
+        name (str): Scenario name.
+        params (dict): Deck parameters.
+        workdir (str): Directory for the deck, its images and the output.
+        repeats (int): Number of builds, each in a fresh process.
+    
+    Returns:
+        dict: Median of every metric over the builds.
+    """
+    scenario_dir = os.path.join(workdir, name)
+    os.makedirs(scenario_dir, exist_ok=True)
+    deck_path = write_deck(params, os.path.join(scenario_dir, 'deck.yaml'))
+    output_path = os.path.join(scenario_dir, 'deck.pptx')
+    
+    runs = []
+    context = multiprocessing.get_context('spawn')
+    for _ in range(repeats):
+        with context.Pool(1) as pool:
+            runs.append(pool.apply(run_once, (deck_path, output_path)))
+    
+    metrics = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+    metrics['output_bytes'] = os.path.getsize(output_path)
+    return metrics
+
+def compare(results, baseline, threshold, rss_threshold):
+    """
+    Compare results with a baseline.
+    
+    Args:
+        results (dict): Scenario results, as written by the suite.
+        baseline (dict): Baseline, in the same format.
+        threshold (float): Relative slowdown treated as a regression.
+        rss_threshold (float): Relative peak RSS growth treated as a regression.
+    
+    Returns:
+        tuple: (regressions, warnings), lists of messages.
+    """
+    regressions = []
+    warnings = []
+    
+    for name, result in results['scenarios'].items():
+        base = baseline.get('scenarios', {}).get(name)
+        if base is None:
+            warnings.append(f"{name}: not in the baseline")
+            continue
+        
+        if base['params'] != result['params']:
+            warnings.append(f"{name}: deck parameters differ from the baseline, not compared")
+            continue
+        
+        for key, value in result['metrics'].items():
+            old = base['metrics'].get(key)
+            if not old or key == 'output_bytes':
+                continue
+            
+            if key == 'peak_rss':
+                limit, min_delta = rss_threshold, MIN_DELTA_RSS
+            else:
+                limit, min_delta = threshold, MIN_DELTA_SECONDS
+            
+            change = (value - old) / old
+            if change > limit and value - old > min_delta:
+                regressions.append(
+                    f"{name}.{key}: {format_metric(key, old)} -> {format_metric(key, value)} "
+                    f"(+{change:.0%}, threshold {limit:.0%})"
+                )
+    
+    return regressions, warnings
+
+def format_metric(key, value):
+    """
+    Format a metric value for the report.
+    """
+    if key in ('peak_rss', 'output_bytes'):
+        return f"{value / (1024 * 1024):.1f} MB"
+    return f"{value * 1000:.1f} ms"
+
+def format_results(results, baseline=None):
+    """
+    Format the results (and the baseline values, if any) as a text table.
+    """
+    lines = []
+    for name, result in results['scenarios'].items():
+        base = (baseline or {}).get('scenarios', {}).get(name, {}).get('metrics', {})
+        lines.append(f"{name} ({', '.join(f'{k}={v}' for k, v in result['params'].items())})")
+        lines.append(f"  {'Metric':<20} {'Current':>12} {'Baseline':>12} {'Change':>8}")
+        
+        for key, value in result['metrics'].items():
+            old = base.get(key)
+            change = f"{(value - old) / old:+.0%}" if old else ''
+            old_text = format_metric(key, old) if old is not None else '-'
+            lines.append(f"  {key:<20} {format_metric(key, value):>12} {old_text:>12} {change:>8}")
+        
+        lines.append("")
+    
+    return '\n'.join(lines)
+
+def main():
+    """
+    Run the benchmark suite and compare it with the baseline.
+    """
+    parser = argparse.ArgumentParser(description='Run the synthetic deck benchmark suite.')
+    parser.add_argument('--scenarios', default=','.join(DEFAULT_SCENARIOS),
+                        help=f"Comma-separated scenarios to run ({', '.join(SCENARIOS)})")
+    parser.add_argument('--repeats', type=int, default=3, help='Builds per scenario; the median is reported')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline JSON file')
+    parser.add_argument('--update-baseline', action='store_true', help='Write the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Relative slowdown treated as a regression (default: 0.25)')
+    parser.add_argument('--rss-threshold', type=float, default=DEFAULT_RSS_THRESHOLD,
+                        help='Relative peak RSS growth treated as a regression (default: 0.25)')
+    parser.add_argument('--output', help='Also write the results to this JSON file')
+    parser.add_argument('--workdir', help='Directory for generated decks (default: a temporary directory)')
+    args = parser.parse_args()
+    
+    names = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(unknown)}")
+    
+    # Generated decks and outputs are removed afterwards unless --workdir is given
+    if args.workdir:
+        workdir_context = nullcontext(args.workdir)
+    else:
+        workdir_context = tempfile.TemporaryDirectory(prefix='pptx-bench-')
+    
+    results = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeats': args.repeats,
+        'scenarios': {}
+    }
+    
+    with workdir_context as workdir:
+        for name in names:
+            print(f"Running {name}...", file=sys.stderr)
+            metrics = run_scenario(name, SCENARIOS[name], workdir, args.repeats)
+            results['scenarios'][name] = {'params': SCENARIOS[name], 'metrics': metrics}
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding='utf-8') as f:
+                baseline = json.load(f)
+        
+        # Keep baselines of scenarios that were not run this time
+        results['scenarios'] = dict(baseline.get('scenarios', {}), **results['scenarios'])
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+        
+        print(format_results(results))
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    
+    if not os.path.exists(args.baseline):
+        print(format_results(results))
+        print(f"No baseline at {args.baseline}; run with --update-baseline to record one")
+        return 0
+    
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    
+    print(format_results(results, baseline))
+    regressions, warnings = compare(results, baseline, args.threshold, args.rss_threshold)
+    
+    for message in warnings:
+        print(f"WARNING: {message}")
+    
+    if regressions:
+        print(f"{len(regressions)} regression(s):")
+        for message in regressions:
+            print(f"  {message}")
+        return 1
+    
+    print("No regressions")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
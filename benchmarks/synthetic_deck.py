@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Synthetic Deck Generator
+
+Builds YAML decks of a given size and mix for benchmarking: N slides
+cycling through text, table, chart and image slides, tables of R x C
+cells, line charts with P points, a set of generated images and V
+variables referenced from slide text. Everything is generated locally and
+deterministically from a seed, so runs are reproducible and need no
+network access.
+
+Usage:
+    python benchmarks/synthetic_deck.py -o deck.yaml [--slides N] [--rows R] [--cols C]
+        [--points P] [--images I] [--variables V] [--seed SEED]
+"""
+
+import os
+import sys
+import random
+import argparse
+
+import yaml
+from PIL import Image
+
+# Default deck parameters
+DEFAULT_PARAMS = {
+    'slides': 50,
+    'table_rows': 20,
+    'table_cols': 6,
+    'chart_points': 200,
+    'images': 5,
+    'variables': 20,
+    'mix': {'text': 4, 'table': 2, 'chart': 2, 'image': 1},
+    'seed': 1
+}
+
+# Pixel size of generated images
+IMAGE_SIZE = (1600, 1200)
+
+def make_images(directory, count, seed):
+    """
+    Write photo-like PNG images with smooth gradients and noise.
+    """
+    rng = random.Random(seed)
+    paths = []
+    os.makedirs(directory, exist_ok=True)
+    
+    for i in range(count):
+        path = os.path.join(directory, f"image_{i + 1}.png")
+        if not os.path.exists(path):
+            base = Image.linear_gradient('L').resize(IMAGE_SIZE).rotate(rng.randrange(360))
+            noise = Image.effect_noise(IMAGE_SIZE, 40 + i)
+            color = tuple(rng.randrange(256) for _ in range(3))
+            img = Image.merge('RGB', (base, noise, Image.new('L', IMAGE_SIZE, color[2])))
+            img.save(path)
+        paths.append(path)
+    
+    return paths
+
+def make_deck(params, image_dir):
+    """
+    Build a deck configuration for the given parameters.
+    
+    Args:
+        params (dict): Deck parameters, see DEFAULT_PARAMS.
+        image_dir (str): Directory for the generated images.
+    
+    Returns:
+        dict: The deck configuration.
+    """
+    params = dict(DEFAULT_PARAMS, **params)
+    rng = random.Random(params['seed'])
+    
+    variables = {f"var_{i}": f"Value {i}" for i in range(params['variables'])}
+    images = make_images(image_dir, params['images'], params['seed'])
+    
+    # Slide kinds in the requested proportions, cycled through the deck
+    kinds = [kind for kind, weight in params['mix'].items() for _ in range(weight)]
+    if not images:
+        kinds = [kind for kind in kinds if kind != 'image'] or ['text']
+    
+    def ref():
+        return f"{{{{var_{rng.randrange(params['variables'])}}}}}" if params['variables'] else ""
+    
+    slides = [{'type': 'title', 'title': f"Synthetic Deck {ref()}", 'subtitle': f"{params['slides']} slides"}]
+    
+    for i in range(1, params['slides']):
+        kind = kinds[i % len(kinds)]
+        title = f"Slide {i + 1}: {kind} {ref()}"
+        
+        if kind == 'text':
+            slides.append({
+                'type': 'title_and_content',
+                'title': title,
+                'content': [f"Point {j + 1} about {ref()} and more text" for j in range(5)]
+            })
+        
+        elif kind == 'table':
+            header = [f"Column {c + 1}" for c in range(params['table_cols'])]
+            rows = [
+                [f"{rng.randrange(100000):,}" for _ in range(params['table_cols'])]
+                for _ in range(params['table_rows'] - 1)
+            ]
+            slides.append({
+                'type': 'title_only',
+                'title': title,
+                'elements': [{
+                    'type': 'table', 'left': 0.5, 'top': 1.5, 'width': 9, 'height': 5,
+                    'data': [header] + rows, 'style': {'zebra_striping': True}
+                }]
+            })
+        
+        elif kind == 'chart':
+            value = 100.0
+            values = []
+            for _ in range(params['chart_points']):
+                value += rng.uniform(-5, 5)
+                values.append(round(value, 2))
+            slides.append({
+                'type': 'title_only',
+                'title': title,
+                'elements': [{
+                    'type': 'chart', 'chart_type': 'line', 'left': 0.5, 'top': 1.5, 'width': 9, 'height': 5,
+                    'data': {
+                        'categories': [f"P{p + 1}" for p in range(params['chart_points'])],
+                        'series': [{'name': 'Series 1', 'values': values}]
+                    }
+                }]
+            })
+        
+        else:
+            slides.append({
+                'type': 'title_only',
+                'title': title,
+                'elements': [{
+                    'type': 'image', 'path': images[i % len(images)], 'left': 1, 'top': 1.5, 'width': 6
+                }]
+            })
+    
+    return {
+        'presentation': {'title': 'Synthetic Deck'},
+        'variables': variables,
+        'slides': slides
+    }
+
+def write_deck(params, output_path):
+    """
+    Write a synthetic deck (and its images) to disk.
+    
+    Images go into an 'images' directory next to the YAML file.
+    
+    Args:
+        params (dict): Deck parameters, see DEFAULT_PARAMS.
+        output_path (str): Path of the YAML file to write.
+    
+    Returns:
+        str: output_path.
+    """
+    image_dir = os.path.join(os.path.dirname(os.path.abspath(output_path)), 'images')
+    config = make_deck(params, image_dir)
+    
+    with open(output_path, 'w', encoding='utf-8') as f:
+        yaml.safe_dump(config, f, sort_keys=False, width=1000)
+    
+    return output_path
+
+def main():
+    """
+    Write a synthetic deck from command line parameters.
+    """
+    parser = argparse.ArgumentParser(description='Generate a synthetic deck for benchmarking.')
+    parser.add_argument('-o', '--output', required=True, help='Path of the YAML file to write')
+    parser.add_argument('--slides', type=int, default=DEFAULT_PARAMS['slides'], help='Number of slides')
+    parser.add_argument('--rows', type=int, default=DEFAULT_PARAMS['table_rows'], help='Table rows')
+    parser.add_argument('--cols', type=int, default=DEFAULT_PARAMS['table_cols'], help='Table columns')
+    parser.add_argument('--points', type=int, default=DEFAULT_PARAMS['chart_points'], help='Chart points')
+    parser.add_argument('--images', type=int, default=DEFAULT_PARAMS['images'], help='Number of distinct images')
+    parser.add_argument('--variables', type=int, default=DEFAULT_PARAMS['variables'], help='Number of variables')
+    parser.add_argument('--seed', type=int, default=DEFAULT_PARAMS['seed'], help='Random seed')
+    args = parser.parse_args()
+    
+    write_deck({
+        'slides': args.slides,
+        'table_rows': args.rows,
+        'table_cols': args.cols,
+        'chart_points': args.points,
+        'images': args.images,
+        'variables': args.variables,
+        'seed': args.seed
+    }, args.output)
+    print(f"Wrote {args.output}")
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,13 +8,32 @@ YAML configuration files with comprehensive customization options.
 
 import os
 import sys
+import json
+import time
 import argparse
 import logging
 from datetime import datetime
 
+# With --client, hand the job to a running daemon before the imports below,
+# whose cost is what the daemon saves; without one, build in-process
+no_daemon = False
+if __name__ == "__main__" and '--client' in sys.argv[1:]:
+    from src.client import run_client, runs_locally, split_client_args
+    client_status = run_client(sys.argv[1:])
+    if client_status is not None:
+        sys.exit(client_status)
+    no_daemon = not runs_locally(split_client_args(sys.argv[1:])[0])
+
+import yaml
+
 # Import project modules
 from src.ppt_generator import PresentationGenerator
-from src.validators import validate_yaml_file
+from src.validators import validate_config, validate_yaml_stream
+from src.utils import load_config_file, resolve_variables
+from src.incremental import referenced_files
+from src.package_writer import DEFAULT_COMPRESSION_LEVEL, DEFAULT_THREADS
+from src import profiling
+from src.profiling import Profiler, DEFAULT_TOP_SLIDES, format_report
 
 # Configure logging
 logging.basicConfig(
@@ -23,15 +42,21 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def parse_args():
+def parse_args(argv=None):
     """
     Parse command line arguments.
     
+    Args:
+        argv (list, optional): Arguments to parse. Defaults to sys.argv[1:].
+    
     Returns:
         argparse.Namespace: Parsed arguments.
     """
     parser = argparse.ArgumentParser(
-        description='Generate PowerPoint presentations from YAML configuration files.'
+        description='Generate PowerPoint presentations from YAML configuration files.',
+        epilog='Use "%(prog)s batch --help" to render many files in one run, '
+               '"%(prog)s serve --help" to keep a generation daemon running, '
+               'and "%(prog)s http --help" to serve rendering over HTTP.'
     )
     
     parser.add_argument(
@@ -55,20 +80,605 @@ def parse_args():
         help='Only validate the YAML file without generating the presentation'
     )
     
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Read and build slides one at a time to keep memory flat for very large files'
+    )
+    
+    parser.add_argument(
+        '-j', '--workers',
+        type=int,
+        default=1,
+        help='Render chunks of slides in this many worker processes (default: 1)'
+    )
+    
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only re-render slides that changed since the last build of the output file (requires --output)'
+    )
+    
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Rebuild incrementally whenever the input, the template or a referenced file changes'
+    )
+    
+    parser.add_argument(
+        '--watch-polling',
+        action='store_true',
+        help='Poll for changes in watch mode instead of using inotify'
+    )
+    
+    parser.add_argument(
+        '--optimize-images',
+        action='store_true',
+        default=None,
+        help='Downsample and re-encode oversized images to fit their frames'
+    )
+    
+    parser.add_argument(
+        '--image-dpi',
+        type=int,
+        help='Target resolution for optimized images (default: 150)'
+    )
+    
+    parser.add_argument(
+        '--compression-level',
+        type=int,
+        choices=range(10),
+        metavar='0-9',
+        help=f'zlib compression level for the .pptx package; 0 stores every part (default: {DEFAULT_COMPRESSION_LEVEL})'
+    )
+    
+    parser.add_argument(
+        '--save-threads',
+        type=int,
+        metavar='N',
+        help=f'Threads compressing package parts when saving (default: {DEFAULT_THREADS})'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Print a per-stage, per-slide-type and slowest-slide timing and allocation report'
+    )
+    
+    parser.add_argument(
+        '--profile-json',
+        metavar='PATH',
+        help='Write the profiling report as JSON to PATH (implies --profile)'
+    )
+    
+    parser.add_argument(
+        '--profile-pstats',
+        metavar='PATH',
+        help='Also run cProfile and dump its statistics to PATH (implies --profile)'
+    )
+    
+    parser.add_argument(
+        '--profile-top',
+        type=int,
+        default=DEFAULT_TOP_SLIDES,
+        metavar='N',
+        help=f'Number of slowest slides to list in the profiling report (default: {DEFAULT_TOP_SLIDES})'
+    )
+    
+    parser.add_argument(
+        '--profile-no-memory',
+        action='store_true',
+        help='Skip tracemalloc allocation counting, which slows generation down'
+    )
+    
+    parser.add_argument(
+        '--client',
+        action='store_true',
+        help='Run on the generation daemon (see "serve") if one is running, else in-process'
+    )
+    
+    parser.add_argument(
+        '--socket',
+        metavar='PATH',
+        help='Socket of the generation daemon for --client'
+    )
+    
+    parser.add_argument(
+        '-v', '--verbose',
+        action='store_true',
+        help='Enable verbose logging'
+    )
+    
+    args = parser.parse_args(argv)
+    
+    if args.incremental and args.stream:
+        parser.error('--incremental cannot be combined with --stream')
+    
+    if args.watch and (args.stream or args.validate_only):
+        parser.error('--watch cannot be combined with --stream or --validate-only')
+    
+    if args.save_threads is not None and args.save_threads < 1:
+        parser.error('--save-threads must be at least 1')
+    
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
+    
+    if args.workers > 1 and (args.stream or args.incremental or args.watch):
+        parser.error('--workers cannot be combined with --stream, --incremental or --watch')
+    
+    if args.incremental and not args.output:
+        parser.error('--incremental requires --output, so the previous build can be found')
+    
+    return args
+
+def parse_batch_args(argv):
+    """
+    Parse command line arguments for the batch subcommand.
+    
+    Args:
+        argv (list): Arguments following the 'batch' keyword.
+    
+    Returns:
+        argparse.Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        prog='main.py batch',
+        description='Generate many PowerPoint presentations using a shared pool of worker processes.'
+    )
+    
+    parser.add_argument(
+        'sources',
+        nargs='+',
+        help='Input directories, glob patterns, YAML files or manifest files (one input per line)'
+    )
+    
+    parser.add_argument(
+        '-o', '--output-dir',
+        help='Directory to save the generated PowerPoint files (defaults to each input\'s directory)'
+    )
+    
+    parser.add_argument(
+        '-t', '--template',
+        help='Path to a PowerPoint template file to use as a base'
+    )
+    
+    parser.add_argument(
+        '-j', '--workers',
+        type=int,
+        help='Number of worker processes (defaults to the number of CPUs)'
+    )
+    
+    parser.add_argument(
+        '--report',
+        help='Path to write a JSON report with per-deck results and the run summary'
+    )
+    
+    parser.add_argument(
+        '--optimize-images',
+        action='store_true',
+        default=None,
+        help='Downsample and re-encode oversized images to fit their frames'
+    )
+    
+    parser.add_argument(
+        '--image-dpi',
+        type=int,
+        help='Target resolution for optimized images (default: 150)'
+    )
+    
+    parser.add_argument(
+        '-v', '--verbose',
+        action='store_true',
+        help='Enable verbose logging'
+    )
+    
+    return parser.parse_args(argv)
+
+def parse_serve_args(argv):
+    """
+    Parse command line arguments for the serve subcommand.
+    
+    Args:
+        argv (list): Arguments following the 'serve' keyword.
+    
+    Returns:
+        argparse.Namespace: Parsed arguments.
+    """
+    from src.client import SOCKET_ENV
+    from src.server import DEFAULT_MAX_JOBS
+    
+    parser = argparse.ArgumentParser(
+        prog='main.py serve',
+        description='Run a generation daemon that "main.py --client" hands jobs to.'
+    )
+    
+    parser.add_argument(
+        '--socket',
+        metavar='PATH',
+        help=f'Path of the Unix domain socket (default: ${SOCKET_ENV} or a per-user socket in the temporary directory)'
+    )
+    
+    parser.add_argument(
+        '-j', '--workers',
+        type=int,
+        help='Number of worker processes (defaults to the number of CPUs)'
+    )
+    
+    parser.add_argument(
+        '-t', '--template',
+        action='append',
+        default=[],
+        help='Template to load before forking the workers (may be repeated)'
+    )
+    
+    parser.add_argument(
+        '--max-jobs',
+        type=int,
+        default=DEFAULT_MAX_JOBS,
+        help=f'Jobs per worker before it is replaced, 0 for no limit (default: {DEFAULT_MAX_JOBS})'
+    )
+    
+    parser.add_argument(
+        '-v', '--verbose',
+        action='store_true',
+        help='Enable verbose logging'
+    )
+    
+    return parser.parse_args(argv)
+
+def serve_main(argv):
+    """
+    Run the serve subcommand.
+    
+    Args:
+        argv (list): Arguments following the 'serve' keyword.
+    
+    Returns:
+        int: Process exit code.
+    """
+    from src.server import serve
+    
+    args = parse_serve_args(argv)
+    
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+    
+    return serve(
+        main,
+        socket_path=args.socket,
+        workers=args.workers,
+        max_jobs=args.max_jobs,
+        templates=args.template
+    )
+
+def parse_http_args(argv):
+    """
+    Parse command line arguments for the http subcommand.
+    
+    Args:
+        argv (list): Arguments following the 'http' keyword.
+    
+    Returns:
+        argparse.Namespace: Parsed arguments.
+    """
+    from src.http_service import DEFAULT_MAX_QUEUE, DEFAULT_MAX_BODY
+    
+    parser = argparse.ArgumentParser(
+        prog='main.py http',
+        description='Serve presentation rendering over HTTP (POST a YAML or JSON deck to /render).'
+    )
+    
+    parser.add_argument(
+        '--host',
+        default='127.0.0.1',
+        help='Address to listen on (default: 127.0.0.1)'
+    )
+    
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=8080,
+        help='Port to listen on (default: 8080)'
+    )
+    
+    parser.add_argument(
+        '-j', '--workers',
+        type=int,
+        help='Number of rendering processes (defaults to the number of CPUs)'
+    )
+    
+    parser.add_argument(
+        '--max-queue',
+        type=int,
+        default=DEFAULT_MAX_QUEUE,
+        help=f'Requests that may wait for a free worker before new ones get 429 (default: {DEFAULT_MAX_QUEUE})'
+    )
+    
+    parser.add_argument(
+        '--max-body',
+        type=int,
+        default=DEFAULT_MAX_BODY // (1024 * 1024),
+        metavar='MB',
+        help=f'Largest accepted deck spec in MB (default: {DEFAULT_MAX_BODY // (1024 * 1024)})'
+    )
+    
+    parser.add_argument(
+        '-t', '--template',
+        help='Path to a PowerPoint template file every deck is built on'
+    )
+    
+    parser.add_argument(
+        '--files-root',
+        metavar='DIR',
+        help='Directory decks may read images and data sources from (default: decks cannot refer to files)'
+    )
+    
+    parser.add_argument(
+        '--optimize-images',
+        action='store_true',
+        default=None,
+        help='Downsample and re-encode oversized images to fit their frames'
+    )
+    
+    parser.add_argument(
+        '--image-dpi',
+        type=int,
+        help='Target resolution for optimized images (default: 150)'
+    )
+    
     parser.add_argument(
         '-v', '--verbose',
         action='store_true',
         help='Enable verbose logging'
     )
     
-    return parser.parse_args()
+    args = parser.parse_args(argv)
+    
+    if args.workers is not None and args.workers < 1:
+        parser.error('--workers must be at least 1')
+    
+    if args.max_queue < 0:
+        parser.error('--max-queue cannot be negative')
+    
+    if args.max_body < 1:
+        parser.error('--max-body must be at least 1')
+    
+    return args
+
+def http_main(argv):
+    """
+    Run the http subcommand.
+    
+    Args:
+        argv (list): Arguments following the 'http' keyword.
+    
+    Returns:
+        int: Process exit code.
+    """
+    from src.http_service import run_service
+    
+    args = parse_http_args(argv)
+    
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+    
+    return run_service(
+        args.host,
+        args.port,
+        workers=args.workers,
+        max_queue=args.max_queue,
+        max_body=args.max_body * 1024 * 1024,
+        template_path=args.template,
+        image_options=image_options(args),
+        files_root=args.files_root
+    )
+
+def batch_main(argv):
+    """
+    Run the batch subcommand.
+    
+    Args:
+        argv (list): Arguments following the 'batch' keyword.
+    
+    Returns:
+        int: Process exit code.
+    """
+    from src.batch import collect_batch_jobs, run_batch
+    
+    args = parse_batch_args(argv)
+    
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+    
+    jobs = collect_batch_jobs(args.sources, args.output_dir)
+    if not jobs:
+        logger.error("No input files found")
+        return 1
+    
+    summary = run_batch(
+        jobs,
+        template_path=args.template,
+        workers=args.workers,
+        image_options=image_options(args)
+    )
+    
+    logger.info(
+        f"Batch complete: {summary['succeeded']} succeeded, {summary['failed']} failed "
+        f"in {summary['elapsed']:.2f}s ({summary['throughput']:.2f} decks/sec)"
+    )
+    
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        logger.info(f"Batch report written to {args.report}")
+    
+    return 0 if summary['failed'] == 0 else 1
+
+def image_options(args):
+    """
+    Collect the image optimization options given on the command line.
+    
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+    
+    Returns:
+        dict: Options for PresentationGenerator; unset options are None.
+    """
+    return {'optimize': args.optimize_images, 'dpi': args.image_dpi}
+
+def package_options(args):
+    """
+    Collect the package writing options given on the command line.
+    
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+    
+    Returns:
+        dict: Options for PresentationGenerator; unset options are None.
+    """
+    return {'level': args.compression_level, 'threads': args.save_threads}
+
+def start_profiler(args):
+    """
+    Start a profiler if profiling was requested on the command line.
+    
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+    
+    Returns:
+        Profiler: The running profiler, or None.
+    """
+    if not (args.profile or args.profile_json or args.profile_pstats):
+        return None
+    
+    return Profiler(trace_memory=not args.profile_no_memory, pstats_path=args.profile_pstats).start()
+
+def report_profile(profiler, args):
+    """
+    Stop a profiler and print (and optionally save) its report.
+    
+    Args:
+        profiler (Profiler): The running profiler.
+        args (argparse.Namespace): Parsed command line arguments.
+    """
+    profiler.stop()
+    report = profiler.report(top=args.profile_top)
+    
+    sys.stderr.write(format_report(report) + '\n')
+    
+    if args.profile_json:
+        with open(args.profile_json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Profiling report written to {args.profile_json}")
+
+def run_streaming(args):
+    """
+    Validate and generate a presentation in streaming mode.
+    
+    Slides are validated as they are read, so the file is only parsed once
+    and never held in memory as a whole.
+    
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+    
+    Returns:
+        int: Process exit code.
+    """
+    if args.validate_only:
+        logger.info(f"Validating YAML file: {args.input_file}")
+        with profiling.stage('validate'):
+            validation_result = validate_yaml_stream(args.input_file)
+        
+        if not validation_result['valid']:
+            logger.error(f"YAML validation failed: {validation_result['errors']}")
+            return 1
+        
+        logger.info("YAML validation successful")
+        return 0
+    
+    with profiling.stage('load_template'):
+        generator = PresentationGenerator(
+            template_path=args.template,
+            image_options=image_options(args),
+            package_options=package_options(args)
+        )
+    
+    logger.info(f"Generating PowerPoint presentation (streaming): {args.output}")
+    success = generator.generate_from_stream(args.input_file, args.output)
+    
+    if success:
+        logger.info(f"Successfully generated presentation: {args.output}")
+        return 0
+    else:
+        logger.error("Failed to generate presentation")
+        return 1
 
-def main():
+def run_watch(args):
+    """
+    Build the presentation, then rebuild it incrementally on every change.
+    
+    Everything stays loaded between builds: the compiled validator, the
+    parsed template, cached images and the variable resolver.
+    
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+    
+    Returns:
+        int: Process exit code.
+    """
+    from src.watcher import watch, create_watcher
+    
+    watched = {args.input_file}
+    if args.template:
+        watched.add(args.template)
+    
+    def build():
+        start = time.perf_counter()
+        try:
+            config = load_config_file(args.input_file)
+        except (OSError, yaml.YAMLError) as e:
+            logger.error(f"Cannot read {args.input_file}: {e}")
+            return watched
+        
+        validation_result = validate_config(config)
+        if not validation_result['valid']:
+            logger.error(f"YAML validation failed: {validation_result['errors']}")
+            return watched
+        
+        generator = PresentationGenerator(
+            template_path=args.template,
+            image_options=image_options(args),
+            package_options=package_options(args)
+        )
+        if generator.generate_incremental(config, args.output):
+            logger.info(f"Built {args.output} in {(time.perf_counter() - start) * 1000:.0f} ms")
+        
+        slides = resolve_variables(config.get('slides', []), config.get('variables', {}))
+        return watched | set(referenced_files(slides))
+    
+    logger.info(f"Watching {args.input_file} for changes (Ctrl+C to stop)")
+    watch(build, create_watcher(polling=args.watch_polling))
+    return 0
+
+def main(argv=None):
     """
     Main function to run the PowerPoint generation process.
+    
+    Args:
+        argv (list, optional): Command line arguments. Defaults to sys.argv[1:].
     """
+    argv = sys.argv[1:] if argv is None else argv
+    
+    # Dispatch subcommands
+    if argv and argv[0] == 'batch':
+        return batch_main(argv[1:])
+    if argv and argv[0] == 'serve':
+        return serve_main(argv[1:])
+    if argv and argv[0] == 'http':
+        return http_main(argv[1:])
+    
     # Parse command line arguments
-    args = parse_args()
+    args = parse_args(argv)
     
     # Set logging level based on verbosity
     if args.verbose:
@@ -91,10 +701,26 @@ def main():
         os.makedirs(output_dir)
         logger.debug(f"Created output directory: {output_dir}")
     
+    profiler = start_profiler(args)
+    
     try:
-        # Validate the YAML file
+        if args.stream:
+            return run_streaming(args)
+        
+        if args.watch:
+            return run_watch(args)
+        
+        # Parse the YAML file once and validate the in-memory configuration
         logger.info(f"Validating YAML file: {args.input_file}")
-        validation_result = validate_yaml_file(args.input_file)
+        try:
+            with profiling.stage('parse'):
+                config = load_config_file(args.input_file)
+        except yaml.YAMLError as e:
+            logger.error(f"YAML validation failed: ['YAML parsing error: {e}']")
+            sys.exit(1)
+        
+        with profiling.stage('validate'):
+            validation_result = validate_config(config)
         
         if not validation_result['valid']:
             logger.error(f"YAML validation failed: {validation_result['errors']}")
@@ -108,11 +734,19 @@ def main():
             return 0
         
         # Create PowerPoint generator with optional template
-        generator = PresentationGenerator(template_path=args.template)
+        with profiling.stage('load_template'):
+            generator = PresentationGenerator(
+                template_path=args.template,
+                image_options=image_options(args),
+                package_options=package_options(args)
+            )
         
         # Generate the presentation
         logger.info(f"Generating PowerPoint presentation: {args.output}")
-        success = generator.generate_from_file(args.input_file, args.output)
+        if args.incremental:
+            success = generator.generate_incremental(config, args.output)
+        else:
+            success = generator.generate_from_config(config, args.output, workers=args.workers)
         
         if success:
             logger.info(f"Successfully generated presentation: {args.output}")
@@ -124,6 +758,12 @@ def main():
     except Exception as e:
         logger.exception(f"Error during presentation generation: {e}")
         return 1
+    
+    finally:
+        if profiler is not None:
+            report_profile(profiler, args)
 
 if __name__ == "__main__":
+    if no_daemon:
+        logger.info("No generation daemon running, generating in-process")
     sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,239 @@
+"""
+Batch Generation Module
+
+This module renders many YAML configuration files in a single run, sharing
+a pool of worker processes that keep their imports and template warm
+between decks.
+"""
+
+import os
+import glob
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import yaml
+
+from src.ppt_generator import PresentationGenerator
+from src.template_cache import load_template
+from src.validators import validate_config
+from src.utils import load_config_file
+
+logger = logging.getLogger(__name__)
+
+YAML_EXTENSIONS = ('.yaml', '.yml')
+
+# Per-process state populated by the pool initializer
+_worker_state = {}
+
+def collect_batch_jobs(sources, output_dir=None):
+    """
+    Expand batch sources into a list of (input_path, output_path) jobs.
+    
+    Each source may be a directory (all YAML files directly inside it),
+    a glob pattern, a single YAML file, or a manifest file listing one
+    input per line. Manifest lines may give an explicit output path after
+    a tab; blank lines and lines starting with '#' are ignored.
+    
+    Args:
+        sources (list): Directories, glob patterns, YAML files or manifests.
+        output_dir (str, optional): Directory for generated files. Defaults
+            to the directory of each input file.
+    
+    Returns:
+        list: List of (input_path, output_path) tuples.
+    """
+    jobs = []
+    
+    for source in sources:
+        if os.path.isdir(source):
+            inputs = sorted(
+                os.path.join(source, name) for name in os.listdir(source)
+                if name.lower().endswith(YAML_EXTENSIONS)
+            )
+            jobs.extend((path, None) for path in inputs)
+        
+        elif os.path.isfile(source) and not source.lower().endswith(YAML_EXTENSIONS):
+            jobs.extend(_read_manifest(source))
+        
+        elif os.path.isfile(source):
+            jobs.append((source, None))
+        
+        else:
+            matches = sorted(glob.glob(source, recursive=True))
+            if not matches:
+                logger.warning(f"No input files matched: {source}")
+            jobs.extend((path, None) for path in matches if os.path.isfile(path))
+    
+    return [(path, output or _default_output_path(path, output_dir)) for path, output in jobs]
+
+def _read_manifest(manifest_path):
+    """
+    Read a batch manifest file.
+    
+    Args:
+        manifest_path (str): Path to the manifest file.
+    
+    Returns:
+        list: List of (input_path, output_path or None) tuples.
+    """
+    base_dir = os.path.dirname(manifest_path)
+    jobs = []
+    
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            
+            parts = line.split('\t')
+            input_path = os.path.join(base_dir, parts[0].strip())
+            output_path = os.path.join(base_dir, parts[1].strip()) if len(parts) > 1 else None
+            jobs.append((input_path, output_path))
+    
+    return jobs
+
+def _default_output_path(input_path, output_dir):
+    """
+    Derive the output .pptx path for an input file.
+    
+    Args:
+        input_path (str): Path to the input YAML file.
+        output_dir (str, optional): Directory for generated files.
+    
+    Returns:
+        str: Output file path.
+    """
+    base = os.path.splitext(os.path.basename(input_path))[0] + '.pptx'
+    return os.path.join(output_dir if output_dir else os.path.dirname(input_path), base)
+
+def _init_worker(template_path, log_level, image_options=None):
+    """
+    Initialize a batch worker process.
+    
+    Parses the template into the process-wide template cache once so that
+    every job handled by this worker starts from an in-memory copy.
+    
+    Args:
+        template_path (str, optional): Path to a PowerPoint template file.
+        log_level (int): Logging level for the worker.
+        image_options (dict, optional): Image optimization options passed
+            to every generator.
+    """
+    logging.basicConfig(
+        level=log_level,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    logging.getLogger().setLevel(log_level)
+    
+    _worker_state['template_path'] = template_path
+    _worker_state['image_options'] = image_options
+    load_template(template_path if template_path and os.path.exists(template_path) else None)
+
+def _render_job(input_path, output_path):
+    """
+    Validate and render a single deck inside a worker process.
+    
+    Args:
+        input_path (str): Path to the input YAML file.
+        output_path (str): Path where the PowerPoint file should be saved.
+    
+    Returns:
+        dict: Result with 'input', 'output', 'success', 'errors' and
+            'duration' keys.
+    """
+    start = time.perf_counter()
+    result = {'input': input_path, 'output': output_path, 'success': False, 'errors': []}
+    
+    try:
+        try:
+            config = load_config_file(input_path)
+        except yaml.YAMLError as e:
+            result['errors'] = [f"YAML parsing error: {str(e)}"]
+            result['duration'] = time.perf_counter() - start
+            return result
+        
+        validation_result = validate_config(config)
+        
+        if not validation_result['valid']:
+            result['errors'] = validation_result['errors']
+        else:
+            output_dir = os.path.dirname(output_path)
+            if output_dir:
+                os.makedirs(output_dir, exist_ok=True)
+            
+            generator = PresentationGenerator(
+                template_path=_worker_state.get('template_path'),
+                image_options=_worker_state.get('image_options')
+            )
+            
+            result['success'] = generator.generate_from_config(config, output_path)
+            if not result['success']:
+                result['errors'] = ["Failed to generate presentation"]
+    
+    except Exception as e:
+        result['errors'] = [f"Unexpected error: {str(e)}"]
+    
+    result['duration'] = time.perf_counter() - start
+    return result
+
+def run_batch(jobs, template_path=None, workers=None, image_options=None):
+    """
+    Render a list of decks through a shared process pool.
+    
+    Args:
+        jobs (list): List of (input_path, output_path) tuples.
+        template_path (str, optional): Path to a PowerPoint template file.
+        workers (int, optional): Number of worker processes. Defaults to
+            the number of CPUs.
+        image_options (dict, optional): Image optimization options.
+    
+    Returns:
+        dict: Summary with 'results' (per-deck dicts in job order),
+            'succeeded', 'failed', 'elapsed' and 'throughput' (decks/sec).
+    """
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(jobs) or 1))
+    results = [None] * len(jobs)
+    
+    logger.info(f"Rendering {len(jobs)} decks with {workers} workers")
+    start = time.perf_counter()
+    
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(template_path, logging.getLogger().getEffectiveLevel(), image_options)
+    ) as executor:
+        futures = {
+            executor.submit(_render_job, input_path, output_path): idx
+            for idx, (input_path, output_path) in enumerate(jobs)
+        }
+        
+        for future in as_completed(futures):
+            idx = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker process itself died (e.g. killed or out of memory)
+                input_path, output_path = jobs[idx]
+                result = {
+                    'input': input_path, 'output': output_path, 'success': False,
+                    'errors': [f"Worker failure: {str(e)}"], 'duration': 0.0
+                }
+            
+            results[idx] = result
+            if result['success']:
+                logger.info(f"[ok] {result['input']} -> {result['output']} ({result['duration']:.2f}s)")
+            else:
+                logger.error(f"[failed] {result['input']}: {'; '.join(result['errors'])}")
+    
+    elapsed = time.perf_counter() - start
+    succeeded = sum(1 for r in results if r['success'])
+    
+    return {
+        'results': results,
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+        'elapsed': elapsed,
+        'throughput': len(results) / elapsed if elapsed > 0 else 0.0
+    }
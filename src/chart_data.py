@@ -0,0 +1,337 @@
+"""
+Chart Data Module
+
+This module reduces chart data before it is embedded. Line, area and
+scatter charts with more points than can be seen are downsampled (LTTB or
+min-max bucketing), and category charts can be grouped by category into
+the top N categories plus an "Other" bucket. Both stages work on NumPy
+arrays, so even series with hundreds of thousands of points are reduced
+quickly and the chart XML and embedded workbook stay small.
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Chart types whose points are downsampled when there are too many of them
+DOWNSAMPLE_CHART_TYPES = ('line', 'area', 'scatter')
+
+# Default maximum number of points per series for downsampled chart types
+DEFAULT_MAX_POINTS = 2000
+
+# Supported downsampling methods
+DOWNSAMPLE_METHODS = ('lttb', 'minmax', 'none')
+
+# Supported aggregation methods
+AGGREGATE_METHODS = ('sum', 'mean')
+
+# Label of the bucket collecting the categories outside the top N
+DEFAULT_OTHER_LABEL = 'Other'
+
+def prepare_chart_data(chart_data, chart_type, element_data):
+    """
+    Apply the aggregation and downsampling configured for a chart.
+    
+    Data that needs no reduction is returned unchanged.
+    
+    Args:
+        chart_data (dict): Chart data with 'categories' and 'series' keys.
+        chart_type (str): Chart type name, as in the 'chart_type' option.
+        element_data (dict): Chart configuration data. 'aggregate' groups
+            the data by category, 'downsample' and 'max_points' control
+            downsampling.
+    
+    Returns:
+        dict: The chart data to embed.
+    """
+    if not chart_data.get('series'):
+        return chart_data
+    
+    aggregate_options = element_data.get('aggregate')
+    if aggregate_options and chart_data.get('categories') is not None:
+        options = aggregate_options if isinstance(aggregate_options, dict) else {}
+        chart_data = aggregate(
+            chart_data,
+            top=options.get('top'),
+            method=options.get('method', 'sum'),
+            other_label=options.get('other_label', DEFAULT_OTHER_LABEL)
+        )
+    
+    method = element_data.get('downsample', 'lttb')
+    if chart_type in DOWNSAMPLE_CHART_TYPES and method != 'none':
+        chart_data = downsample(chart_data, element_data.get('max_points', DEFAULT_MAX_POINTS), method)
+    
+    return chart_data
+
+def downsample(chart_data, max_points, method='lttb'):
+    """
+    Reduce every series of a chart to about 'max_points' points.
+    
+    The points are chosen per series and the categories picked for any
+    series are kept for all of them, so each series keeps its own peaks.
+    
+    Args:
+        chart_data (dict): Chart data with 'categories' and 'series' keys.
+        max_points (int): Target number of points per series.
+        method (str): 'lttb' (Largest-Triangle-Three-Buckets, keeps the
+            visual shape) or 'minmax' (keeps every bucket's extremes).
+    
+    Returns:
+        dict: The downsampled chart data, or chart_data itself if it
+            already has at most max_points points.
+    
+    Raises:
+        ValueError: If the method is unknown.
+    """
+    import numpy as np
+    
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    
+    categories = chart_data.get('categories')
+    series = chart_data['series']
+    lengths = [len(s.get('values', [])) for s in series]
+    if categories is not None:
+        lengths.append(len(categories))
+    n = min(lengths)
+    
+    if n <= max(max_points, 3):
+        return chart_data
+    
+    x = _category_positions(categories, n)
+    arrays = [_float_array(s.get('values', []), n) for s in series]
+    selected = [
+        lttb_indices(x, y, max_points) if method == 'lttb' else minmax_indices(y, max_points)
+        for y in arrays
+    ]
+    indices = np.unique(np.concatenate(selected))
+    
+    logger.debug(f"Downsampled {len(series)} series from {n} to {len(indices)} points ({method})")
+    
+    result = dict(chart_data)
+    if categories is not None:
+        result['categories'] = [categories[i] for i in indices.tolist()]
+    result['series'] = [
+        dict(s, values=_python_values(y[indices]))
+        for s, y in zip(series, arrays)
+    ]
+    return result
+
+def aggregate(chart_data, top=None, method='sum', other_label=DEFAULT_OTHER_LABEL):
+    """
+    Group chart data by category, optionally keeping only the top N.
+    
+    Repeated categories are combined into one. With 'top', the categories
+    with the largest totals (summed over all series) are kept, in
+    descending order, and the rest are combined into an "Other" category.
+    
+    Args:
+        chart_data (dict): Chart data with 'categories' and 'series' keys.
+        top (int, optional): Number of categories to keep.
+        method (str): 'sum' or 'mean' of the values in each group.
+        other_label (str): Category label for the remaining groups.
+    
+    Returns:
+        dict: The aggregated chart data.
+    
+    Raises:
+        ValueError: If the method is unknown.
+    """
+    import numpy as np
+    
+    if method not in AGGREGATE_METHODS:
+        raise ValueError(f"Unknown aggregation method: {method}")
+    
+    categories = list(chart_data['categories'])
+    n = len(categories)
+    
+    # Group codes in order of first appearance
+    groups = {}
+    codes = np.fromiter((groups.setdefault(c, len(groups)) for c in categories), dtype=np.int64, count=n)
+    group_count = len(groups)
+    
+    sums = []
+    counts = []
+    for s in chart_data['series']:
+        values = _float_array(s.get('values', []), n)
+        if len(values) < n:
+            # A short series has no values for the trailing categories
+            values = np.concatenate([values, np.full(n - len(values), np.nan)])
+        valid = ~np.isnan(values)
+        sums.append(np.bincount(codes[valid], weights=values[valid], minlength=group_count))
+        counts.append(np.bincount(codes[valid], minlength=group_count))
+    
+    if top is not None and top < group_count:
+        order = np.argsort(-np.sum(sums, axis=0), kind='stable')
+        keep, rest = order[:top], order[top:]
+    else:
+        keep, rest = np.arange(group_count), None
+    
+    labels = list(groups)
+    result = dict(chart_data, categories=[labels[k] for k in keep.tolist()])
+    result['series'] = []
+    
+    for s, group_sums, group_counts in zip(chart_data['series'], sums, counts):
+        values = group_sums[keep]
+        if method == 'mean':
+            with np.errstate(invalid='ignore', divide='ignore'):
+                values = values / group_counts[keep]
+        values = _python_values(values)
+        
+        if rest is not None:
+            other = group_sums[rest].sum()
+            if method == 'mean':
+                other = other / group_counts[rest].sum() if group_counts[rest].sum() else None
+            values.append(None if other is None else float(other))
+        
+        result['series'].append(dict(s, values=values))
+    
+    if rest is not None:
+        result['categories'].append(other_label)
+    
+    logger.debug(f"Aggregated {n} rows into {len(result['categories'])} categories ({method})")
+    return result
+
+def lttb_indices(x, y, n_out):
+    """
+    Pick points with the Largest-Triangle-Three-Buckets algorithm.
+    
+    The first and last points are always kept. The points in between are
+    split into n_out - 2 buckets, and from each bucket the point forming
+    the largest triangle with the previously kept point and the average of
+    the next bucket is kept. Missing (NaN) values are only picked when a
+    bucket has nothing else.
+    
+    Args:
+        x (numpy.ndarray): Point positions.
+        y (numpy.ndarray): Point values (float, NaN for missing).
+        n_out (int): Number of points to keep.
+    
+    Returns:
+        numpy.ndarray: Sorted indices of the kept points.
+    """
+    import numpy as np
+    
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n) if n_out >= n else np.array([0, n - 1])
+    
+    every = (n - 2) / (n_out - 2)
+    edges = np.floor(np.arange(n_out - 1) * every).astype(np.int64) + 1
+    edges[-1] = n - 1
+    
+    # Averages of every bucket, ignoring missing values, plus the last point
+    missing = np.isnan(y[:n - 1])
+    filled = np.where(missing, 0.0, y[:n - 1])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        avg_y = np.add.reduceat(filled, edges[:-1]) / np.add.reduceat((~missing).astype(np.int64), edges[:-1])
+    avg_x = np.add.reduceat(x[:n - 1], edges[:-1]) / np.diff(edges)
+    avg_x = np.append(avg_x, x[-1])
+    avg_y = np.append(avg_y, y[-1])
+    
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs(
+            (x[a] - avg_x[i + 1]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y[i + 1] - y[a])
+        )
+        area[np.isnan(area)] = -1.0
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    
+    return selected
+
+def minmax_indices(y, n_out):
+    """
+    Pick the minimum and maximum of each bucket of points.
+    
+    The first and last points are always kept and the points in between
+    are split into (n_out - 2) // 2 buckets. Unlike LTTB this keeps every
+    extreme value, which suits noisy signals with short spikes.
+    
+    Args:
+        y (numpy.ndarray): Point values (float, NaN for missing).
+        n_out (int): Number of points to keep.
+    
+    Returns:
+        numpy.ndarray: Sorted indices of the kept points.
+    """
+    import numpy as np
+    
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    
+    buckets = max(1, (n_out - 2) // 2)
+    edges = np.linspace(1, n - 1, buckets + 1).astype(np.int64)
+    edges = np.unique(edges)
+    starts = edges[:-1]
+    bucket_ids = np.repeat(np.arange(len(starts)), np.diff(edges))
+    
+    inner = y[1:n - 1]
+    positions = np.arange(1, n - 1)
+    picks = [np.array([0, n - 1])]
+    
+    # For each bucket, the first position holding its minimum (maximum)
+    for fill, reduce in ((np.inf, np.minimum), (-np.inf, np.maximum)):
+        values = np.where(np.isnan(inner), fill, inner)
+        extremes = reduce.reduceat(values, starts - 1)
+        candidates = np.where(values == extremes[bucket_ids], positions, n)
+        picks.append(np.minimum.reduceat(candidates, starts - 1))
+    
+    return np.unique(np.concatenate(picks))
+
+def _category_positions(categories, n):
+    """
+    Get the x positions used for downsampling.
+    
+    Args:
+        categories (list): Category values, or None.
+        n (int): Number of points.
+    
+    Returns:
+        numpy.ndarray: The categories themselves if they are all numbers,
+            otherwise the point indices.
+    """
+    import numpy as np
+    
+    if categories is not None:
+        positions = np.asarray(categories[:n])
+        if positions.dtype.kind in 'iuf':
+            return positions.astype(np.float64)
+    
+    return np.arange(n, dtype=np.float64)
+
+def _float_array(values, n):
+    """
+    Convert series values to a float array with NaN for missing values.
+    
+    Args:
+        values (sequence): Series values; None marks a missing value.
+        n (int): Number of values to use.
+    
+    Returns:
+        numpy.ndarray: The values.
+    """
+    import numpy as np
+    
+    try:
+        return np.asarray(values[:n], dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.array([float('nan') if v is None else float(v) for v in values[:n]], dtype=np.float64)
+
+def _python_values(values):
+    """
+    Convert a float array back to chart values, with None for NaN.
+    
+    Args:
+        values (numpy.ndarray): The values.
+    
+    Returns:
+        list: The values as Python floats or None.
+    """
+    return [None if v != v else v for v in values.tolist()]
@@ -0,0 +1,458 @@
+"""
+Chart Writer Module
+
+This module adds charts to slides with control over the Excel workbook
+PowerPoint embeds as each chart's data source. The workbook can be written
+by python-pptx (XlsxWriter), by a minimal streaming writer that produces
+the same sheet layout much faster, or left out for read-only decks, in
+which case only the chart's XML data cache is written. Workbooks are keyed
+by a hash of the chart data, so charts showing identical data share one
+embedded workbook and it is only generated once.
+"""
+
+import io
+import zipfile
+import hashlib
+import logging
+import datetime
+import numbers
+from collections import OrderedDict
+from xml.sax.saxutils import escape, quoteattr
+
+from pptx.chart.data import CategoryChartData
+from pptx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from pptx.opc.packuri import PackURI
+from pptx.parts.chart import ChartPart
+from pptx.parts.embeddedpackage import EmbeddedXlsxPart
+
+logger = logging.getLogger(__name__)
+
+# Workbook modes
+WORKBOOK_EMBEDDED = 'embedded'
+WORKBOOK_MINIMAL = 'minimal'
+WORKBOOK_NONE = 'none'
+WORKBOOK_MODES = (WORKBOOK_EMBEDDED, WORKBOOK_MINIMAL, WORKBOOK_NONE)
+
+# Maximum number of generated workbooks kept in memory between charts
+MAX_CACHED_WORKBOOKS = 128
+
+# Number of worksheet rows written to the zip stream at a time
+ROWS_PER_CHUNK = 1024
+
+_EXCEL_EPOCH = datetime.datetime(1899, 12, 30)
+
+# hash -> workbook blob, shared by every generator in the process
+_workbook_blobs = OrderedDict()
+
+# Package attributes holding {hash: EmbeddedXlsxPart}, so identical workbooks
+# are stored once per file, and {template: [next number, used partnames]}, see
+# _next_partname. Kept on the package rather than in maps keyed by it, since
+# the parts reference the package and would keep it alive
+PACKAGE_WORKBOOK_PARTS_ATTR = '_workbook_parts_by_key'
+PACKAGE_PARTNAMES_ATTR = '_chart_partnames'
+
+_stats = {'generated': 0, 'reused': 0, 'skipped': 0}
+
+_CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+
+_ROOT_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+_WORKBOOK_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+
+def add_chart(shapes, chart_type, x, y, cx, cy, chart_data, workbook=WORKBOOK_EMBEDDED):
+    """
+    Add a chart to a slide, choosing how its workbook is produced.
+    
+    Behaves like shapes.add_chart(chart_type, x, y, cx, cy, chart_data),
+    with the workbook written according to 'workbook'.
+    
+    Args:
+        shapes: The slide's shape collection.
+        chart_type (XL_CHART_TYPE): Chart type.
+        x: Left position.
+        y: Top position.
+        cx: Width.
+        cy: Height.
+        chart_data (ChartData): The chart's data.
+        workbook (str): 'embedded' (python-pptx's workbook), 'minimal'
+            (streaming writer, same sheet layout) or 'none' (no workbook;
+            the chart cannot be edited in PowerPoint).
+    
+    Returns:
+        GraphicFrame: The created chart shape.
+    
+    Raises:
+        ValueError: If the workbook mode is unknown.
+    """
+    if workbook not in WORKBOOK_MODES:
+        raise ValueError(f"Unknown chart workbook mode: {workbook}")
+    
+    slide_part = shapes.part
+    chart_part = _new_chart_part(chart_type, chart_data, slide_part.package, workbook)
+    rId = slide_part.relate_to(chart_part, RT.CHART)
+    
+    # Mirrors SlideShapes.add_chart
+    graphicFrame = shapes._add_chart_graphicFrame(rId, x, y, cx, cy)
+    shapes._recalculate_extents()
+    return shapes._shape_factory(graphicFrame)
+
+def get_workbook_stats():
+    """
+    Get chart workbook statistics.
+    
+    Returns:
+        dict: Dictionary with 'generated', 'reused' and 'skipped' keys.
+    """
+    return dict(_stats)
+
+def write_minimal_xlsx(chart_data):
+    """
+    Write the workbook for category chart data without XlsxWriter.
+    
+    The sheet has the layout python-pptx's CategoryWorkbookWriter uses, so
+    the chart's cell references stay valid: categories in column A from
+    row 2, and one column per series with its name in row 1. Rows are
+    streamed into the zip file in chunks.
+    
+    Args:
+        chart_data (CategoryChartData): Chart data with a single category
+            level.
+    
+    Returns:
+        bytes: The XLSX file.
+    """
+    categories = chart_data.categories
+    series_list = list(chart_data)
+    number_formats = _NumberFormats()
+    category_style = number_formats.index(categories.number_format)
+    series_styles = [number_formats.index(series.number_format) for series in series_list]
+    
+    columns = [_column_letter(idx + 2) for idx in range(len(series_list))]
+    labels = [category.label for category in categories]
+    values = [list(series.values) for series in series_list]
+    row_count = max([len(labels)] + [len(v) for v in values])
+    
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('[Content_Types].xml', _CONTENT_TYPES_XML)
+        zf.writestr('_rels/.rels', _ROOT_RELS_XML)
+        zf.writestr('xl/workbook.xml', _WORKBOOK_XML)
+        zf.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS_XML)
+        
+        with zf.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+            header = ''.join(_cell_xml(f'{col}1', series.name, 0) for col, series in zip(columns, series_list))
+            sheet.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                '<cols><col min="1" max="1" width="10" customWidth="1"/></cols>'
+                f'<sheetData><row r="1">{header}</row>'
+            ).encode('utf-8'))
+            
+            parts = []
+            for i in range(row_count):
+                row = i + 2
+                cells = [_cell_xml(f'A{row}', labels[i], category_style) if i < len(labels) else '']
+                for col, series_values, style in zip(columns, values, series_styles):
+                    if i < len(series_values):
+                        cells.append(_cell_xml(f'{col}{row}', series_values[i], style))
+                parts.append(f'<row r="{row}">{"".join(cells)}</row>')
+                
+                if len(parts) >= ROWS_PER_CHUNK:
+                    sheet.write(''.join(parts).encode('utf-8'))
+                    parts = []
+            
+            parts.append('</sheetData></worksheet>')
+            sheet.write(''.join(parts).encode('utf-8'))
+        
+        zf.writestr('xl/styles.xml', number_formats.styles_xml())
+    
+    return out.getvalue()
+
+def _new_chart_part(chart_type, chart_data, package, workbook):
+    """
+    Create a chart part, with its workbook according to the workbook mode.
+    
+    Args:
+        chart_type (XL_CHART_TYPE): Chart type.
+        chart_data (ChartData): The chart's data.
+        package: The presentation package.
+        workbook (str): Workbook mode.
+    
+    Returns:
+        ChartPart: The new chart part.
+    """
+    # Mirrors ChartPart.new, minus the workbook
+    chart_part = ChartPart.load(
+        _next_partname(package, ChartPart.partname_template),
+        CT.DML_CHART,
+        package,
+        chart_data.xml_bytes(chart_type)
+    )
+    
+    if workbook == WORKBOOK_NONE:
+        _stats['skipped'] += 1
+        return chart_part
+    
+    if not isinstance(chart_data, CategoryChartData):
+        # XY and bubble data keep python-pptx's own writer, without sharing
+        chart_part.chart_workbook.update_from_xlsx_blob(chart_data.xlsx_blob)
+        return chart_part
+    
+    key = _workbook_key(chart_data, workbook)
+    parts = _package_state(package, PACKAGE_WORKBOOK_PARTS_ATTR)
+    xlsx_part = parts.get(key)
+    
+    if xlsx_part is None:
+        # Mirrors EmbeddedXlsxPart.new
+        xlsx_part = parts[key] = EmbeddedXlsxPart.load(
+            _next_partname(package, EmbeddedXlsxPart.partname_template),
+            EmbeddedXlsxPart.content_type,
+            package,
+            _get_workbook_blob(key, chart_data, workbook)
+        )
+    else:
+        _stats['reused'] += 1
+    
+    chart_part.chart_workbook.xlsx_part = xlsx_part
+    return chart_part
+
+def _next_partname(package, template):
+    """
+    Get the next free partname for a template, like package.next_partname.
+    
+    python-pptx walks every relationship in the package on each call, which
+    makes adding many charts quadratic. The used partnames are collected
+    once per package instead; every chart and workbook part is added
+    through this module, so the set stays complete.
+    
+    Args:
+        package: The presentation package.
+        template (str): Partname template with a %d placeholder.
+    
+    Returns:
+        PackURI: The lowest unused partname for the template.
+    """
+    templates = _package_state(package, PACKAGE_PARTNAMES_ATTR)
+    if template not in templates:
+        templates[template] = [1, {str(part.partname) for part in package.iter_parts()}]
+    
+    state = templates[template]
+    number, used = state
+    while template % number in used:
+        number += 1
+    
+    used.add(template % number)
+    state[0] = number + 1
+    return PackURI(template % number)
+
+def _package_state(package, attr):
+    """
+    Get a dict stored on a package, creating it on first use.
+    
+    Args:
+        package: The presentation package.
+        attr (str): Name of the attribute holding the dict.
+    
+    Returns:
+        dict: The package's dict.
+    """
+    state = getattr(package, attr, None)
+    if state is None:
+        state = {}
+        setattr(package, attr, state)
+    return state
+
+def _get_workbook_blob(key, chart_data, workbook):
+    """
+    Get the workbook for chart data from the cache, generating it on a miss.
+    
+    Args:
+        key (str): Workbook key from _workbook_key.
+        chart_data (CategoryChartData): The chart's data.
+        workbook (str): Workbook mode.
+    
+    Returns:
+        bytes: The XLSX file.
+    """
+    blob = _workbook_blobs.get(key)
+    if blob is not None:
+        _stats['reused'] += 1
+        _workbook_blobs.move_to_end(key)
+        return blob
+    
+    # Multi-level categories are left to XlsxWriter
+    if workbook == WORKBOOK_MINIMAL and chart_data.categories.depth <= 1:
+        blob = write_minimal_xlsx(chart_data)
+    else:
+        blob = chart_data.xlsx_blob
+    
+    _stats['generated'] += 1
+    _workbook_blobs[key] = blob
+    if len(_workbook_blobs) > MAX_CACHED_WORKBOOKS:
+        _workbook_blobs.popitem(last=False)
+    
+    return blob
+
+def _workbook_key(chart_data, workbook):
+    """
+    Hash everything that ends up in a chart's workbook.
+    
+    Args:
+        chart_data (CategoryChartData): The chart's data.
+        workbook (str): Workbook mode.
+    
+    Returns:
+        str: Hex digest identifying the workbook contents.
+    """
+    categories = chart_data.categories
+    digest = hashlib.sha1(workbook.encode('ascii'))
+    digest.update(repr((categories.depth, categories.number_format)).encode('utf-8'))
+    digest.update(repr(list(categories.levels)).encode('utf-8'))
+    
+    for series in chart_data:
+        digest.update(repr((series.name, series.number_format, series.values)).encode('utf-8'))
+    
+    return digest.hexdigest()
+
+class _NumberFormats:
+    """
+    Cell styles for the number formats used in one workbook.
+    """
+    
+    def __init__(self):
+        self._formats = []
+    
+    def index(self, number_format):
+        """
+        Get the cell style index for a number format.
+        
+        Args:
+            number_format (str): Excel number format code.
+        
+        Returns:
+            int: Style index, 0 for 'General'.
+        """
+        if not number_format or number_format == 'General':
+            return 0
+        if number_format not in self._formats:
+            self._formats.append(number_format)
+        return self._formats.index(number_format) + 1
+    
+    def styles_xml(self):
+        """
+        Build the workbook's styles part.
+        
+        Returns:
+            str: Serialized styles.xml.
+        """
+        num_fmts = ''.join(
+            f'<numFmt numFmtId="{164 + i}" formatCode={quoteattr(code)}/>'
+            for i, code in enumerate(self._formats)
+        )
+        xfs = ''.join(
+            f'<xf numFmtId="{164 + i}" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+            for i in range(len(self._formats))
+        )
+        return (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+            + (f'<numFmts count="{len(self._formats)}">{num_fmts}</numFmts>' if self._formats else '')
+            + '<fonts count="1"><font><sz val="11"/><name val="Calibri"/><family val="2"/></font></fonts>'
+            '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+            '<fill><patternFill patternType="gray125"/></fill></fills>'
+            '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+            '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+            f'<cellXfs count="{len(self._formats) + 1}">'
+            '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+            f'{xfs}</cellXfs>'
+            '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+            '</styleSheet>'
+        )
+
+def _cell_xml(ref, value, style):
+    """
+    Serialize one worksheet cell.
+    
+    Args:
+        ref (str): Cell reference, e.g. 'B2'.
+        value: Cell value; None and NaN leave the cell empty.
+        style (int): Cell style index.
+    
+    Returns:
+        str: The c element, or an empty string for an empty cell.
+    """
+    s = f' s="{style}"' if style else ''
+    
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return f'<c r="{ref}"{s} t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, numbers.Integral):
+        return f'<c r="{ref}"{s}><v>{int(value)}</v></c>'
+    if isinstance(value, numbers.Real):
+        value = float(value)
+        if value != value or value in (float('inf'), float('-inf')):
+            return ''
+        return f'<c r="{ref}"{s}><v>{value!r}</v></c>'
+    if isinstance(value, datetime.date):
+        if not isinstance(value, datetime.datetime):
+            value = datetime.datetime(value.year, value.month, value.day)
+        serial = (value.replace(tzinfo=None) - _EXCEL_EPOCH).total_seconds() / 86400
+        return f'<c r="{ref}"{s}><v>{serial!r}</v></c>'
+    
+    text = escape(str(value))
+    space = ' xml:space="preserve"' if text != text.strip() else ''
+    return f'<c r="{ref}"{s} t="inlineStr"><is><t{space}>{text}</t></is></c>'
+
+def _column_letter(column_number):
+    """
+    Get the Excel column letters for a 1-based column number.
+    
+    Args:
+        column_number (int): Column number, 1 for 'A'.
+    
+    Returns:
+        str: Column letters.
+    """
+    letters = ''
+    while column_number:
+        column_number, remainder = divmod(column_number - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
@@ -0,0 +1,138 @@
+"""
+Daemon Client Module
+
+This module sends a command line to a running generation daemon (see
+src.server) over a Unix domain socket and relays the daemon's output and
+exit status. It only imports the standard library, so main.py can hand a
+job over before importing python-pptx, lxml, PyYAML and the rest, which
+is the startup cost the daemon exists to avoid. When no daemon is
+listening the caller generates in-process instead.
+"""
+
+import os
+import sys
+import json
+import socket
+import tempfile
+
+# Environment variable overriding the default socket path
+SOCKET_ENV = 'PPT_AUTOMATOR_SOCKET'
+
+# Bump when the request or response frames change
+PROTOCOL_VERSION = 1
+
+# Arguments that only concern the client and are not forwarded
+CLIENT_FLAGS = ('--client',)
+CLIENT_OPTIONS = ('--socket',)
+
+# Commands that keep running or manage processes themselves, and so are
+# always run in-process
+LOCAL_COMMANDS = ('batch', 'serve', 'http')
+LOCAL_FLAGS = ('--watch',)
+
+def get_socket_path():
+    """
+    Get the default path of the daemon's socket.
+    
+    Returns:
+        str: $PPT_AUTOMATOR_SOCKET, or a per-user socket in
+            $XDG_RUNTIME_DIR or the temporary directory.
+    """
+    path = os.environ.get(SOCKET_ENV)
+    if path:
+        return path
+    
+    directory = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    user = os.getuid() if hasattr(os, 'getuid') else os.environ.get('USERNAME', 'user')
+    return os.path.join(directory, f"ppt-automator-{user}.sock")
+
+def split_client_args(argv):
+    """
+    Separate the client's own arguments from the ones for the daemon.
+    
+    Args:
+        argv (list): Command line arguments.
+    
+    Returns:
+        tuple: (arguments to forward, socket path or None).
+    """
+    forwarded = []
+    socket_path = None
+    args = iter(argv)
+    
+    for arg in args:
+        if arg in CLIENT_FLAGS:
+            continue
+        if arg in CLIENT_OPTIONS:
+            socket_path = next(args, None)
+            continue
+        if arg.startswith(tuple(option + '=' for option in CLIENT_OPTIONS)):
+            socket_path = arg.partition('=')[2]
+            continue
+        forwarded.append(arg)
+    
+    return forwarded, socket_path
+
+def runs_locally(argv):
+    """
+    Tell whether a command line is always run in-process.
+    
+    Args:
+        argv (list): Command line arguments, without the client's own.
+    
+    Returns:
+        bool: True for commands the daemon does not run.
+    """
+    return not argv or argv[0] in LOCAL_COMMANDS or any(arg in LOCAL_FLAGS for arg in argv)
+
+def run_client(argv, stdout=None, stderr=None):
+    """
+    Run a command line on the generation daemon.
+    
+    Args:
+        argv (list): Command line arguments, as for main.py.
+        stdout (file-like, optional): Where the job's output goes.
+        stderr (file-like, optional): Where the job's log and errors go.
+    
+    Returns:
+        int: The job's exit status, or None if no daemon is running or
+            the command must run in-process; the caller then generates
+            the presentation itself.
+    """
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+    argv, socket_path = split_client_args(argv)
+    
+    if not hasattr(socket, 'AF_UNIX') or runs_locally(argv):
+        return None
+    
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path or get_socket_path())
+    except OSError:
+        sock.close()
+        return None
+    
+    request = {'version': PROTOCOL_VERSION, 'argv': argv, 'cwd': os.getcwd()}
+    
+    try:
+        with sock, sock.makefile('rb') as responses:
+            sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+            
+            for line in responses:
+                frame = json.loads(line)
+                if 'exit' in frame:
+                    return frame['exit']
+                stream = stdout if frame.get('stream') == 'stdout' else stderr
+                stream.write(frame.get('data', ''))
+                stream.flush()
+    
+    except KeyboardInterrupt:
+        return 130
+    
+    except (OSError, ValueError) as e:
+        stderr.write(f"Lost connection to the generation daemon: {e}\n")
+        return 1
+    
+    stderr.write("The generation daemon closed the connection before the job finished\n")
+    return 1
@@ -0,0 +1,585 @@
+"""
+Data Sources Module
+
+This module loads table and chart data from local CSV, Parquet, Arrow and
+SQLite files, so large datasets can be referenced from the YAML instead of
+being written into it. Data is loaded column by column into NumPy arrays,
+only the requested columns and rows are read, and loaded columns are cached
+so that slides using the same source share one load.
+"""
+
+import os
+import csv
+import sqlite3
+import logging
+import itertools
+from contextlib import closing
+from collections import OrderedDict
+from urllib.request import pathname2url
+
+logger = logging.getLogger(__name__)
+
+# File extensions and the format they are read as
+SOURCE_FORMATS = {
+    '.csv': 'csv',
+    '.tsv': 'csv',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+    '.ipc': 'arrow',
+    '.sqlite': 'sqlite',
+    '.sqlite3': 'sqlite',
+    '.db': 'sqlite'
+}
+
+# Maximum number of loaded sources kept in memory
+MAX_CACHED_SOURCES = 16
+
+# Maximum number of loads (column and row subsets) kept per source
+MAX_LOADS_PER_SOURCE = 4
+
+# Batch size used when reading Parquet files with a row limit
+PARQUET_BATCH_SIZE = 65536
+
+# (path, mtime, size, format, query, table, delimiter) -> list of cache entries
+_source_cache = OrderedDict()
+
+_stats = {'hits': 0, 'misses': 0}
+
+class ColumnTable:
+    """
+    Named columns loaded from a data source, each held as a NumPy array.
+    """
+    
+    def __init__(self, columns, text=False):
+        """
+        Initialize the table.
+        
+        Args:
+            columns (OrderedDict): Mapping of column name to NumPy array.
+            text (bool): The columns hold text as written in a CSV file,
+                which is only read as numbers for chart data.
+        """
+        self.columns = columns
+        self.text = text
+    
+    @property
+    def names(self):
+        """
+        list: Column names in source order.
+        """
+        return list(self.columns)
+    
+    @property
+    def num_rows(self):
+        """
+        int: Number of rows.
+        """
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+    
+    def select(self, names=None, limit=None):
+        """
+        Get a projection of the table without copying the data.
+        
+        Args:
+            names (list, optional): Columns to keep, in order. Defaults to all.
+            limit (int, optional): Maximum number of rows to keep.
+        
+        Returns:
+            ColumnTable: The projected table.
+        """
+        names = self.names if names is None else names
+        _check_columns(names, self.names)
+        return ColumnTable(OrderedDict((name, self.columns[name][:limit]) for name in names), self.text)
+    
+    def column_values(self, name):
+        """
+        Get a column as a list of Python values, with missing values as None.
+        
+        Text columns that hold numbers are returned as numbers.
+        
+        Args:
+            name (str): Column name.
+        
+        Returns:
+            list: The column's values.
+        """
+        column = self.columns[name]
+        if self.text:
+            column = _parse_text_column(column.tolist())
+        return [_python_value(value) for value in column.tolist()]
+    
+    def iter_rows(self):
+        """
+        Iterate over the rows as lists of Python values.
+        
+        Yields:
+            list: One row, with missing values as None.
+        """
+        lists = [column.tolist() for column in self.columns.values()]
+        for row in zip(*lists):
+            yield [_python_value(value) for value in row]
+
+def normalize_source(source):
+    """
+    Turn a 'source' option into a source specification dictionary.
+    
+    Args:
+        source (str or dict): A path, or a dict with a 'path' key and
+            optional 'format', 'columns', 'limit', 'query', 'table',
+            'delimiter' and 'encoding' keys.
+    
+    Returns:
+        dict: The source specification.
+    
+    Raises:
+        ValueError: If the source has no path or an unknown format.
+    """
+    spec = {'path': source} if isinstance(source, str) else dict(source or {})
+    
+    if not spec.get('path'):
+        raise ValueError("Data source must specify a 'path'")
+    
+    if 'format' not in spec:
+        extension = os.path.splitext(spec['path'])[1].lower()
+        if extension not in SOURCE_FORMATS:
+            raise ValueError(f"Unknown data source format for {spec['path']}; set 'format' explicitly")
+        spec['format'] = SOURCE_FORMATS[extension]
+    
+    if spec['format'] not in _LOADERS:
+        raise ValueError(f"Unsupported data source format: {spec['format']}")
+    
+    return spec
+
+def _covers(entry_columns, entry_limit, columns, limit):
+    """
+    Check whether a cached load can answer a request.
+    
+    Args:
+        entry_columns (tuple): Columns of the cached load, None for all.
+        entry_limit (int): Row limit of the cached load, None for all rows.
+        columns (list): Requested columns, None for all.
+        limit (int): Requested row limit, None for all rows.
+    
+    Returns:
+        bool: True if the cached load has every requested column and row.
+    """
+    covers_columns = entry_columns is None or (columns is not None and set(columns) <= set(entry_columns))
+    covers_rows = entry_limit is None or (limit is not None and limit <= entry_limit)
+    return covers_columns and covers_rows
+
+def load_source(source, columns=None, limit=None):
+    """
+    Load columns from a data source, using the cache when possible.
+    
+    Only the requested columns and at most 'limit' rows are read from the
+    file. A cached load that already covers the request (a superset of the
+    columns and at least as many rows) is reused without touching the file.
+    
+    Args:
+        source (str or dict): Source path or specification.
+        columns (list, optional): Columns to load. Defaults to the source's
+            'columns' option, or all columns.
+        limit (int, optional): Maximum number of rows. Defaults to the
+            source's 'limit' option, or all rows.
+    
+    Returns:
+        ColumnTable: The loaded columns.
+    """
+    spec = normalize_source(source)
+    columns = columns if columns is not None else spec.get('columns')
+    limit = limit if limit is not None else spec.get('limit')
+    
+    path = spec['path']
+    stat = os.stat(path)
+    key = (
+        os.path.abspath(path), stat.st_mtime_ns, stat.st_size, spec['format'],
+        spec.get('query'), spec.get('table'), spec.get('delimiter')
+    )
+    
+    for entry_columns, entry_limit, table in _source_cache.get(key, []):
+        if _covers(entry_columns, entry_limit, columns, limit):
+            _stats['hits'] += 1
+            _source_cache.move_to_end(key)
+            return table.select(columns, limit)
+    
+    _stats['misses'] += 1
+    table = ColumnTable(_LOADERS[spec['format']](path, columns, limit, spec), text=spec['format'] == 'csv')
+    logger.debug(f"Loaded {table.num_rows} rows x {len(table.columns)} columns from {path}")
+    
+    columns = tuple(columns) if columns is not None else None
+    # Loads the new one covers would never be hit again
+    entries = [
+        entry for entry in _source_cache.get(key, [])
+        if not _covers(columns, limit, entry[0], entry[1])
+    ]
+    entries.append((columns, limit, table))
+    _source_cache[key] = entries[-MAX_LOADS_PER_SOURCE:]
+    _source_cache.move_to_end(key)
+    if len(_source_cache) > MAX_CACHED_SOURCES:
+        _source_cache.popitem(last=False)
+    
+    return table
+
+def iter_table_rows(source):
+    """
+    Iterate over the rows a table element should show for a data source.
+    
+    CSV values are shown as written in the file, like inline table data.
+    
+    Args:
+        source (str or dict): Source path or specification. A 'header'
+            option (default true) adds the column names as the first row.
+    
+    Yields:
+        list: Rows of cell values, with missing values as empty strings.
+    """
+    spec = normalize_source(source)
+    table = load_source(spec)
+    
+    if spec.get('header', True):
+        yield table.names
+    
+    for row in table.iter_rows():
+        yield ['' if value is None else value for value in row]
+
+def get_table_rows(source):
+    """
+    Get the rows a table element should show for a data source.
+    
+    Args:
+        source (str or dict): Source path or specification.
+    
+    Returns:
+        list: Rows of cell values, see iter_table_rows.
+    """
+    return list(iter_table_rows(source))
+
+def get_chart_data(source):
+    """
+    Build chart data from a data source.
+    
+    Args:
+        source (str or dict): Source path or specification. 'categories'
+            names the category column (default: the first column) and
+            'series' lists the value columns (default: all other columns),
+            either as names or as dicts with 'column' and 'name' keys.
+    
+    Returns:
+        dict: Chart data with 'categories' and 'series' keys, in the same
+            form as an inline chart 'data' option.
+    """
+    spec = normalize_source(source)
+    series_specs = [
+        item if isinstance(item, dict) else {'column': item}
+        for item in spec.get('series') or []
+    ]
+    
+    category_column = spec.get('categories')
+    if category_column and series_specs:
+        # Only the charted columns are read from the source
+        table = load_source(spec, columns=[category_column] + [s['column'] for s in series_specs])
+    else:
+        table = load_source(spec)
+        category_column = category_column or table.names[0]
+        if not series_specs:
+            series_specs = [{'column': name} for name in table.names if name != category_column]
+    
+    return {
+        'categories': table.column_values(category_column),
+        'series': [
+            {'name': s.get('name', s['column']), 'values': table.column_values(s['column'])}
+            for s in series_specs
+        ]
+    }
+
+def get_source_cache_stats():
+    """
+    Get data source cache statistics.
+    
+    Returns:
+        dict: Dictionary with 'hits', 'misses' and 'entries' keys.
+    """
+    return dict(_stats, entries=sum(len(entries) for entries in _source_cache.values()))
+
+def clear_source_cache():
+    """
+    Drop every cached source.
+    """
+    _source_cache.clear()
+
+def _load_csv(path, columns, limit, spec):
+    """
+    Read the requested columns and rows of a CSV file.
+    
+    Rows are streamed, so reading stops once 'limit' rows have been read
+    and unused columns are never stored. Values are kept as strings; see
+    ColumnTable.column_values for numbers.
+    
+    Args:
+        path (str): Path to the file.
+        columns (list): Columns to read, or None for all.
+        limit (int): Maximum number of rows, or None.
+        spec (dict): Source specification ('delimiter', 'encoding').
+    
+    Returns:
+        OrderedDict: Mapping of column name to NumPy object array.
+    """
+    import numpy as np
+    
+    delimiter = spec.get('delimiter') or ('\t' if path.lower().endswith('.tsv') else ',')
+    
+    with open(path, 'r', newline='', encoding=spec.get('encoding', 'utf-8-sig')) as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader, [])
+        names = list(columns) if columns is not None else header
+        _check_columns(names, header, path)
+        
+        indexes = [header.index(name) for name in names]
+        values = [[] for _ in names]
+        
+        for row in itertools.islice(reader, limit):
+            for column, idx in zip(values, indexes):
+                column.append(row[idx] if idx < len(row) else '')
+    
+    return OrderedDict((name, np.array(column, dtype=object)) for name, column in zip(names, values))
+
+def _load_parquet(path, columns, limit, spec):
+    """
+    Read the requested columns and rows of a Parquet file.
+    
+    Args:
+        path (str): Path to the file.
+        columns (list): Columns to read, or None for all.
+        limit (int): Maximum number of rows, or None.
+        spec (dict): Source specification.
+    
+    Returns:
+        OrderedDict: Mapping of column name to NumPy array.
+    """
+    pa = _import_pyarrow('Parquet')
+    import pyarrow.parquet as pq
+    
+    parquet_file = pq.ParquetFile(path)
+    if columns is not None:
+        _check_columns(columns, parquet_file.schema_arrow.names, path)
+    
+    if limit is None:
+        return _arrow_columns(parquet_file.read(columns=columns))
+    
+    # Read row batches only until the limit is reached
+    batches = []
+    count = 0
+    for batch in parquet_file.iter_batches(batch_size=min(limit, PARQUET_BATCH_SIZE) or 1, columns=columns):
+        batches.append(batch)
+        count += batch.num_rows
+        if count >= limit:
+            break
+    
+    schema = parquet_file.schema_arrow
+    if columns is not None:
+        schema = pa.schema([schema.field(name) for name in columns])
+    
+    return _arrow_columns(pa.Table.from_batches(batches, schema=schema).slice(0, limit))
+
+def _load_arrow(path, columns, limit, spec):
+    """
+    Read the requested columns and rows of an Arrow IPC (Feather) file.
+    
+    The file is memory-mapped, so only the sliced columns are materialized.
+    
+    Args:
+        path (str): Path to the file.
+        columns (list): Columns to read, or None for all.
+        limit (int): Maximum number of rows, or None.
+        spec (dict): Source specification.
+    
+    Returns:
+        OrderedDict: Mapping of column name to NumPy array.
+    """
+    _import_pyarrow('Arrow')
+    import pyarrow.feather as feather
+    
+    table = feather.read_table(path, columns=columns, memory_map=True)
+    if limit is not None:
+        table = table.slice(0, limit)
+    
+    return _arrow_columns(table)
+
+def _load_sqlite(path, columns, limit, spec):
+    """
+    Run a query against a SQLite database and read the result by column.
+    
+    The column projection and row limit are pushed into the SQL, so the
+    database only returns what is needed. The database is opened read-only.
+    
+    Args:
+        path (str): Path to the database file.
+        columns (list): Columns to read, or None for all.
+        limit (int): Maximum number of rows, or None.
+        spec (dict): Source specification with a 'query' or a 'table'.
+    
+    Returns:
+        OrderedDict: Mapping of column name to NumPy array.
+    """
+    if spec.get('query'):
+        base = spec['query'].strip().rstrip(';')
+    elif spec.get('table'):
+        base = f"SELECT * FROM {_quote_identifier(spec['table'])}"
+    else:
+        raise ValueError(f"SQLite source {path} needs a 'query' or a 'table'")
+    
+    select = ', '.join(_quote_identifier(name) for name in columns) if columns is not None else '*'
+    sql = f"SELECT {select} FROM ({base})"
+    params = []
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    
+    uri = f"file:{pathname2url(os.path.abspath(path))}?mode=ro"
+    with closing(sqlite3.connect(uri, uri=True)) as connection:
+        cursor = connection.execute(sql, params)
+        names = [description[0] for description in cursor.description]
+        rows = cursor.fetchall()
+    
+    values = list(zip(*rows)) if rows else [() for _ in names]
+    return OrderedDict((name, _values_to_array(column)) for name, column in zip(names, values))
+
+_LOADERS = {
+    'csv': _load_csv,
+    'parquet': _load_parquet,
+    'arrow': _load_arrow,
+    'sqlite': _load_sqlite
+}
+
+def _import_pyarrow(format_name):
+    """
+    Import pyarrow, which is only needed for Parquet and Arrow sources.
+    
+    Args:
+        format_name (str): Format being read, for the error message.
+    
+    Returns:
+        module: The pyarrow module.
+    
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError(f"Reading {format_name} data sources requires pyarrow (pip install pyarrow)")
+    return pyarrow
+
+def _arrow_columns(table):
+    """
+    Convert an Arrow table to NumPy columns.
+    
+    Args:
+        table (pyarrow.Table): The table.
+    
+    Returns:
+        OrderedDict: Mapping of column name to NumPy array.
+    """
+    return OrderedDict(
+        (name, table.column(name).to_numpy()) for name in table.column_names
+    )
+
+def _parse_text_column(values):
+    """
+    Convert a column of CSV strings to the narrowest fitting array.
+    
+    Integer columns become int64, numeric columns (blanks allowed) float64
+    with NaN for blanks, and anything else stays as strings.
+    
+    Args:
+        values (list): Column values as strings.
+    
+    Returns:
+        numpy.ndarray: The column.
+    """
+    import numpy as np
+    
+    stripped = np.array([value.strip() for value in values], dtype=object)
+    blanks = stripped == ''
+    
+    if len(stripped) and not blanks.all():
+        if not blanks.any():
+            try:
+                return stripped.astype(np.int64)
+            except (ValueError, OverflowError):
+                pass
+        
+        try:
+            return np.where(blanks, 'nan', stripped).astype(np.float64)
+        except ValueError:
+            pass
+    
+    return np.array(values, dtype=object)
+
+def _values_to_array(values):
+    """
+    Convert a column of Python values (as returned by SQLite) to an array.
+    
+    Args:
+        values (sequence): Column values; None marks a missing value.
+    
+    Returns:
+        numpy.ndarray: int64 if every value is an integer, float64 (NaN for
+            missing) if every value is numeric, otherwise an object array.
+    """
+    import numpy as np
+    
+    present = [value for value in values if value is not None]
+    numeric = all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in present)
+    
+    if present and numeric:
+        if len(present) == len(values) and all(isinstance(value, int) for value in present):
+            return np.array(values, dtype=np.int64)
+        return np.array([float('nan') if value is None else value for value in values], dtype=np.float64)
+    
+    return np.array(values, dtype=object)
+
+def _python_value(value):
+    """
+    Map missing values (None or NaN) to None.
+    
+    Args:
+        value: A value from a column.
+    
+    Returns:
+        The value, or None if it is missing.
+    """
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    return value
+
+def _check_columns(names, available, path=None):
+    """
+    Make sure every requested column exists.
+    
+    Args:
+        names (list): Requested column names.
+        available (list): Column names present in the source.
+        path (str, optional): Source path, for the error message.
+    
+    Raises:
+        ValueError: If a requested column is missing.
+    """
+    missing = [name for name in names if name not in available]
+    if missing:
+        where = f" in {path}" if path else ""
+        raise ValueError(f"Unknown column(s){where}: {', '.join(map(str, missing))}")
+
+def _quote_identifier(name):
+    """
+    Quote an SQL identifier.
+    
+    Args:
+        name (str): Column or table name.
+    
+    Returns:
+        str: The quoted identifier.
+    """
+    return '"' + str(name).replace('"', '""') + '"'
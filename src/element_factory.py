@@ -15,6 +15,12 @@ from pptx.chart.data import CategoryChartData
 from pptx.enum.chart import XL_CHART_TYPE
 
 from src.utils import format_text_frame, get_rgb_color
+from src.image_cache import add_picture, get_native_size
+from src.table_writer import write_table
+from src.data_sources import get_table_rows, get_chart_data
+from src.chart_data import prepare_chart_data
+from src.chart_writer import add_chart, WORKBOOK_EMBEDDED
+from src.profiling import timed
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +29,20 @@ class ElementFactory:
     A factory class for creating PowerPoint elements.
     """
     
+    def __init__(self, image_optimizer=None, chart_workbook=WORKBOOK_EMBEDDED):
+        """
+        Initialize the ElementFactory.
+        
+        Args:
+            image_optimizer (ImageOptimizer, optional): Optimizer used to
+                downsample and re-encode images before they are embedded.
+            chart_workbook (str): Default workbook mode for charts
+                ('embedded', 'minimal' or 'none').
+        """
+        self.image_optimizer = image_optimizer
+        self.chart_workbook = chart_workbook
+    
+    @timed('create_text_box')
     def create_text_box(self, slide, element_data, theme_settings):
         """
         Create a text box element.
@@ -81,6 +101,7 @@ class ElementFactory:
         
         return text_box
     
+    @timed('create_shape')
     def create_shape(self, slide, element_data, theme_settings):
         """
         Create a shape element.
@@ -203,6 +224,7 @@ class ElementFactory:
         
         return shape
     
+    @timed('create_image')
     def create_image(self, slide, left, top, width, height, element_data):
         """
         Create an image element.
@@ -234,32 +256,34 @@ class ElementFactory:
         
         # If width and height are not specified, use the image's natural size
         if ('width' not in element_data and width is None) or ('height' not in element_data and height is None):
-            image_shape = slide.shapes.add_picture(image_path, left, top)
-            
-            # Scale the image if only one dimension is specified
+            # Scale the image if only one dimension is specified, using the
+            # native size probed from the image header
             if 'width' in element_data and width is None:
+                native_width, native_height = get_native_size(image_path)
                 width = Inches(element_data['width'])
-                scale_factor = width / image_shape.width
-                height = image_shape.height * scale_factor
+                scale_factor = width / native_width
+                height = int(native_height * scale_factor)
             elif 'height' in element_data and height is None:
+                native_width, native_height = get_native_size(image_path)
                 height = Inches(element_data['height'])
-                scale_factor = height / image_shape.height
-                width = image_shape.width * scale_factor
-            
-            # Remove the temporary image shape
-            sp_id = image_shape.element.attrib.get('id')
-            if sp_id:
-                old_elm = image_shape._element
-                old_elm.getparent().remove(old_elm)
+                scale_factor = height / native_height
+                width = int(native_width * scale_factor)
         else:
             width = width or Inches(element_data.get('width', 4))
             height = height or Inches(element_data.get('height', 3))
         
+        # Swap in a downsampled copy sized for the frame
+        if self.image_optimizer and element_data.get('optimize', True):
+            if width is None and height is None:
+                width, height = get_native_size(image_path)
+            image_path = self.image_optimizer.optimize(image_path, width, height)
+        
         # Create the image with the determined dimensions
-        image_shape = slide.shapes.add_picture(image_path, left, top, width, height)
+        image_shape = add_picture(slide.shapes, image_path, left, top, width, height)
         
         return image_shape
     
+    @timed('create_table')
     def create_table(self, slide, left, top, width, height, element_data, theme_settings):
         """
         Create a table element.
@@ -276,12 +300,19 @@ class ElementFactory:
         Returns:
             The created table shape.
         """
-        # Get table data
-        if 'data' not in element_data or not element_data['data']:
+        # Get table data, either inline or from a data source
+        if element_data.get('source'):
+            try:
+                table_data = get_table_rows(element_data['source'])
+            except Exception as e:
+                logger.error(f"Error loading table data source: {str(e)}")
+                return None
+        elif 'data' not in element_data or not element_data['data']:
             logger.error("Table data not specified or empty")
             return None
+        else:
+            table_data = element_data['data']
         
-        table_data = element_data['data']
         rows = len(table_data)
         cols = len(table_data[0]) if rows > 0 else 0
         
@@ -295,6 +326,13 @@ class ElementFactory:
         width = width or Inches(element_data.get('width', 8))
         height = height or Inches(element_data.get('height', rows * 0.5))
         
+        # Generate all rows in one pass when requested; the result is the
+        # same as the cell-by-cell path below, which is kept for comparison
+        if element_data.get('bulk', False):
+            table = slide.shapes.add_table(1, cols, left, top, width, height).table
+            write_table(table, table_data, height, element_data, theme_settings)
+            return table
+        
         # Create table
         table = slide.shapes.add_table(rows, cols, left, top, width, height).table
         
@@ -373,6 +411,7 @@ class ElementFactory:
         
         return table
     
+    @timed('create_chart')
     def create_chart(self, slide, left, top, width, height, element_data, theme_settings):
         """
         Create a chart element.
@@ -389,12 +428,18 @@ class ElementFactory:
         Returns:
             The created chart shape.
         """
-        # Get chart data
-        if 'data' not in element_data or not element_data['data']:
+        # Get chart data, either inline or from a data source
+        if element_data.get('source'):
+            try:
+                chart_data = get_chart_data(element_data['source'])
+            except Exception as e:
+                logger.error(f"Error loading chart data source: {str(e)}")
+                return None
+        elif 'data' not in element_data or not element_data['data']:
             logger.error("Chart data not specified or empty")
             return None
-        
-        chart_data = element_data['data']
+        else:
+            chart_data = element_data['data']
         
         # Get chart type
         chart_type_str = element_data.get('chart_type', 'bar').lower()
@@ -412,6 +457,13 @@ class ElementFactory:
         }
         chart_type = chart_type_map.get(chart_type_str, XL_CHART_TYPE.COLUMN_CLUSTERED)
         
+        # Aggregate and downsample large data before it is embedded
+        try:
+            chart_data = prepare_chart_data(chart_data, chart_type_str, element_data)
+        except ValueError as e:
+            logger.error(f"Error preparing chart data: {str(e)}")
+            return None
+        
         # Get position
         left = left or Inches(element_data.get('left', 1))
         top = top or Inches(element_data.get('top', 1))
@@ -434,7 +486,8 @@ class ElementFactory:
                 chart_data_obj.add_series(name, values)
         
         # Create chart
-        chart = slide.shapes.add_chart(chart_type, left, top, width, height, chart_data_obj).chart
+        workbook = element_data.get('workbook', self.chart_workbook)
+        chart = add_chart(slide.shapes, chart_type, left, top, width, height, chart_data_obj, workbook).chart
         
         # Set chart title
         if 'title' in element_data:
@@ -459,6 +512,7 @@ class ElementFactory:
         
         return chart
     
+    @timed('create_code_block')
     def create_code_block(self, slide, left, top, width, height, element_data, theme_settings):
         """
         Create a code block element (implemented as a formatted text box).
@@ -0,0 +1,69 @@
+"""
+Errors Module
+
+This module defines the exceptions raised by the in-memory generation API
+(PresentationGenerator.render and render_presentation). They all derive
+from PresentationError, so callers can catch every generation failure at
+once or tell bad input apart from rendering and output failures.
+"""
+
+class PresentationError(Exception):
+    """
+    Base class for presentation generation errors.
+    """
+
+class ConfigError(PresentationError):
+    """
+    The configuration could not be read or parsed, or is not a mapping.
+    """
+
+class ValidationError(PresentationError, ValueError):
+    """
+    The configuration does not match the schema.
+    """
+    
+    def __init__(self, errors):
+        """
+        Initialize the error.
+        
+        Args:
+            errors (list): Validation error messages.
+        """
+        super().__init__(f"YAML validation failed: {errors}")
+        self.errors = list(errors)
+    
+    def __reduce__(self):
+        return (type(self), (self.errors,))
+
+class TemplateError(PresentationError):
+    """
+    The PowerPoint template could not be found or opened.
+    """
+
+class RenderError(PresentationError):
+    """
+    Building the presentation from a valid configuration failed.
+    """
+    
+    def __init__(self, reason, slide_index=None):
+        """
+        Initialize the error.
+        
+        Args:
+            reason (str): What went wrong.
+            slide_index (int, optional): Zero-based position in the
+                configuration of the slide that failed, if any.
+        """
+        message = reason if slide_index is None else f"Slide {slide_index + 1}: {reason}"
+        super().__init__(message)
+        self.reason = reason
+        self.slide_index = slide_index
+    
+    def __reduce__(self):
+        # Keep slide_index when the error crosses a process boundary
+        return (type(self), (self.reason, self.slide_index))
+
+class OutputError(PresentationError):
+    """
+    The generated presentation could not be written.
+    """
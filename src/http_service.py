@@ -0,0 +1,582 @@
+"""
+HTTP Rendering Service Module
+
+This module serves presentation rendering over HTTP with asyncio and the
+standard library only. POST /render takes a YAML or JSON deck spec; a
+bounded pool of worker processes parses, validates and renders it, and
+the .pptx is written back in chunks as the client reads it. At most as
+many jobs as there are workers run at a time, a bounded number wait for
+a free worker, and further requests are turned away with 429 instead of
+piling up in memory. GET /metrics reports the queue length, the jobs in
+flight and latency percentiles. Decks may only refer to local files (images
+and data sources) inside a directory the service is given; without one,
+decks that refer to files are rejected.
+"""
+
+import os
+import time
+import json
+import signal
+import asyncio
+import logging
+from collections import deque
+from http import HTTPStatus
+from urllib.parse import urlsplit
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from src.errors import PresentationError, ConfigError, ValidationError, RenderError
+from src.ppt_generator import render_presentation
+from src.server import warm_up
+from src.utils import load_config, get_variable_resolver
+from src.incremental import referenced_files
+from src.image_optimizer import default_cache_dir
+
+logger = logging.getLogger(__name__)
+
+# Requests that may wait for a free worker before new ones get 429
+DEFAULT_MAX_QUEUE = 16
+
+# Largest accepted deck spec, in bytes
+DEFAULT_MAX_BODY = 16 * 1024 * 1024
+
+# Seconds a client may take to send a request, and to send the next one
+# on a kept-alive connection
+REQUEST_TIMEOUT = 30
+KEEP_ALIVE_TIMEOUT = 15
+
+# Longest request or header line, and most headers per request
+MAX_LINE = 8192
+MAX_HEADERS = 100
+
+# Size of the pieces responses are written in
+RESPONSE_CHUNK_SIZE = 64 * 1024
+
+# Number of recent requests latency percentiles are computed over
+LATENCY_WINDOW = 1000
+
+PPTX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.presentationml.presentation'
+
+# Per-process state populated by the pool initializer
+_worker_state = {}
+
+class _HttpError(Exception):
+    """
+    A request that is answered with an error status and a closed connection.
+    """
+    
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class RenderService:
+    """
+    Renders deck specs posted over HTTP in a bounded process pool.
+    """
+    
+    def __init__(self, workers=None, max_queue=DEFAULT_MAX_QUEUE, max_body=DEFAULT_MAX_BODY,
+                 template_path=None, image_options=None, package_options=None, files_root=None):
+        """
+        Initialize the service.
+        
+        Args:
+            workers (int, optional): Number of rendering processes; the
+                number of CPUs by default.
+            max_queue (int): Requests that may wait for a free worker.
+            max_body (int): Largest accepted deck spec, in bytes.
+            template_path (str, optional): Template every deck is built on.
+            image_options (dict, optional): Image optimization options.
+            package_options (dict, optional): Package writing options. Each
+                worker compresses on a single thread unless 'threads' is given.
+            files_root (str, optional): Directory decks may read images and
+                data sources from. By default decks cannot refer to files.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.max_body = max_body
+        self.files_root = os.path.realpath(files_root) if files_root else None
+        
+        # Optimized images go to the service's cache, not where a deck says
+        image_options = dict(image_options or {}, cache_dir=default_cache_dir())
+        self._initargs = (
+            template_path, logging.getLogger().getEffectiveLevel(), image_options,
+            dict({'threads': 1}, **(package_options or {})), self.files_root
+        )
+        self._pool = None
+        self._pool_lock = None
+        self._slots = None
+        self._pending = 0
+        self._in_flight = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._render_times = deque(maxlen=LATENCY_WINDOW)
+        self._started = time.time()
+        self.counts = {'rendered': 0, 'invalid': 0, 'failed': 0, 'rejected': 0}
+    
+    async def serve(self, host='127.0.0.1', port=8080):
+        """
+        Start the worker processes and serve requests until cancelled.
+        
+        Args:
+            host (str): Address to listen on.
+            port (int): Port to listen on.
+        """
+        self._slots = asyncio.Semaphore(self.workers)
+        self._pool_lock = asyncio.Lock()
+        await self._start_pool()
+        
+        server = await asyncio.start_server(self._handle_connection, host, port, limit=MAX_LINE)
+        logger.info(
+            f"Rendering service listening on http://{host}:{port} with {self.workers} workers "
+            f"and a queue of {self.max_queue}"
+        )
+        async with server:
+            await server.serve_forever()
+    
+    def close(self):
+        """
+        Stop the worker processes.
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+    
+    def metrics(self):
+        """
+        Get the service's current load and recent latencies.
+        
+        Returns:
+            dict: Queue length, jobs in flight, request counts, and
+                percentiles of the request latency (from arrival to the
+                rendered deck) and of the rendering time, in milliseconds.
+        """
+        return {
+            'workers': self.workers,
+            'max_queue': self.max_queue,
+            'queue_length': self._pending - self._in_flight,
+            'in_flight': self._in_flight,
+            'requests': dict(self.counts),
+            'latency_ms': _percentiles(self._latencies),
+            'render_ms': _percentiles(self._render_times),
+            'uptime': round(time.time() - self._started, 1)
+        }
+    
+    async def _start_pool(self):
+        """
+        Create the process pool and wait until its workers are warm.
+        """
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker, initargs=self._initargs
+        )
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._pool, _ping) for _ in range(self.workers)))
+    
+    async def _restart_pool(self, broken):
+        """
+        Replace a pool whose worker died, once per failure.
+        
+        Every job queued on the broken pool fails with BrokenProcessPool;
+        only the first of them replaces it, the others find it replaced.
+        
+        Args:
+            broken (ProcessPoolExecutor): The pool the failed job ran in.
+        """
+        async with self._pool_lock:
+            if self._pool is not broken:
+                return
+            logger.error("A rendering worker died, restarting the pool")
+            broken.shutdown(wait=False)
+            # Replaces self._pool before waiting, so new jobs queue on the new pool
+            await self._start_pool()
+    
+    async def _handle_connection(self, reader, writer):
+        """
+        Serve the requests of one connection.
+        """
+        try:
+            timeout = REQUEST_TIMEOUT
+            while True:
+                request = await self._read_request(reader, timeout)
+                if request is None:
+                    break
+                
+                method, path, headers, version = request
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                keep_alive = await self._dispatch(method, path, headers, reader, writer, keep_alive)
+                if not keep_alive:
+                    break
+                timeout = KEEP_ALIVE_TIMEOUT
+        
+        except _HttpError as e:
+            try:
+                await self._send_json(writer, e.status, {'error': str(e)}, keep_alive=False)
+            except ConnectionError:
+                pass
+        
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        
+        except Exception:
+            logger.exception("Error handling request")
+        
+        finally:
+            writer.close()
+    
+    async def _read_request(self, reader, timeout):
+        """
+        Read a request line and headers.
+        
+        Args:
+            reader (asyncio.StreamReader): The connection.
+            timeout (float): Seconds to wait for the request line.
+        
+        Returns:
+            tuple: (method, path, headers, version), or None if the client
+                closed the connection.
+        
+        Raises:
+            _HttpError: If the request is malformed.
+        """
+        try:
+            line = await asyncio.wait_for(reader.readline(), timeout)
+            if not line:
+                return None
+            
+            parts = line.decode('latin-1').split()
+            if len(parts) != 3 or not parts[2].startswith('HTTP/'):
+                raise _HttpError(400, "Malformed request line")
+            
+            headers = {}
+            while True:
+                line = await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT)
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                if len(headers) >= MAX_HEADERS:
+                    raise _HttpError(431, "Too many headers")
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+        
+        except (ValueError, asyncio.LimitOverrunError):
+            raise _HttpError(431, "Request line or header too long")
+        
+        method, target, version = parts
+        return method.upper(), urlsplit(target).path, headers, version
+    
+    async def _dispatch(self, method, path, headers, reader, writer, keep_alive):
+        """
+        Answer one request.
+        
+        Returns:
+            bool: Whether the connection can be kept open.
+        """
+        routes = {
+            '/render': ('POST', self._render_request),
+            '/metrics': ('GET', self._metrics_request),
+            '/health': ('GET', self._health_request)
+        }
+        
+        if path not in routes:
+            if headers.get('content-length', '0') != '0':
+                keep_alive = False
+            await self._send_json(writer, 404, {'error': f"No such endpoint: {path}"}, keep_alive=keep_alive)
+            return keep_alive
+        
+        allowed, handler = routes[path]
+        if method != allowed:
+            await self._send_json(
+                writer, 405, {'error': f"Use {allowed} for {path}"},
+                headers={'Allow': allowed}, keep_alive=False
+            )
+            return False
+        
+        return await handler(headers, reader, writer, keep_alive)
+    
+    async def _metrics_request(self, headers, reader, writer, keep_alive):
+        await self._send_json(writer, 200, self.metrics(), keep_alive=keep_alive)
+        return keep_alive
+    
+    async def _health_request(self, headers, reader, writer, keep_alive):
+        await self._send_json(writer, 200, {'status': 'ok'}, keep_alive=keep_alive)
+        return keep_alive
+    
+    async def _render_request(self, headers, reader, writer, keep_alive):
+        """
+        Render a posted deck spec and send the .pptx back.
+        
+        Returns:
+            bool: Whether the connection can be kept open.
+        """
+        start = time.perf_counter()
+        
+        # Turn requests away before reading their bodies, so a burst costs
+        # no more memory than the queue holds
+        if self._pending >= self.workers + self.max_queue:
+            self.counts['rejected'] += 1
+            await self._send_json(
+                writer, 429, {'error': "Render queue is full, retry later"},
+                headers={'Retry-After': '1'}, keep_alive=False
+            )
+            return False
+        
+        if 'chunked' in headers.get('transfer-encoding', '').lower() or 'content-length' not in headers:
+            raise _HttpError(411, "Content-Length is required")
+        try:
+            length = int(headers['content-length'])
+        except ValueError:
+            raise _HttpError(400, "Invalid Content-Length")
+        if length < 0:
+            raise _HttpError(400, "Invalid Content-Length")
+        if length > self.max_body:
+            raise _HttpError(413, f"Deck spec exceeds {self.max_body} bytes")
+        
+        self._pending += 1
+        try:
+            body = await asyncio.wait_for(reader.readexactly(length), REQUEST_TIMEOUT)
+            data, render_time = await self._render(body)
+        
+        except (ConfigError, ValidationError) as e:
+            self.counts['invalid'] += 1
+            await self._send_json(writer, 400, {'error': str(e), 'errors': getattr(e, 'errors', [str(e)])},
+                                  keep_alive=keep_alive)
+            return keep_alive
+        
+        except PresentationError as e:
+            self.counts['failed'] += 1
+            error = {'error': str(e)}
+            if isinstance(e, RenderError) and e.slide_index is not None:
+                error['slide_index'] = e.slide_index
+            await self._send_json(writer, 500, error, keep_alive=keep_alive)
+            return keep_alive
+        
+        except BrokenProcessPool:
+            self.counts['failed'] += 1
+            await self._send_json(writer, 503, {'error': "Rendering worker failed"}, keep_alive=False)
+            return False
+        
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            # The client stalled or went away; there is no one to answer
+            raise
+        
+        except Exception as e:
+            self.counts['failed'] += 1
+            logger.exception("Unexpected error rendering a deck")
+            await self._send_json(writer, 500, {'error': f"Internal error: {type(e).__name__}"}, keep_alive=False)
+            return False
+        
+        finally:
+            self._pending -= 1
+        
+        self.counts['rendered'] += 1
+        self._latencies.append(time.perf_counter() - start)
+        self._render_times.append(render_time)
+        
+        await self._send(
+            writer, 200, data, PPTX_CONTENT_TYPE,
+            headers={'Content-Disposition': 'attachment; filename="presentation.pptx"'},
+            keep_alive=keep_alive
+        )
+        return keep_alive
+    
+    async def _render(self, body):
+        """
+        Render a deck spec in the pool once a worker is free.
+        
+        Args:
+            body (bytes): The YAML or JSON deck spec.
+        
+        Returns:
+            tuple: (.pptx package as bytes, rendering time in seconds).
+        
+        Raises:
+            BrokenProcessPool: If a worker died; the pool has been replaced.
+        """
+        async with self._slots:
+            self._in_flight += 1
+            pool = self._pool
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(pool, _render_job, body)
+            except BrokenProcessPool:
+                await self._restart_pool(pool)
+                raise
+            finally:
+                self._in_flight -= 1
+    
+    async def _send_json(self, writer, status, data, headers=None, keep_alive=True):
+        """
+        Send a JSON response.
+        """
+        body = json.dumps(data, indent=1).encode('utf-8')
+        await self._send(writer, status, body, 'application/json', headers, keep_alive)
+    
+    async def _send(self, writer, status, body, content_type, headers=None, keep_alive=True):
+        """
+        Send a response, writing the body in chunks as the client reads it.
+        
+        Args:
+            writer (asyncio.StreamWriter): The connection.
+            status (int): HTTP status code.
+            body (bytes): Response body.
+            content_type (str): Its media type.
+            headers (dict, optional): Additional headers.
+            keep_alive (bool): Whether the connection stays open.
+        """
+        lines = [
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}"
+        ]
+        lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        
+        view = memoryview(body)
+        for offset in range(0, len(view), RESPONSE_CHUNK_SIZE):
+            writer.write(view[offset:offset + RESPONSE_CHUNK_SIZE])
+            await writer.drain()
+        await writer.drain()
+
+def run_service(host='127.0.0.1', port=8080, **options):
+    """
+    Run the rendering service until interrupted with Ctrl+C.
+    
+    Args:
+        host (str): Address to listen on.
+        port (int): Port to listen on.
+        **options: Options for RenderService.
+    
+    Returns:
+        int: Exit status.
+    """
+    service = RenderService(**options)
+    previous_handlers = {signum: signal.signal(signum, _interrupt) for signum in (signal.SIGINT, signal.SIGTERM)}
+    
+    try:
+        asyncio.run(service.serve(host, port))
+    except KeyboardInterrupt:
+        logger.info("Stopping the rendering service")
+    except OSError as e:
+        logger.error(f"Cannot listen on {host}:{port}: {e}")
+        return 1
+    finally:
+        for signum, handler in previous_handlers.items():
+            signal.signal(signum, handler)
+        service.close()
+    return 0
+
+def _interrupt(signum, frame):
+    """
+    Turn SIGINT and SIGTERM into KeyboardInterrupt, so the service stops
+    cleanly even when started in the background with SIGINT ignored.
+    """
+    raise KeyboardInterrupt
+
+def _init_worker(template_path, log_level, image_options, package_options, files_root):
+    """
+    Initialize a rendering worker process.
+    
+    Args:
+        template_path (str, optional): Template every deck is built on.
+        log_level (int): Logging level for the worker.
+        image_options (dict, optional): Image optimization options.
+        package_options (dict): Package writing options.
+        files_root (str): Directory decks may read files from, or None.
+    """
+    logging.basicConfig(
+        level=log_level,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    logging.getLogger().setLevel(log_level)
+    
+    # Ctrl+C reaches the whole process group; the service shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    
+    _worker_state['template_path'] = template_path
+    _worker_state['image_options'] = image_options
+    _worker_state['package_options'] = package_options
+    _worker_state['files_root'] = files_root
+    warm_up([template_path] if template_path else ())
+
+def _ping():
+    """
+    Do nothing; used to start the workers before the first request.
+    """
+
+def _render_job(body):
+    """
+    Parse, validate and render a deck spec inside a worker process.
+    
+    Args:
+        body (bytes): The YAML or JSON deck spec.
+    
+    Returns:
+        tuple: (.pptx package as bytes, rendering time in seconds).
+    
+    Raises:
+        ValidationError: If the deck refers to files it may not read.
+    """
+    start = time.perf_counter()
+    config = load_config(body)
+    
+    errors = _file_errors(config, _worker_state.get('files_root'))
+    if errors:
+        raise ValidationError(errors)
+    
+    data = render_presentation(
+        config,
+        template=_worker_state.get('template_path'),
+        image_options=_worker_state.get('image_options'),
+        package_options=_worker_state.get('package_options')
+    )
+    return bytes(data), time.perf_counter() - start
+
+def _file_errors(config, files_root):
+    """
+    Check the files a deck refers to against the directory it may read.
+    
+    Paths are checked after variable substitution and with symbolic links
+    resolved, as the renderer would open them.
+    
+    Args:
+        config (dict): The parsed deck spec.
+        files_root (str): Real path of the allowed directory, or None if
+            decks may not refer to files at all.
+    
+    Returns:
+        list: Error messages.
+    """
+    variables = config.get('variables')
+    if isinstance(variables, dict):
+        config = get_variable_resolver(variables).resolve(config)
+    
+    errors = []
+    for path in dict.fromkeys(referenced_files(config)):
+        if files_root is None:
+            errors.append(f"Decks cannot refer to files on this service: {path}")
+        elif os.path.commonpath([os.path.realpath(path), files_root]) != files_root:
+            errors.append(f"File is outside the allowed directory: {path}")
+    return errors
+
+def _percentiles(samples):
+    """
+    Summarize durations by nearest-rank percentiles.
+    
+    Args:
+        samples (iterable): Durations in seconds.
+    
+    Returns:
+        dict: count, p50, p90, p99 and max, in milliseconds.
+    """
+    values = sorted(samples)
+    if not values:
+        return {'count': 0, 'p50': None, 'p90': None, 'p99': None, 'max': None}
+    
+    def rank(percent):
+        return round(values[max(0, -(-len(values) * percent // 100) - 1)] * 1000, 1)
+    
+    return {
+        'count': len(values),
+        'p50': rank(50),
+        'p90': rank(90),
+        'p99': rank(99),
+        'max': round(values[-1] * 1000, 1)
+    }
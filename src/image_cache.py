@@ -0,0 +1,257 @@
+"""
+Image Cache Module
+
+This module keeps image files in memory between uses so that decks which
+place the same picture on many slides read, hash and measure each file
+only once, and every use shares a single media part in the package.
+"""
+
+import os
+import hashlib
+import logging
+from collections import OrderedDict
+
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.parts.image import Image, ImagePart
+from pptx.util import Emu, Inches
+
+from src.utils import probe_image
+
+logger = logging.getLogger(__name__)
+
+# Default upper bound on the bytes held by the process-wide cache
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+class ImageCache:
+    """
+    A process-wide LRU cache of image bytes and their decoded properties.
+    
+    Entries are keyed by absolute path, modification time and size, so an
+    edited file is picked up on its next use. The total size of cached
+    image data is capped and the least recently used entries are evicted
+    first.
+    """
+    
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initialize an empty cache.
+        
+        Args:
+            max_bytes (int): Maximum total size of cached image data.
+        """
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, image_path):
+        """
+        Get the cached entry for an image file, loading it on a miss.
+        
+        Args:
+            image_path (str): Path to the image file.
+        
+        Returns:
+            dict: Entry with 'blob', 'sha1', 'filename', 'px_size' (width,
+                height) and 'dpi' (horizontal, vertical) keys.
+        """
+        stat = os.stat(image_path)
+        key = (os.path.abspath(image_path), stat.st_mtime_ns, stat.st_size)
+        
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+        
+        self.misses += 1
+        entry = self._load(image_path)
+        
+        if len(entry['blob']) <= self.max_bytes:
+            self._entries[key] = entry
+            self._bytes += len(entry['blob'])
+            self._evict()
+        
+        return entry
+    
+    def _load(self, image_path):
+        """
+        Read an image file and probe its size and resolution.
+        
+        Args:
+            image_path (str): Path to the image file.
+        
+        Returns:
+            dict: A new cache entry.
+        """
+        with open(image_path, 'rb') as f:
+            blob = f.read()
+        
+        info = probe_image(image_path)
+        if info is None:
+            raise ValueError(f"Unsupported or unreadable image: {image_path}")
+        width_px, height_px, dpi = info
+        
+        return {
+            'blob': blob,
+            'sha1': hashlib.sha1(blob).hexdigest(),
+            'filename': os.path.basename(image_path),
+            'px_size': (width_px, height_px),
+            'dpi': dpi
+        }
+    
+    def _evict(self):
+        """
+        Drop least recently used entries until the byte cap is respected.
+        """
+        while self._bytes > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= len(entry['blob'])
+            self.evictions += 1
+    
+    def clear(self):
+        """
+        Drop every cached image.
+        """
+        self._entries.clear()
+        self._bytes = 0
+    
+    def stats(self):
+        """
+        Get cache statistics.
+        
+        Returns:
+            dict: Dictionary with 'hits', 'misses', 'evictions', 'entries'
+                and 'bytes' keys.
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'bytes': self._bytes
+        }
+
+# Shared by every generator in the process
+image_cache = ImageCache()
+
+# Package attribute holding {sha1: ImagePart}, so each image is stored once
+# per output file. It lives on the package, which it references, so both are
+# freed together; a module-level map keyed by the package would keep it alive.
+PACKAGE_IMAGE_PARTS_ATTR = '_image_parts_by_sha1'
+
+def get_native_size(image_path):
+    """
+    Get the native size of an image file in EMU without inserting it.
+    
+    Args:
+        image_path (str): Path to the image file.
+        
+    Returns:
+        tuple: (width, height) as Emu lengths.
+    """
+    return native_size(image_cache.get(image_path))
+
+def native_size(entry):
+    """
+    Get the native size of a cached image in EMU.
+    
+    Uses the image's DPI, assuming 72 when none is recorded, the same way
+    python-pptx does.
+    
+    Args:
+        entry (dict): Image cache entry.
+    
+    Returns:
+        tuple: (width, height) as Emu lengths.
+    """
+    width_px, height_px = entry['px_size']
+    horz_dpi, vert_dpi = entry['dpi']
+    return (
+        Emu(int(Inches(1) * width_px / horz_dpi)),
+        Emu(int(Inches(1) * height_px / vert_dpi))
+    )
+
+def add_picture(shapes, image_path, left, top, width=None, height=None):
+    """
+    Add a picture to a slide, feeding it from the image cache.
+    
+    Behaves like shapes.add_picture(image_path, ...), but the file is only
+    read, hashed and measured on a cache miss, and all pictures showing the
+    same image share one media part in the package.
+    
+    Args:
+        shapes: The slide's shape collection.
+        image_path (str): Path to the image file.
+        left: Left position.
+        top: Top position.
+        width (optional): Width. Derived from the aspect ratio if omitted.
+        height (optional): Height. Derived from the aspect ratio if omitted.
+    
+    Returns:
+        Picture: The created picture shape.
+    """
+    entry = image_cache.get(image_path)
+    slide_part = shapes.part
+    image_part = _get_or_add_image_part(slide_part.package, entry)
+    rId = slide_part.relate_to(image_part, RT.IMAGE)
+    
+    width, height = _scale(entry, width, height)
+    
+    # Mirrors SlideShapes._add_pic_from_image_part, using the cached size
+    id_ = shapes._next_shape_id
+    pic = shapes._grpSp.add_pic(id_, "Picture %d" % (id_ - 1), image_part.desc, rId, left, top, width, height)
+    shapes._recalculate_extents()
+    return shapes._shape_factory(pic)
+
+def _get_or_add_image_part(package, entry):
+    """
+    Get the package's image part for a cached image, creating it if needed.
+    
+    Args:
+        package: The presentation package.
+        entry (dict): Image cache entry.
+    
+    Returns:
+        ImagePart: The image part holding the image.
+    """
+    parts = getattr(package, PACKAGE_IMAGE_PARTS_ATTR, None)
+    if parts is None:
+        parts = {}
+        setattr(package, PACKAGE_IMAGE_PARTS_ATTR, parts)
+    image_part = parts.get(entry['sha1'])
+    
+    if image_part is None:
+        image = Image.from_blob(entry['blob'], entry['filename'])
+        # The template may already contain this image
+        image_part = package._image_parts._find_by_sha1(entry['sha1']) or ImagePart.new(package, image)
+        parts[entry['sha1']] = image_part
+    
+    return image_part
+
+def _scale(entry, width, height):
+    """
+    Complete a (width, height) pair from the image's native size.
+    
+    Args:
+        entry (dict): Image cache entry.
+        width: Requested width, or None.
+        height: Requested height, or None.
+    
+    Returns:
+        tuple: (width, height) in EMU.
+    """
+    if width and height:
+        return width, height
+    
+    native_cx, native_cy = native_size(entry)
+    
+    if width:
+        return width, int(round(native_cy * float(width) / float(native_cx)))
+    
+    if height:
+        return int(round(native_cx * float(height) / float(native_cy))), height
+    
+    return native_cx, native_cy
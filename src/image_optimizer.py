@@ -0,0 +1,269 @@
+"""
+Image Optimizer Module
+
+This module shrinks oversized images before they are embedded. Each image
+is downsampled to the pixel size its frame needs at a target DPI and
+re-encoded (photos as JPEG, flat art as a palette PNG). Results are kept in
+a disk cache keyed by the image's content hash and the optimization
+parameters, so later builds reuse them without touching Pillow.
+"""
+
+import os
+import hashlib
+import logging
+import tempfile
+
+from PIL import Image
+
+from src.image_cache import image_cache
+
+logger = logging.getLogger(__name__)
+
+# Default resolution images are downsampled to, in pixels per inch
+DEFAULT_DPI = 150
+
+# Default JPEG quality for re-encoded photos
+DEFAULT_JPEG_QUALITY = 85
+
+# Bumped whenever the encoding rules change, invalidating old cache entries
+CACHE_VERSION = 1
+
+# Formats the optimizer will re-encode; anything else is embedded as-is
+OPTIMIZABLE_FORMATS = ('PNG', 'JPEG', 'BMP', 'TIFF')
+
+# Images with at most this many distinct colors are treated as flat art
+FLAT_ART_MAX_COLORS = 256
+
+EMU_PER_INCH = 914400
+
+def default_cache_dir():
+    """
+    Get the default directory for optimized images.
+    
+    Returns:
+        str: $XDG_CACHE_HOME/ppt-automator/images, or ~/.cache/... when unset.
+    """
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'ppt-automator', 'images')
+
+class ImageOptimizer:
+    """
+    Downsample and re-encode images to fit the frames they are shown in.
+    """
+    
+    def __init__(self, dpi=DEFAULT_DPI, quality=DEFAULT_JPEG_QUALITY, cache_dir=None):
+        """
+        Initialize the optimizer.
+        
+        Args:
+            dpi (int): Target resolution for the displayed image.
+            quality (int): JPEG quality used when re-encoding photos.
+            cache_dir (str, optional): Directory for optimized images.
+                Defaults to default_cache_dir().
+        """
+        self.dpi = dpi
+        self.quality = quality
+        self.cache_dir = cache_dir or default_cache_dir()
+        # (sha1, target size) -> path, so repeated uses skip the disk lookup
+        self._resolved = {}
+        self.stats = {'optimized': 0, 'cached': 0, 'skipped': 0, 'bytes_saved': 0}
+    
+    def optimize(self, image_path, width, height):
+        """
+        Get the path of the image to embed for a frame of the given size.
+        
+        Args:
+            image_path (str): Path to the source image.
+            width (int): Frame width in EMU.
+            height (int): Frame height in EMU.
+        
+        Returns:
+            str: Path to an optimized copy, or image_path when the source
+                is already small enough or cannot be improved.
+        """
+        entry = image_cache.get(image_path)
+        target = self._target_size(entry['px_size'], width, height)
+        key = (entry['sha1'], target)
+        
+        if key in self._resolved:
+            return self._resolved[key] or image_path
+        
+        try:
+            result = self._optimize_cached(image_path, entry, target)
+        except Exception as e:
+            logger.warning(f"Image optimization failed for {image_path}: {e}")
+            result = None
+        
+        self._resolved[key] = result
+        return result or image_path
+    
+    def _target_size(self, px_size, width, height):
+        """
+        Compute the pixel size an image needs to fill its frame at the target DPI.
+        
+        Args:
+            px_size (tuple): Source (width, height) in pixels.
+            width (int): Frame width in EMU.
+            height (int): Frame height in EMU.
+        
+        Returns:
+            tuple: Target (width, height) in pixels, never larger than the source.
+        """
+        src_w, src_h = px_size
+        need_w = max(1, int(round(int(width) * self.dpi / EMU_PER_INCH)))
+        need_h = max(1, int(round(int(height) * self.dpi / EMU_PER_INCH)))
+        
+        # Keep the aspect ratio; the frame may stretch the image either way
+        scale = min(1.0, max(need_w / src_w, need_h / src_h))
+        return max(1, int(round(src_w * scale))), max(1, int(round(src_h * scale)))
+    
+    def _optimize_cached(self, image_path, entry, target):
+        """
+        Look up or produce the optimized image in the disk cache.
+        
+        Args:
+            image_path (str): Path to the source image.
+            entry (dict): Image cache entry for the source.
+            target (tuple): Target (width, height) in pixels.
+        
+        Returns:
+            str: Path to the optimized image, or None to use the source.
+        """
+        digest = hashlib.sha1(
+            f"{entry['sha1']}:{target[0]}x{target[1]}:{self.dpi}:{self.quality}:{CACHE_VERSION}".encode('ascii')
+        ).hexdigest()
+        base = os.path.join(self.cache_dir, digest[:2], digest)
+        
+        for ext in ('.jpg', '.png'):
+            if os.path.exists(base + ext):
+                self.stats['cached'] += 1
+                return base + ext
+        
+        # A marker records that optimizing this image did not pay off
+        if os.path.exists(base + '.skip'):
+            self.stats['skipped'] += 1
+            return None
+        
+        encoded = self._encode(image_path, entry, target)
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        
+        if encoded is None:
+            _write_atomic(base + '.skip', b'')
+            self.stats['skipped'] += 1
+            return None
+        
+        blob, ext = encoded
+        _write_atomic(base + ext, blob)
+        self.stats['optimized'] += 1
+        self.stats['bytes_saved'] += len(entry['blob']) - len(blob)
+        logger.debug(
+            f"Optimized {image_path}: {entry['px_size'][0]}x{entry['px_size'][1]} -> "
+            f"{target[0]}x{target[1]}, {len(entry['blob'])} -> {len(blob)} bytes"
+        )
+        return base + ext
+    
+    def _encode(self, image_path, entry, target):
+        """
+        Downsample and re-encode an image.
+        
+        Args:
+            image_path (str): Path to the source image.
+            entry (dict): Image cache entry for the source.
+            target (tuple): Target (width, height) in pixels.
+        
+        Returns:
+            tuple: (blob, extension), or None if the result would not be
+                smaller than the source.
+        """
+        with Image.open(image_path) as img:
+            if img.format not in OPTIMIZABLE_FORMATS or getattr(img, 'n_frames', 1) > 1:
+                return None
+            
+            source_format = img.format
+            exif = img.info.get('exif')
+            img.load()
+            
+            if target != img.size:
+                if img.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+                    img = img.convert('RGBA' if _has_alpha(img) else 'RGB')
+                img = img.resize(target, Image.LANCZOS)
+            elif source_format == 'JPEG':
+                # Re-encoding a JPEG at the same size only loses quality
+                return None
+            
+            blob, ext = self._reencode(img, source_format, exif)
+        
+        if len(blob) >= len(entry['blob']):
+            return None
+        
+        return blob, ext
+    
+    def _reencode(self, img, source_format, exif):
+        """
+        Encode a decoded image in the most compact suitable format.
+        
+        Images with transparency stay PNG, flat art with few colors becomes a
+        palette PNG, and everything else is saved as JPEG.
+        
+        Args:
+            img (PIL.Image.Image): The (resized) image.
+            source_format (str): Format of the source file.
+            exif (bytes, optional): EXIF data to carry over to JPEG output.
+        
+        Returns:
+            tuple: (blob, extension)
+        """
+        out = tempfile.SpooledTemporaryFile()
+        alpha = _has_alpha(img)
+        
+        if img.mode == 'P' or (source_format != 'JPEG' and img.getcolors(FLAT_ART_MAX_COLORS) is not None):
+            # Flat art: a palette keeps edges crisp and compresses well
+            if img.mode != 'P':
+                img = img.convert('RGBA' if alpha else 'RGB')
+                img = img.quantize(colors=FLAT_ART_MAX_COLORS, method=Image.Quantize.FASTOCTREE if alpha else Image.Quantize.MEDIANCUT)
+            img.save(out, 'PNG', optimize=True, dpi=(self.dpi, self.dpi))
+            ext = '.png'
+        elif alpha:
+            img.save(out, 'PNG', optimize=True, dpi=(self.dpi, self.dpi))
+            ext = '.png'
+        else:
+            if img.mode not in ('RGB', 'L'):
+                img = img.convert('RGB')
+            options = {'quality': self.quality, 'optimize': True, 'dpi': (self.dpi, self.dpi)}
+            if exif:
+                options['exif'] = exif
+            img.save(out, 'JPEG', **options)
+            ext = '.jpg'
+        
+        out.seek(0)
+        return out.read(), ext
+
+def _has_alpha(img):
+    """
+    Check whether an image has an alpha channel or transparent palette entry.
+    
+    Args:
+        img (PIL.Image.Image): The image.
+    
+    Returns:
+        bool: True if the image may contain transparency.
+    """
+    return img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info
+
+def _write_atomic(path, blob):
+    """
+    Write a file so that concurrent readers never see a partial result.
+    
+    Args:
+        path (str): Destination path.
+        blob (bytes): File contents.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(blob)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,302 @@
+"""
+Incremental Build Module
+
+This module lets a deck be rebuilt without re-rendering the slides that
+did not change. Every slide is hashed from its resolved mapping, the hash
+of the deck-wide inputs (settings, theme, template, generator code) and
+the contents of the files it references. The hashes are stored in a build
+manifest next to the output; on the next build the previous output is
+opened, its slides whose hash is unchanged are kept as they are, and only
+new or edited slides are rendered.
+"""
+
+import os
+import json
+import glob
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bump when the manifest layout or slide hashing changes
+MANIFEST_VERSION = 1
+
+# The manifest is stored next to the output as <output>.manifest.json
+MANIFEST_SUFFIX = '.manifest.json'
+
+# Slide keys whose string values name files the slide is rendered from
+FILE_KEYS = ('path', 'image', 'source')
+
+# Chunk size for hashing file contents
+HASH_CHUNK_SIZE = 1024 * 1024
+
+_SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def get_manifest_path(output_path):
+    """
+    Get the path of the build manifest for an output file.
+    
+    Args:
+        output_path (str): Path of the generated presentation.
+    
+    Returns:
+        str: Path of its manifest.
+    """
+    return output_path + MANIFEST_SUFFIX
+
+class FileHasher:
+    """
+    Hashes file contents, skipping files whose size and mtime are unchanged
+    since the previous build.
+    """
+    
+    def __init__(self, previous=None):
+        """
+        Initialize the hasher.
+        
+        Args:
+            previous (dict, optional): The 'files' section of the previous
+                manifest, mapping absolute paths to their stat and hash.
+        """
+        self.previous = previous or {}
+        self.files = {}
+    
+    def hash(self, path):
+        """
+        Get the content hash of a file.
+        
+        Args:
+            path (str): File path.
+        
+        Returns:
+            str: Hex SHA-1 of the contents, or None if the file does not exist.
+        """
+        path = os.path.abspath(path)
+        entry = self.files.get(path)
+        if entry is not None:
+            return entry['sha1']
+        
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        
+        entry = self.previous.get(path)
+        if entry is None or entry['mtime_ns'] != stat.st_mtime_ns or entry['size'] != stat.st_size:
+            digest = hashlib.sha1()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+            entry = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha1': digest.hexdigest()}
+        
+        self.files[path] = entry
+        return entry['sha1']
+
+class IncrementalBuild:
+    """
+    Tracks the slide hashes of one output file across builds.
+    """
+    
+    def __init__(self, output_path):
+        """
+        Initialize the build and read the previous manifest, if any.
+        
+        Args:
+            output_path (str): Path of the generated presentation.
+        """
+        self.output_path = output_path
+        self.manifest_path = get_manifest_path(output_path)
+        self.previous = self._load_manifest()
+        self.hasher = FileHasher(self.previous.get('files') if self.previous else None)
+        self.deck_hash = None
+        self.slide_hashes = []
+    
+    def _load_manifest(self):
+        """
+        Read the previous manifest if it matches the current output file.
+        
+        Returns:
+            dict: The manifest, or None if there is no usable one.
+        """
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+            stat = os.stat(self.output_path)
+        except (OSError, ValueError):
+            return None
+        
+        if manifest.get('version') != MANIFEST_VERSION:
+            logger.debug("Build manifest has a different version, ignoring it")
+            return None
+        
+        # The output was replaced or edited since it was built
+        output = manifest.get('output', {})
+        if output.get('mtime_ns') != stat.st_mtime_ns or output.get('size') != stat.st_size:
+            logger.debug("Output changed since the last build, ignoring the build manifest")
+            return None
+        
+        return manifest
+    
+    def hash_deck(self, settings, theme_settings, template_path=None, options=None):
+        """
+        Hash the inputs that affect every slide.
+        
+        Args:
+            settings (dict): The configuration's resolved 'settings' section.
+            theme_settings (dict): Theme settings after the settings were applied.
+            template_path (str, optional): The template file, if any.
+            options (dict, optional): Generation options given outside the
+                configuration, such as image optimization.
+        
+        Returns:
+            str: The deck hash.
+        """
+        sources = sorted(glob.glob(os.path.join(_SOURCE_DIR, '*.py')))
+        inputs = {
+            'settings': settings,
+            'theme': theme_settings,
+            'template': self.hasher.hash(template_path) if template_path else None,
+            'options': options or {},
+            'generator': [self.hasher.hash(path) for path in sources]
+        }
+        self.deck_hash = _hash_json(inputs)
+        return self.deck_hash
+    
+    def hash_slide(self, slide_data):
+        """
+        Hash one slide and record the hash.
+        
+        Args:
+            slide_data (dict): The slide mapping with variables resolved.
+        
+        Returns:
+            str: The slide hash.
+        """
+        files = {path: self.hasher.hash(path) for path in referenced_files(slide_data)}
+        slide_hash = _hash_json({'deck': self.deck_hash, 'slide': slide_data, 'files': files})
+        self.slide_hashes.append(slide_hash)
+        return slide_hash
+    
+    def reusable_slides(self):
+        """
+        Match the current slides with the slides of the previous build.
+        
+        Slides are matched by hash, so unchanged slides are found again
+        even after slides were inserted, removed or moved.
+        
+        Returns:
+            list: For each current slide, the index of the previous slide
+                it can reuse or None; None instead of a list if the
+                previous build cannot be reused at all.
+        """
+        if not self.previous or self.previous.get('deck') != self.deck_hash:
+            return None
+        
+        available = {}
+        for index, entry in enumerate(self.previous['slides']):
+            available.setdefault(entry['hash'], []).append(index)
+        
+        reuse = []
+        for slide_hash in self.slide_hashes:
+            indices = available.get(slide_hash)
+            reuse.append(indices.pop(0) if indices else None)
+        
+        return reuse
+    
+    def previous_slide_counts(self):
+        """
+        Get the number of presentation slides each previous slide produced.
+        
+        Returns:
+            list: Slide counts; more than one for paginated tables.
+        """
+        return [entry['count'] for entry in self.previous['slides']]
+    
+    def write_manifest(self, slide_counts):
+        """
+        Write the manifest for the output that was just saved.
+        
+        Args:
+            slide_counts (list): Number of presentation slides produced by
+                each configuration slide.
+        """
+        stat = os.stat(self.output_path)
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'output': {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size},
+            'deck': self.deck_hash,
+            'slides': [
+                {'hash': slide_hash, 'count': count}
+                for slide_hash, count in zip(self.slide_hashes, slide_counts)
+            ],
+            'files': self.hasher.files
+        }
+        
+        temp_path = self.manifest_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(temp_path, self.manifest_path)
+        logger.debug(f"Build manifest written to {self.manifest_path}")
+
+def reorder_slides(prs, slide_groups, keep):
+    """
+    Put a presentation's slides in a new order, removing the others.
+    
+    Args:
+        prs: The presentation.
+        slide_groups (list): Lists of sldId elements, in the new order.
+        keep (set): sldId elements of slide_groups; every other slide is
+            removed from the presentation.
+    """
+    prs_part = prs.part
+    sldIdLst = prs_part._element.get_or_add_sldIdLst()
+    
+    for sldId in list(sldIdLst):
+        sldIdLst.remove(sldId)
+        if sldId not in keep:
+            prs_part.drop_rel(sldId.rId)
+    
+    rIds = []
+    for group in slide_groups:
+        for sldId in group:
+            sldIdLst.append(sldId)
+            rIds.append(sldId.rId)
+    
+    # Number the slide parts in presentation order, as a full build does
+    prs_part.rename_slide_parts(rIds)
+
+def referenced_files(data):
+    """
+    Find the files a slide mapping refers to.
+    
+    Args:
+        data: The resolved slide mapping, or a list of them.
+    
+    Yields:
+        str: Each referenced path.
+    """
+    if isinstance(data, dict):
+        for key, value in data.items():
+            if key in FILE_KEYS:
+                if isinstance(value, str):
+                    yield value
+                elif isinstance(value, dict) and isinstance(value.get('path'), str):
+                    yield value['path']
+            yield from referenced_files(value)
+    
+    elif isinstance(data, list):
+        for item in data:
+            yield from referenced_files(item)
+
+def _hash_json(data):
+    """
+    Hash a JSON-compatible structure, independent of mapping order.
+    
+    Args:
+        data: The structure; values JSON cannot represent are hashed as strings.
+    
+    Returns:
+        str: Hex SHA-1 digest.
+    """
+    text = json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
@@ -0,0 +1,482 @@
+"""
+Package Writer Module
+
+This module saves presentations with its own ZIP writer instead of
+python-pptx's, which deflates every part one after another at the default
+level on every save. Parts in formats that are already compressed (images,
+embedded workbooks) are stored as they are, large parts are deflated in a
+thread pool (zlib releases the GIL) and written in order as they complete,
+and the archive is streamed to a file or any writable binary stream. When a
+previous build of the same file is given, parts whose bytes did not change
+are copied from it still compressed, so rebuilding a deck with many images
+only compresses the parts that actually changed.
+"""
+
+import os
+import time
+import zlib
+import struct
+import zipfile
+import logging
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from pptx.opc.package import XmlPart
+from pptx.opc.serialized import PackageWriter
+
+logger = logging.getLogger(__name__)
+
+# zlib compression level for deflated parts; 0 stores every part
+DEFAULT_COMPRESSION_LEVEL = 6
+
+# Threads deflating parts; deflate scales with cores, the ZIP writer does not
+DEFAULT_THREADS = min(4, os.cpu_count() or 1)
+
+# Extensions of formats that are compressed already; deflating them again
+# costs time and saves next to nothing
+STORED_EXTENSIONS = frozenset((
+    'png', 'jpg', 'jpeg', 'gif', 'webp', 'wdp',
+    'xlsx', 'xlsm', 'docx', 'pptx', 'zip',
+    'mp3', 'mp4', 'm4a', 'm4v', 'mov'
+))
+
+# Smaller parts are deflated on the writing thread
+PARALLEL_MIN_SIZE = 64 * 1024
+
+# Deflated parts waiting to be written, per thread; bounds memory use
+PENDING_PER_THREAD = 4
+
+# ZIP record layouts (APPNOTE.TXT 4.3.7, 4.3.12 and 4.3.16)
+_LOCAL_HEADER = struct.Struct('<4s2B4HL2L2H')
+_CENTRAL_HEADER = struct.Struct('<4s4B4HL2L5H2L')
+_END_OF_CENTRAL_DIR = struct.Struct('<4s4H2LH')
+
+_LOCAL_SIGNATURE = b'PK\x03\x04'
+_CENTRAL_SIGNATURE = b'PK\x01\x02'
+_END_SIGNATURE = b'PK\x05\x06'
+
+# Version needed to extract: 2.0 (deflate)
+_ZIP_VERSION = 20
+
+# Above these limits a ZIP64 archive would be needed
+_ZIP32_MAX_SIZE = 0xFFFFFFFF
+_ZIP32_MAX_ENTRIES = 0xFFFF
+
+def get_binary_parts(prs):
+    """
+    Get the binary (media and embedded) parts of a presentation.
+    
+    Taken right after opening a previous build, this tells save_presentation
+    which parts it can copy from that file without comparing their bytes.
+    
+    Args:
+        prs: The presentation.
+    
+    Returns:
+        dict: Each binary part mapped to its current member name.
+    """
+    return {
+        part: part.partname.membername
+        for part in prs.part.package.iter_parts()
+        if not isinstance(part, XmlPart)
+    }
+
+def write_package(prs, fileobj, level=DEFAULT_COMPRESSION_LEVEL, threads=DEFAULT_THREADS,
+                  previous=None, previous_parts=None):
+    """
+    Write a presentation to a binary file object.
+    
+    The archive is written sequentially, so fileobj need not be seekable.
+    
+    Args:
+        prs: The presentation to write.
+        fileobj: Writable binary file object.
+        level (int): zlib compression level, 0 to 9; 0 stores every part,
+            which suits packages only passed between processes.
+        threads (int): Threads deflating large parts; 1 deflates them on
+            the calling thread.
+        previous (zipfile.ZipFile, optional): A previous build whose
+            unchanged parts are copied instead of compressed again.
+        previous_parts (dict, optional): Binary parts loaded from previous,
+            from get_binary_parts(). They are never modified, so they are
+            copied without comparing their contents.
+    
+    Returns:
+        dict: Number of parts compressed, stored and copied.
+    
+    Raises:
+        ValueError: If the package exceeds the ZIP32 limits.
+    """
+    package = prs.part.package
+    writer = _ReusingPackageWriter(
+        fileobj, package._rels, tuple(package.iter_parts()), previous, previous_parts or {}, level, threads
+    )
+    writer._write()
+    return writer.stats
+
+def save_presentation(prs, output, previous_path=None, previous_parts=None,
+                      level=DEFAULT_COMPRESSION_LEVEL, threads=DEFAULT_THREADS):
+    """
+    Save a presentation, reusing the compressed parts of a previous file.
+    
+    A path is written through a temporary file next to it that is then
+    moved into place, so previous_path may be the output path itself.
+    
+    Args:
+        prs: The presentation to save.
+        output (str or file-like): Path of the file to write, or a writable
+            binary stream.
+        previous_path (str, optional): A previous build whose unchanged
+            parts are copied instead of compressed again.
+        previous_parts (dict, optional): Binary parts loaded from
+            previous_path, from get_binary_parts().
+        level (int): zlib compression level, 0 to 9.
+        threads (int): Threads deflating large parts.
+    """
+    try:
+        previous = zipfile.ZipFile(previous_path) if previous_path and os.path.exists(previous_path) else None
+    except zipfile.BadZipFile:
+        previous = None
+    
+    try:
+        if hasattr(output, 'write'):
+            _save_to_stream(prs, output, previous, previous_parts, level, threads)
+        else:
+            _save_to_path(prs, output, previous, previous_parts, level, threads)
+    
+    finally:
+        if previous is not None:
+            previous.close()
+
+def _save_to_path(prs, output_path, previous, previous_parts, level, threads):
+    """
+    Save a presentation to a file through a temporary file.
+    """
+    temp_path = f"{output_path}.{os.getpid()}.tmp"
+    
+    try:
+        with open(temp_path, 'wb') as f:
+            stats = write_package(prs, f, level, threads, previous, previous_parts)
+        os.replace(temp_path, output_path)
+        logger.debug(f"Saved {output_path}: {stats}")
+    
+    except ValueError as e:
+        # Too large for a ZIP32 archive, which python-pptx's writer can handle
+        logger.debug(f"{e}; saving with python-pptx")
+        prs.save(output_path)
+    
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def _save_to_stream(prs, stream, previous, previous_parts, level, threads):
+    """
+    Save a presentation to a writable binary stream.
+    """
+    start = stream.tell() if _seekable(stream) else None
+    
+    try:
+        stats = write_package(prs, stream, level, threads, previous, previous_parts)
+        logger.debug(f"Saved to stream: {stats}")
+    
+    except ValueError as e:
+        # Part of the package is written already; start over if possible
+        if start is None:
+            raise
+        logger.debug(f"{e}; saving with python-pptx")
+        stream.seek(start)
+        stream.truncate()
+        prs.save(stream)
+
+def _seekable(stream):
+    """
+    Check whether a stream can be rewound.
+    """
+    try:
+        return stream.seekable()
+    except (AttributeError, OSError, ValueError):
+        return False
+
+class _ReusingPackageWriter(PackageWriter):
+    """
+    python-pptx's PackageWriter, writing through a _ZipWriter.
+    """
+    
+    def __init__(self, pkg_file, pkg_rels, parts, previous, previous_parts,
+                 level=DEFAULT_COMPRESSION_LEVEL, threads=DEFAULT_THREADS):
+        super().__init__(pkg_file, pkg_rels, parts)
+        self._previous = previous
+        self._previous_parts = previous_parts
+        self._level = level
+        self._threads = threads
+        self.stats = None
+    
+    def _write(self):
+        """
+        Write the package, as PackageWriter._write does.
+        """
+        phys_writer = _ZipWriter(self._pkg_file, self._previous, self._level, self._threads)
+        try:
+            self._write_content_types_stream(phys_writer)
+            self._write_pkg_rels(phys_writer)
+            self._write_parts(phys_writer)
+            phys_writer.close()
+        finally:
+            phys_writer.shutdown()
+        self.stats = phys_writer.stats
+    
+    def _write_parts(self, phys_writer):
+        """
+        Write each part and its relationships, copying unchanged binary parts.
+        """
+        for part in self._parts:
+            membername = part.partname.membername
+            if self._previous_parts.get(part) != membername or not phys_writer.copy(membername):
+                phys_writer.write(part.partname, part.blob)
+            if part._rels:
+                phys_writer.write(part.partname.rels_uri, part.rels.xml)
+
+class _ZipWriter:
+    """
+    Minimal streaming ZIP archive writer that deflates large entries in a
+    thread pool and can copy entries from another archive.
+    """
+    
+    def __init__(self, fileobj, previous=None, level=DEFAULT_COMPRESSION_LEVEL, threads=DEFAULT_THREADS):
+        """
+        Initialize the writer.
+        
+        Args:
+            fileobj: Binary file to write the archive to.
+            previous (zipfile.ZipFile, optional): Archive to copy unchanged
+                entries from.
+            level (int): zlib compression level; 0 stores every entry.
+            threads (int): Threads deflating large entries.
+        """
+        self._file = fileobj
+        self._previous = previous
+        self._level = level
+        self._pool = ThreadPoolExecutor(max_workers=threads) if threads > 1 and level > 0 else None
+        self._max_pending = max(1, threads) * PENDING_PER_THREAD
+        self._pending = deque()
+        self._entries = []
+        self._offset = 0
+        self._dos_time, self._dos_date = _dos_timestamp(time.localtime())
+        self.stats = {'compressed': 0, 'stored': 0, 'copied': 0}
+    
+    def write(self, pack_uri, blob):
+        """
+        Add a part to the archive (the python-pptx physical writer interface).
+        
+        Args:
+            pack_uri (PackURI): The part's URI.
+            blob (bytes): The part's contents.
+        """
+        name = pack_uri.membername
+        method = self._method(name)
+        
+        if method == zipfile.ZIP_STORED:
+            self.stats['stored'] += 1
+            self._queue(name, method, (zlib.crc32(blob), blob), len(blob))
+            return
+        
+        previous = self._previous_entry(name, blob)
+        if previous is not None:
+            self.stats['copied'] += 1
+            self._queue(name, method, previous, len(blob))
+            return
+        
+        self.stats['compressed'] += 1
+        if self._pool is not None and len(blob) >= PARALLEL_MIN_SIZE:
+            self._queue(name, method, self._pool.submit(_deflate, blob, self._level), len(blob))
+        else:
+            self._queue(name, method, _deflate(blob, self._level), len(blob))
+    
+    def copy(self, name):
+        """
+        Copy an entry from the previous archive as it is.
+        
+        Args:
+            name (str): Member name.
+        
+        Returns:
+            bool: True if the entry was copied, False if it is not there
+                or is not stored the way it would be written now.
+        """
+        info = self._previous.NameToInfo.get(name) if self._previous is not None else None
+        if info is None or info.compress_type != self._method(name):
+            return False
+        
+        self._queue(name, info.compress_type, (info.CRC, self._read_raw(info)), info.file_size)
+        self.stats['copied'] += 1
+        return True
+    
+    def _method(self, name):
+        """
+        Get the compression method for a member.
+        
+        Args:
+            name (str): Member name.
+        
+        Returns:
+            int: zipfile.ZIP_STORED or zipfile.ZIP_DEFLATED.
+        """
+        extension = name.rpartition('.')[2].lower()
+        if self._level == 0 or extension in STORED_EXTENSIONS:
+            return zipfile.ZIP_STORED
+        return zipfile.ZIP_DEFLATED
+    
+    def _previous_entry(self, name, blob):
+        """
+        Get the compressed data of an identical entry in the previous archive.
+        
+        Args:
+            name (str): Member name.
+            blob (bytes): The new contents.
+        
+        Returns:
+            tuple: (crc, deflated data), or None if there is no identical entry.
+        """
+        if self._previous is None:
+            return None
+        
+        info = self._previous.NameToInfo.get(name)
+        if info is None or info.compress_type != zipfile.ZIP_DEFLATED or info.file_size != len(blob):
+            return None
+        
+        # Equal size and CRC are only a hint; compare the actual contents
+        if info.CRC != zlib.crc32(blob) or self._previous.read(name) != blob:
+            return None
+        
+        return info.CRC, self._read_raw(info)
+    
+    def _read_raw(self, info):
+        """
+        Read an entry's compressed data from the previous archive.
+        
+        Args:
+            info (zipfile.ZipInfo): The entry.
+        
+        Returns:
+            bytes: The compressed data.
+        """
+        fp = self._previous.fp
+        fp.seek(info.header_offset)
+        header = _LOCAL_HEADER.unpack(fp.read(_LOCAL_HEADER.size))
+        fp.seek(header[-2] + header[-1], os.SEEK_CUR)
+        return fp.read(info.compress_size)
+    
+    def _queue(self, name, method, result, size):
+        """
+        Queue an entry and write the entries ahead of it that are ready.
+        
+        Args:
+            name (str): Member name.
+            method (int): Compression method.
+            result: (crc, data) tuple, or a Future that resolves to one.
+            size (int): Uncompressed size.
+        """
+        self._pending.append((name, method, result, size))
+        self._flush(self._max_pending)
+    
+    def _flush(self, limit):
+        """
+        Write queued entries in order.
+        
+        Stops at the first entry still being deflated, unless more than
+        limit entries are queued, in which case it waits for that entry.
+        
+        Args:
+            limit (int): Number of entries that may stay queued.
+        """
+        while self._pending:
+            name, method, result, size = self._pending[0]
+            if isinstance(result, Future):
+                if not result.done() and len(self._pending) <= limit:
+                    return
+                result = result.result()
+            
+            self._pending.popleft()
+            crc, raw = result
+            self._add_entry(name, method, crc, raw, size)
+    
+    def _add_entry(self, name, method, crc, raw, size):
+        """
+        Write a local header and the entry's data.
+        """
+        encoded = name.encode('utf-8')
+        flags = 0x800 if not encoded.isascii() else 0
+        
+        if self._offset + len(raw) > _ZIP32_MAX_SIZE or len(self._entries) >= _ZIP32_MAX_ENTRIES:
+            raise ValueError("Package exceeds the ZIP32 limits")
+        
+        self._file.write(_LOCAL_HEADER.pack(
+            _LOCAL_SIGNATURE, _ZIP_VERSION, 0, flags, method, self._dos_time, self._dos_date,
+            crc, len(raw), size, len(encoded), 0
+        ))
+        self._file.write(encoded)
+        self._file.write(raw)
+        
+        self._entries.append((encoded, flags, method, crc, len(raw), size, self._offset))
+        self._offset += _LOCAL_HEADER.size + len(encoded) + len(raw)
+    
+    def close(self):
+        """
+        Write the remaining entries and the central directory.
+        """
+        self._flush(0)
+        
+        start = self._offset
+        for encoded, flags, method, crc, compress_size, size, offset in self._entries:
+            self._file.write(_CENTRAL_HEADER.pack(
+                _CENTRAL_SIGNATURE, _ZIP_VERSION, 0, _ZIP_VERSION, 0, flags, method,
+                self._dos_time, self._dos_date, crc, compress_size, size, len(encoded), 0, 0, 0, 0, 0, offset
+            ))
+            self._file.write(encoded)
+            self._offset += _CENTRAL_HEADER.size + len(encoded)
+        
+        if self._offset > _ZIP32_MAX_SIZE:
+            raise ValueError("Package exceeds the ZIP32 limits")
+        
+        count = len(self._entries)
+        self._file.write(_END_OF_CENTRAL_DIR.pack(
+            _END_SIGNATURE, 0, 0, count, count, self._offset - start, start, 0
+        ))
+    
+    def shutdown(self):
+        """
+        Stop the deflate threads.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+def _deflate(blob, level):
+    """
+    Compute the CRC-32 of a part and deflate it.
+    
+    Args:
+        blob (bytes): The part's contents.
+        level (int): zlib compression level.
+    
+    Returns:
+        tuple: (crc, raw deflate data).
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return zlib.crc32(blob), compressor.compress(blob) + compressor.flush()
+
+def _dos_timestamp(local_time):
+    """
+    Convert a local time to the ZIP (MS-DOS) time and date fields.
+    
+    Args:
+        local_time (time.struct_time): The time.
+    
+    Returns:
+        tuple: (time, date) as 16-bit integers.
+    """
+    year = max(local_time.tm_year, 1980)
+    return (
+        (local_time.tm_hour << 11) | (local_time.tm_min << 5) | (local_time.tm_sec // 2),
+        ((year - 1980) << 9) | (local_time.tm_mon << 5) | local_time.tm_mday
+    )
@@ -0,0 +1,324 @@
+"""
+Parallel Rendering Module
+
+This module builds the slides of one deck in several worker processes.
+The slides are split into consecutive chunks; each worker renders its
+chunk into a presentation based on the same template with the usual
+SlideBuilder and ElementFactory, and hands it back as an uncompressed
+package. The parent then moves the slide parts, with their images, charts
+and workbooks, into the final presentation chunk by chunk in the original
+order. Images and workbooks shared between chunks are stored once, and
+parts are numbered as a serial build numbers them.
+"""
+
+import io
+import os
+import re
+import math
+import hashlib
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+from pptx import Presentation
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.package import _Relationship
+from pptx.opc.packuri import PackURI
+from pptx.parts.image import ImagePart
+from pptx.parts.embeddedpackage import EmbeddedPackagePart
+
+from src.template_cache import load_template
+from src.package_writer import write_package
+from src.errors import RenderError
+
+logger = logging.getLogger(__name__)
+
+# Chunks per worker; more chunks balance uneven slides better, fewer
+# chunks cost less template loading and merging
+CHUNKS_PER_WORKER = 4
+
+# Smallest number of slides worth sending to a worker
+MIN_CHUNK_SIZE = 8
+
+# Splits partnames like /ppt/media/image12.png into prefix, number, extension
+_PARTNAME_PATTERN = re.compile(r'^(.*?)(\d+)(\.\w+)$')
+
+# Per-process state populated by the pool initializer
+_worker_state = {}
+
+def split_chunks(count, workers, chunk_size=None):
+    """
+    Split a number of slides into consecutive chunks.
+    
+    Args:
+        count (int): Number of slides.
+        workers (int): Number of worker processes.
+        chunk_size (int, optional): Slides per chunk. By default about
+            CHUNKS_PER_WORKER chunks per worker, of at least MIN_CHUNK_SIZE.
+    
+    Returns:
+        list: (start, stop) index pairs.
+    """
+    if chunk_size is None:
+        chunk_size = max(MIN_CHUNK_SIZE, math.ceil(count / (workers * CHUNKS_PER_WORKER)))
+    return [(start, min(start + chunk_size, count)) for start in range(0, count, chunk_size)]
+
+def render_parallel(generator, config, workers, chunk_size=None):
+    """
+    Build a configuration's slides in worker processes into a generator's presentation.
+    
+    The generator must already have its settings applied (see
+    PresentationGenerator._prepare_build) and hold no slides yet.
+    
+    Args:
+        generator (PresentationGenerator): The generator.
+        config (dict): The parsed YAML configuration.
+        workers (int): Number of worker processes.
+        chunk_size (int, optional): Slides per chunk.
+    """
+    slides = config.get('slides', [])
+    header = {key: value for key, value in config.items() if key != 'slides'}
+    chunks = split_chunks(len(slides), workers, chunk_size)
+    workers = max(1, min(workers, len(chunks)))
+    
+    logger.info(f"Rendering {len(slides)} slides in {len(chunks)} chunks with {workers} workers")
+    merger = PresentationMerger(generator.prs)
+    
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(generator.template_path, logging.getLogger().getEffectiveLevel(), generator.image_options)
+    ) as executor:
+        futures = [executor.submit(_render_chunk, header, slides[start:stop], start) for start, stop in chunks]
+        
+        # Merge in order, each chunk as soon as it and its predecessors are done
+        for future in futures:
+            merger.merge(Presentation(io.BytesIO(future.result())))
+
+def _init_worker(template_path, log_level, image_options=None):
+    """
+    Initialize a rendering worker process.
+    
+    Args:
+        template_path (str, optional): Path to a PowerPoint template file.
+        log_level (int): Logging level for the worker.
+        image_options (dict, optional): Image optimization options.
+    """
+    logging.basicConfig(
+        level=log_level,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    logging.getLogger().setLevel(log_level)
+    
+    _worker_state['template_path'] = template_path
+    _worker_state['image_options'] = image_options
+    load_template(template_path if template_path and os.path.exists(template_path) else None)
+
+def _render_chunk(header, slides, start=0):
+    """
+    Render a chunk of slides inside a worker process.
+    
+    Args:
+        header (dict): The configuration without its slides.
+        slides (list): The chunk's slide mappings.
+        start (int): Position of the chunk's first slide in the configuration.
+    
+    Returns:
+        bytes: The chunk as an uncompressed .pptx package.
+    
+    Raises:
+        RenderError: If a slide cannot be built.
+    """
+    from src.ppt_generator import PresentationGenerator
+    
+    generator = PresentationGenerator(
+        template_path=_worker_state.get('template_path'),
+        image_options=_worker_state.get('image_options')
+    )
+    try:
+        generator._build_presentation(header, slides)
+    except RenderError as e:
+        # Report the slide's position in the whole configuration
+        if e.slide_index is None:
+            raise
+        raise RenderError(e.reason, e.slide_index + start) from e
+    
+    output = io.BytesIO()
+    write_package(generator.prs, output, level=0, threads=1)
+    return output.getvalue()
+
+class PresentationMerger:
+    """
+    Appends the slides of presentations built from the same template.
+    """
+    
+    def __init__(self, prs):
+        """
+        Initialize the merger.
+        
+        Args:
+            prs: The presentation slides are appended to.
+        """
+        self.prs = prs
+        self.package = prs.part.package
+        self._sldIdLst = prs.part._element.get_or_add_sldIdLst()
+        self._numbers = {}
+        self._used = {str(part.partname) for part in self.package.iter_parts()}
+        self._template_parts = {str(part.partname): part for part in _template_parts(prs)}
+        
+        # Shared parts by content, so each image or workbook is stored once
+        self._shared = {
+            _content_key(part): part for part in self.package.iter_parts()
+            if isinstance(part, (ImagePart, EmbeddedPackagePart))
+        }
+    
+    def merge(self, source):
+        """
+        Move every slide of a presentation to the end of this one.
+        
+        Args:
+            source: Presentation built from the same template. Its parts
+                are moved, so it must not be used afterwards.
+        """
+        source_prs_part = source.part
+        template_parts = set(_template_parts(source))
+        moved = {}
+        slide_id = self._sldIdLst._next_id
+        
+        for sldId in source_prs_part._element.get_or_add_sldIdLst():
+            slide_part = source_prs_part.related_part(sldId.rId)
+            partname = PackURI('/ppt/slides/slide%d.xml' % (len(self._sldIdLst) + 1))
+            self._move(slide_part, partname, template_parts, moved)
+            
+            rId = self.prs.part._rels._add_relationship(RT.SLIDE, slide_part)
+            self._sldIdLst._add_sldId(id=slide_id, rId=rId)
+            slide_id += 1
+    
+    def _move(self, part, partname, template_parts, moved):
+        """
+        Move a part into this package, with the parts it relates to.
+        
+        Args:
+            part: The part to move.
+            partname (PackURI): Its partname in this package.
+            template_parts (set): Parts of the source that came from the
+                template; they are replaced by this package's copies.
+            moved (dict): Source parts already moved, mapped to their
+                counterpart in this package.
+        """
+        part._package = self.package
+        part.partname = partname
+        self._used.add(str(partname))
+        moved[part] = part
+        
+        rels = part._rels
+        for rId, rel in list(rels.items()):
+            if rel.is_external:
+                continue
+            target = self._target(rel.target_part, template_parts, moved)
+            rels._rels[rId] = _Relationship(rels._base_uri, rId, rel.reltype, rel._target_mode, target)
+    
+    def _target(self, part, template_parts, moved):
+        """
+        Get the part of this package a relationship should point to.
+        
+        Args:
+            part: The relationship's target in the source package.
+            template_parts (set): Parts of the source that came from the template.
+            moved (dict): Source parts already moved.
+        
+        Returns:
+            The target part in this package.
+        """
+        if part in moved:
+            return moved[part]
+        
+        if part in template_parts:
+            target = self._template_parts.get(str(part.partname))
+            if target is None:
+                raise ValueError(f"Template part {part.partname} not found; were both built from the same template?")
+            moved[part] = target
+            return target
+        
+        if isinstance(part, (ImagePart, EmbeddedPackagePart)):
+            key = _content_key(part)
+            shared = self._shared.get(key)
+            if shared is not None:
+                moved[part] = shared
+                return shared
+            self._shared[key] = part
+        
+        self._move(part, self._next_partname(str(part.partname)), template_parts, moved)
+        return part
+    
+    def _next_partname(self, partname):
+        """
+        Get the lowest free partname with the same prefix as a partname.
+        
+        Numbers are shared between extensions, as python-pptx numbers
+        media (image1.png, image2.jpeg, ...).
+        
+        Args:
+            partname (str): The part's partname in the source package.
+        
+        Returns:
+            PackURI: A partname that is free in this package.
+        """
+        match = _PARTNAME_PATTERN.match(partname)
+        if match is None:
+            if partname in self._used:
+                raise ValueError(f"Cannot rename part {partname}")
+            return PackURI(partname)
+        
+        prefix, _, extension = match.groups()
+        state = self._numbers.get(prefix)
+        if state is None:
+            used = set()
+            for name in self._used:
+                used_match = _PARTNAME_PATTERN.match(name)
+                if used_match and used_match.group(1) == prefix:
+                    used.add(int(used_match.group(2)))
+            state = self._numbers[prefix] = [1, used]
+        
+        number, used = state
+        while number in used:
+            number += 1
+        used.add(number)
+        state[0] = number + 1
+        return PackURI(f"{prefix}{number}{extension}")
+
+def _template_parts(prs):
+    """
+    Get the parts a presentation shares with its template.
+    
+    These are the parts reachable from the presentation part other than
+    through its slides: masters, layouts, themes and their media.
+    
+    Args:
+        prs: The presentation.
+    
+    Returns:
+        list: The parts.
+    """
+    parts = []
+    seen = set()
+    stack = [rel.target_part for rel in prs.part.rels.values() if not rel.is_external and rel.reltype != RT.SLIDE]
+    stack.append(prs.part)
+    
+    while stack:
+        part = stack.pop()
+        if part in seen:
+            continue
+        seen.add(part)
+        parts.append(part)
+        stack.extend(
+            rel.target_part for rel in part.rels.values()
+            if not rel.is_external and rel.reltype != RT.SLIDE
+        )
+    
+    return parts
+
+def _content_key(part):
+    """
+    Key under which identical images or workbooks are stored once.
+    """
+    return (type(part).__name__, part.partname.ext, hashlib.sha1(part.blob).hexdigest())
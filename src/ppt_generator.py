@@ -6,15 +6,25 @@ from YAML configuration files.
 """
 
 import os
+import io
 import logging
-import yaml
 from pptx import Presentation
 from pptx.util import Inches, Pt
 from pptx.dml.color import RGBColor
 from pptx.enum.text import PP_ALIGN
 
 from src.slide_builder import SlideBuilder
-from src.utils import apply_theme_settings, resolve_variables
+from src.template_cache import load_template
+from src.image_cache import image_cache
+from src.image_optimizer import ImageOptimizer, DEFAULT_DPI, DEFAULT_JPEG_QUALITY
+from src.chart_writer import get_workbook_stats, WORKBOOK_EMBEDDED
+from src.incremental import IncrementalBuild, reorder_slides
+from src.package_writer import save_presentation, get_binary_parts, DEFAULT_COMPRESSION_LEVEL, DEFAULT_THREADS
+from src.parallel import render_parallel
+from src.utils import apply_theme_settings, load_config, load_config_file, get_variable_resolver, ConfigStream
+from src.validators import iter_schema_errors, iter_slide_errors, validate_config
+from src.errors import PresentationError, ValidationError, TemplateError, RenderError, OutputError
+from src import profiling
 
 logger = logging.getLogger(__name__)
 
@@ -23,21 +33,34 @@ class PresentationGenerator:
     A class for generating PowerPoint presentations from YAML configuration files.
     """
     
-    def __init__(self, template_path=None):
+    def __init__(self, template_path=None, image_options=None, package_options=None):
         """
         Initialize the PresentationGenerator with an optional template.
         
         Args:
-            template_path (str, optional): Path to a PowerPoint template file.
+            template_path (str or file-like, optional): Path to a PowerPoint
+                template file, or a binary stream containing one.
+            image_options (dict, optional): Image optimization options
+                ('optimize', 'dpi', 'quality', 'cache_dir') that override
+                the configuration's 'settings.images'.
+            package_options (dict, optional): Options for writing the .pptx
+                package: 'level' (zlib compression level, 0-9) and
+                'threads' (threads compressing parts).
         """
-        if template_path and os.path.exists(template_path):
+        if hasattr(template_path, 'read'):
             self.prs = Presentation(template_path)
+            logger.debug("Using template from stream")
+        elif template_path and os.path.exists(template_path):
+            self.prs = load_template(template_path)
             logger.debug(f"Using template: {template_path}")
         else:
-            self.prs = Presentation()
+            self.prs = load_template()
             logger.debug("Using blank presentation")
         
+        self.template_path = template_path
         self.slide_builder = SlideBuilder(self.prs)
+        self.image_options = dict(image_options or {})
+        self.package_options = dict(package_options or {})
         self.variables = {}
         self.theme_settings = {
             'title_font': 'Calibri',
@@ -65,38 +88,248 @@ class PresentationGenerator:
         """
         try:
             # Read and parse the input file
-            with open(input_file_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
+            config = load_config_file(input_file_path)
+        except Exception as e:
+            logger.exception(f"Error reading configuration file: {e}")
+            return False
+        
+        return self.generate_from_config(config, output_path)
+    
+    def generate_from_config(self, config, output_path, workers=1):
+        """
+        Generate a PowerPoint presentation from an already parsed configuration.
+        
+        Args:
+            config (dict): The parsed YAML configuration.
+            output_path (str): Path where the PowerPoint file should be saved.
+            workers (int): Number of processes rendering slides. With more
+                than one, chunks of slides are rendered in parallel and
+                merged in order (see src.parallel).
             
-            # Process variables
-            if 'variables' in config:
-                self.variables = config['variables']
-                logger.debug(f"Loaded {len(self.variables)} variables")
-                
-            # Apply presentation-wide settings
-            if 'settings' in config:
-                self._apply_presentation_settings(config['settings'])
+        Returns:
+            bool: True if successful, False otherwise.
+        """
+        try:
+            if workers > 1 and hasattr(self.template_path, 'read'):
+                logger.warning("Templates given as streams cannot be shared with workers, rendering serially")
+                workers = 1
+            
+            if workers > 1:
+                self._prepare_build(config)
+                render_parallel(self, config, workers)
+                self._finish_build(config)
+            else:
+                self._build_presentation(config, config.get('slides', []))
+            
+            # Save the presentation
+            with profiling.stage('save'):
+                self._save(output_path)
+            logger.info(f"Presentation saved to {output_path}")
+            return True
+            
+        except Exception as e:
+            logger.exception(f"Error generating presentation: {e}")
+            return False
+    
+    def render(self, source, output=None, validate=True):
+        """
+        Generate a presentation from a configuration held in memory.
+        
+        Unlike the generate_* methods, which log errors and return False,
+        this raises a PresentationError subclass describing the failure.
+        A generator renders a single presentation.
+        
+        Args:
+            source: The configuration: an already parsed mapping, YAML text
+                as str or bytes, or a readable stream of YAML.
+            output (file-like, optional): Writable binary stream the .pptx
+                package is written to. It need not be seekable, so sockets
+                and HTTP response bodies work too.
+            validate (bool): Check the configuration against the schema first.
+            
+        Returns:
+            memoryview: The .pptx package when no output is given, else None.
+            
+        Raises:
+            ConfigError: If the configuration cannot be parsed.
+            ValidationError: If the configuration is invalid.
+            RenderError: If a slide or setting cannot be built.
+            OutputError: If the package cannot be written.
+        """
+        with profiling.stage('parse'):
+            config = load_config(source)
+        
+        if validate:
+            with profiling.stage('validate'):
+                result = validate_config(config)
+            if not result['valid']:
+                raise ValidationError(result['errors'])
+        
+        try:
+            self._build_presentation(config, config.get('slides', []))
+        except PresentationError:
+            raise
+        except Exception as e:
+            raise RenderError(f"{type(e).__name__}: {e}") from e
+        
+        buffer = io.BytesIO() if output is None else output
+        try:
+            with profiling.stage('save'):
+                self._save(buffer)
+        except (OSError, ValueError) as e:
+            raise OutputError(f"Cannot write presentation: {e}") from e
+        
+        return buffer.getbuffer() if output is None else None
+    
+    def generate_incremental(self, config, output_path):
+        """
+        Generate a presentation, re-rendering only the slides that changed
+        since the previous build of the same output.
+        
+        Slide hashes are kept in a build manifest next to the output (see
+        src.incremental). When the previous output and its manifest are
+        usable, the previous output is opened, its unchanged slides are
+        kept, edited or new slides are rendered and removed slides are
+        dropped. Otherwise every slide is built, as generate_from_config does.
+        
+        Args:
+            config (dict): The parsed YAML configuration.
+            output_path (str): Path where the PowerPoint file should be saved.
             
-            # Process slides
-            slides_data = config.get('slides', [])
+        Returns:
+            bool: True if successful, False otherwise.
+        """
+        try:
+            build = IncrementalBuild(output_path)
+            resolver = self._prepare_build(config)
+            
+            template_path = self.template_path
+            if hasattr(template_path, 'read'):
+                # A template stream cannot be hashed, so nothing can be reused
+                build.previous = None
+                template_path = None
+            
+            with profiling.stage('hash'):
+                build.hash_deck(
+                    resolver.resolve(config.get('settings', {})), self.theme_settings,
+                    template_path, self.image_options
+                )
+                slides_data = config.get('slides', [])
+                for slide_data in slides_data:
+                    build.hash_slide(resolver.resolve(slide_data))
+                reuse = build.reusable_slides()
+            
+            groups = previous_parts = None
+            if reuse is None:
+                logger.info("No reusable previous build, building every slide")
+            else:
+                groups = self._reopen_previous_build(config, output_path, build.previous_slide_counts())
+                if groups is not None:
+                    previous_parts = get_binary_parts(self.prs)
+            
+            sldIdLst = self.prs.part._element.get_or_add_sldIdLst()
+            slide_groups = []
+            rendered = 0
             for slide_idx, slide_data in enumerate(slides_data):
-                logger.debug(f"Processing slide {slide_idx + 1}/{len(slides_data)}")
+                if groups is not None and reuse[slide_idx] is not None:
+                    slide_groups.append(groups[reuse[slide_idx]])
+                    continue
                 
-                # Resolve variables in the slide data
-                slide_data = resolve_variables(slide_data, self.variables)
-                
-                # Create the slide
-                self.slide_builder.create_slide(slide_data, self.theme_settings)
+                start = len(sldIdLst)
+                self._create_slide(slide_idx, slide_data, resolver)
+                slide_groups.append(list(sldIdLst)[start:])
+                rendered += 1
+            
+            if groups is not None:
+                reorder_slides(self.prs, slide_groups, {sldId for group in slide_groups for sldId in group})
+                logger.info(f"Rendered {rendered} of {len(slides_data)} slides, reused the rest")
             
-            # Apply presentation-wide theme
-            apply_theme_settings(self.prs, self.theme_settings)
+            self._finish_build(config)
+            
+            # Save the presentation, copying the unchanged parts of the previous output
+            with profiling.stage('save'):
+                self._save(output_path, output_path, previous_parts)
+            build.write_manifest([len(group) for group in slide_groups])
+            logger.info(f"Presentation saved to {output_path}")
+            return True
+            
+        except Exception as e:
+            logger.exception(f"Error generating presentation: {e}")
+            return False
+    
+    def _reopen_previous_build(self, config, output_path, slide_counts):
+        """
+        Continue from the previous output instead of the template.
+        
+        Args:
+            config (dict): The parsed YAML configuration.
+            output_path (str): Path of the previous output.
+            slide_counts (list): Number of presentation slides produced by
+                each slide of the previous build.
+            
+        Returns:
+            list: The sldId elements of each previous slide, or None if the
+                previous output does not match its manifest.
+        """
+        with profiling.stage('load_previous'):
+            prs = Presentation(output_path)
+        
+        sldIds = list(prs.part._element.get_or_add_sldIdLst())
+        if sum(slide_counts) != len(sldIds):
+            logger.info("Previous output does not match its build manifest, building every slide")
+            return None
+        
+        groups = []
+        start = 0
+        for count in slide_counts:
+            groups.append(sldIds[start:start + count])
+            start += count
+        
+        element_factory = self.slide_builder.element_factory
+        self.prs = prs
+        self.slide_builder = SlideBuilder(prs)
+        self.slide_builder.element_factory = element_factory
+        
+        # Core properties live in the package, so apply them to the reopened one
+        if 'settings' in config:
+            self._apply_presentation_settings(config['settings'])
+        
+        return groups
+    
+    def generate_from_stream(self, input_file_path, output_path, validate=True):
+        """
+        Generate a PowerPoint presentation while streaming slides from a YAML file.
+        
+        Variables and settings are read up front; slides are then parsed,
+        validated and built one at a time and released once built, so peak
+        memory does not grow with the size of the slides list.
+        
+        Args:
+            input_file_path (str): Path to the input YAML file.
+            output_path (str): Path where the PowerPoint file should be saved.
+            validate (bool): Validate the header and each slide as it is read.
             
-            # Apply transitions if specified
-            if 'transitions' in config:
-                self._apply_transitions(config['transitions'])
+        Returns:
+            bool: True if successful, False otherwise.
+        """
+        try:
+            with ConfigStream(input_file_path) as stream:
+                if validate:
+                    with profiling.stage('validate'):
+                        errors = list(iter_schema_errors(dict(stream.header, slides=[])))
+                    if errors:
+                        logger.error(f"YAML validation failed: {errors}")
+                        return False
+                
+                slides = profiling.iter_stage('parse', stream.slides())
+                if validate:
+                    slides = self._validated_slides(slides, stream.header.get('variables'))
+                
+                self._build_presentation(stream.header, slides)
             
             # Save the presentation
-            self.prs.save(output_path)
+            with profiling.stage('save'):
+                self._save(output_path)
             logger.info(f"Presentation saved to {output_path}")
             return True
             
@@ -104,6 +337,156 @@ class PresentationGenerator:
             logger.exception(f"Error generating presentation: {e}")
             return False
     
+    def _validated_slides(self, slides, variables=None):
+        """
+        Validate slides one at a time as they are consumed.
+        
+        Args:
+            slides (iterable): Slide mappings.
+            variables (dict, optional): The deck's variables.
+            
+        Yields:
+            dict: Each slide once it has passed validation.
+            
+        Raises:
+            ValidationError: If a slide fails validation.
+        """
+        for slide_idx, slide_data in enumerate(slides):
+            with profiling.stage('validate'):
+                errors = list(iter_slide_errors(slide_data, slide_idx, variables))
+            if errors:
+                raise ValidationError(errors)
+            yield slide_data
+    
+    def _build_presentation(self, config, slides_data):
+        """
+        Apply settings and build every slide into the presentation.
+        
+        Args:
+            config (dict): The configuration (or its header when streaming).
+                It is read again after the slides so that trailing keys
+                such as 'transitions' are honoured.
+            slides_data (iterable): Slide mappings to build, in order.
+        """
+        resolver = self._prepare_build(config)
+        
+        # Process slides
+        total = len(slides_data) if hasattr(slides_data, '__len__') else '?'
+        for slide_idx, slide_data in enumerate(slides_data):
+            logger.debug(f"Processing slide {slide_idx + 1}/{total}")
+            self._create_slide(slide_idx, slide_data, resolver)
+        
+        self._finish_build(config)
+    
+    def _prepare_build(self, config):
+        """
+        Load variables and apply presentation-wide settings before building slides.
+        
+        Args:
+            config (dict): The configuration (or its header when streaming).
+            
+        Returns:
+            VariableResolver: The resolver for the deck's variables.
+        """
+        # Process variables
+        if 'variables' in config:
+            self.variables = config['variables']
+            logger.debug(f"Loaded {len(self.variables)} variables")
+            
+        # Apply presentation-wide settings
+        if 'settings' in config:
+            self._apply_presentation_settings(config['settings'])
+        
+        self._configure_image_optimizer(config.get('settings', {}).get('images', {}))
+        self.slide_builder.element_factory.chart_workbook = (
+            config.get('settings', {}).get('charts', {}).get('workbook', WORKBOOK_EMBEDDED)
+        )
+        
+        # Compile the variable substitutions once for the whole deck
+        return get_variable_resolver(self.variables)
+        
+    def _create_slide(self, slide_idx, slide_data, resolver):
+        """
+        Create the presentation slides for one slide of the configuration.
+            
+        Args:
+            slide_idx (int): Position of the slide in the configuration.
+            slide_data (dict): The slide mapping.
+            resolver (VariableResolver): Resolver for the deck's variables.
+            
+        Raises:
+            RenderError: If the slide cannot be built.
+        """
+        # Create the slide, resolving variables as fields are read
+        try:
+            with profiling.slide(slide_idx, slide_data.get('type', 'blank')):
+                self.slide_builder.create_slide(slide_data, self.theme_settings, resolver)
+        except PresentationError:
+            raise
+        except Exception as e:
+            raise RenderError(f"{type(e).__name__}: {e}", slide_idx) from e
+        
+    def _finish_build(self, config):
+        """
+        Apply the settings that follow the slides and log the cache statistics.
+        
+        Args:
+            config (dict): The configuration (or its header when streaming).
+        """
+        # Apply presentation-wide theme
+        apply_theme_settings(self.prs, self.theme_settings)
+        
+        # Apply transitions if specified
+        if 'transitions' in config:
+            self._apply_transitions(config['transitions'])
+        
+        logger.debug(f"Image cache: {image_cache.stats()}")
+        
+        image_optimizer = self.slide_builder.element_factory.image_optimizer
+        if image_optimizer:
+            logger.debug(f"Image optimizer: {image_optimizer.stats}")
+        
+        logger.debug(f"Chart workbooks: {get_workbook_stats()}")
+    
+    def _save(self, output_path, previous_path=None, previous_parts=None):
+        """
+        Save the presentation with the package options.
+        
+        Args:
+            output_path (str or file-like): Path of the file to write, or a
+                writable binary stream.
+            previous_path (str, optional): A previous build to copy unchanged
+                parts from.
+            previous_parts (dict, optional): Binary parts loaded from previous_path.
+        """
+        level = self.package_options.get('level')
+        threads = self.package_options.get('threads')
+        save_presentation(
+            self.prs, output_path, previous_path, previous_parts,
+            level=DEFAULT_COMPRESSION_LEVEL if level is None else level,
+            threads=threads or DEFAULT_THREADS
+        )
+    
+    def _configure_image_optimizer(self, image_settings):
+        """
+        Enable image optimization if requested by the configuration or caller.
+        
+        Args:
+            image_settings (dict): The configuration's 'settings.images' section.
+        """
+        options = dict(image_settings)
+        options.update((k, v) for k, v in self.image_options.items() if v is not None)
+        
+        if not options.get('optimize'):
+            return
+        
+        self.slide_builder.element_factory.image_optimizer = ImageOptimizer(
+            dpi=options.get('dpi', DEFAULT_DPI),
+            quality=options.get('quality', DEFAULT_JPEG_QUALITY),
+            cache_dir=options.get('cache_dir')
+        )
+        logger.debug(f"Image optimization enabled at {options.get('dpi', DEFAULT_DPI)} DPI")
+    
     def _apply_presentation_settings(self, settings):
         """
         Apply presentation-wide settings.
@@ -224,4 +607,41 @@ class PresentationGenerator:
         
         # Default to black if parsing fails
         logger.warning(f"Could not parse color value: {color_value}, using black")
-        return (0, 0, 0)
\ No newline at end of file
+        return (0, 0, 0)
+
+def render_presentation(source, output=None, template=None, image_options=None, package_options=None,
+                        validate=True):
+    """
+    Generate a presentation without touching the file system.
+    
+    Convenience wrapper around PresentationGenerator.render for services:
+    the configuration, template and result can all stay in memory.
+    
+    Args:
+        source: The configuration: a parsed mapping, YAML text as str or
+            bytes, or a readable stream of YAML.
+        output (file-like, optional): Writable binary stream for the .pptx
+            package; by default it is returned.
+        template (str or file-like, optional): Path to a PowerPoint template,
+            or a binary stream containing one.
+        image_options (dict, optional): Image optimization options.
+        package_options (dict, optional): Package writing options.
+        validate (bool): Check the configuration against the schema first.
+        
+    Returns:
+        memoryview: The .pptx package when no output is given, else None.
+        
+    Raises:
+        TemplateError: If the template cannot be found or opened.
+        ConfigError, ValidationError, RenderError, OutputError: As for
+            PresentationGenerator.render.
+    """
+    if isinstance(template, str) and not os.path.exists(template):
+        raise TemplateError(f"Template not found: {template}")
+    
+    try:
+        generator = PresentationGenerator(template, image_options, package_options)
+    except Exception as e:
+        raise TemplateError(f"Cannot open template: {e}") from e
+    
+    return generator.render(source, output, validate)
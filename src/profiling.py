@@ -0,0 +1,369 @@
+"""
+Profiling Module
+
+This module measures where generation time and memory go. The pipeline
+reports its stages (YAML parsing, validation, variable resolution, slide
+creation, each ElementFactory.create_* call and saving) to the active
+Profiler through stage() and @timed. With no profiler active these cost a
+single check, so the hooks stay in place in normal runs.
+"""
+
+import time
+import functools
+import logging
+import tracemalloc
+import cProfile
+from contextlib import contextmanager, nullcontext
+
+logger = logging.getLogger(__name__)
+
+# Default number of slowest slides listed in a report
+DEFAULT_TOP_SLIDES = 10
+
+# The profiler stages currently report to, if any
+_active = None
+
+_NULL_STAGE = nullcontext()
+
+class Profiler:
+    """
+    Collects wall time and allocations per pipeline stage and per slide.
+    
+    Stage times are inclusive: an element created while building a slide
+    counts towards both its create_* stage and the create_slide stage.
+    Peak memory is only measured for outermost stages, since tracemalloc
+    has a single peak counter.
+    """
+    
+    def __init__(self, trace_memory=True, pstats_path=None):
+        """
+        Initialize the profiler.
+        
+        Args:
+            trace_memory (bool): Count allocations with tracemalloc. This
+                slows generation down, so stage times are inflated.
+            pstats_path (str, optional): Also run cProfile and dump its
+                statistics to this file when the profiler stops.
+        """
+        self.trace_memory = trace_memory
+        self.pstats_path = pstats_path
+        self.stages = {}
+        self.slides = []
+        self.elapsed = 0.0
+        self.peak_bytes = 0
+        self._depth = 0
+        self._started = None
+        self._started_tracing = False
+        self._cprofile = None
+    
+    def start(self):
+        """
+        Start profiling and make this the active profiler.
+        
+        Returns:
+            Profiler: This profiler.
+        """
+        global _active
+        
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        
+        if self.pstats_path:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        
+        _active = self
+        self._started = time.perf_counter()
+        return self
+    
+    def stop(self):
+        """
+        Stop profiling and write the cProfile statistics if requested.
+        """
+        global _active
+        
+        if self._started is None:
+            return
+        
+        self.elapsed = time.perf_counter() - self._started
+        self._started = None
+        if _active is self:
+            _active = None
+        
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self.pstats_path)
+            logger.info(f"cProfile statistics written to {self.pstats_path}")
+            self._cprofile = None
+        
+        if tracemalloc.is_tracing():
+            self.peak_bytes = max(self.peak_bytes, tracemalloc.get_traced_memory()[1])
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+    
+    @contextmanager
+    def stage(self, name):
+        """
+        Measure a block of work as one call of a stage.
+        
+        Args:
+            name (str): Stage name.
+        """
+        tracing = tracemalloc.is_tracing()
+        outermost = self._depth == 0
+        
+        if tracing:
+            if outermost:
+                tracemalloc.reset_peak()
+            start_bytes = tracemalloc.get_traced_memory()[0]
+        
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self._depth -= 1
+            
+            alloc_bytes = peak_bytes = None
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                alloc_bytes = current - start_bytes
+                if outermost:
+                    peak_bytes = peak - start_bytes
+                    self.peak_bytes = max(self.peak_bytes, peak)
+            
+            self._record(name, seconds, alloc_bytes, peak_bytes)
+    
+    @contextmanager
+    def slide(self, index, slide_type):
+        """
+        Measure the creation of one slide from the configuration.
+        
+        Args:
+            index (int): Zero-based position of the slide in the configuration.
+            slide_type (str): The slide's type.
+        """
+        tracing = tracemalloc.is_tracing()
+        start_bytes = tracemalloc.get_traced_memory()[0] if tracing else 0
+        start = time.perf_counter()
+        
+        with self.stage('create_slide'):
+            yield
+        
+        self.slides.append({
+            'index': index,
+            'type': slide_type,
+            'seconds': time.perf_counter() - start,
+            'alloc_bytes': tracemalloc.get_traced_memory()[0] - start_bytes if tracing else None
+        })
+    
+    def _record(self, name, seconds, alloc_bytes, peak_bytes):
+        """
+        Add one call to a stage's totals.
+        """
+        totals = self.stages.get(name)
+        if totals is None:
+            totals = self.stages[name] = {
+                'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'alloc_bytes': None, 'peak_bytes': None
+            }
+        
+        totals['calls'] += 1
+        totals['seconds'] += seconds
+        totals['max_seconds'] = max(totals['max_seconds'], seconds)
+        if alloc_bytes is not None:
+            totals['alloc_bytes'] = (totals['alloc_bytes'] or 0) + alloc_bytes
+        if peak_bytes is not None:
+            totals['peak_bytes'] = max(totals['peak_bytes'] or 0, peak_bytes)
+    
+    def report(self, top=DEFAULT_TOP_SLIDES):
+        """
+        Build the profiling report.
+        
+        Args:
+            top (int): Number of slowest slides to list.
+        
+        Returns:
+            dict: Report with 'elapsed', 'peak_bytes', 'stages',
+                'slide_types', 'slowest_slides' and 'pstats' keys.
+        """
+        stages = [
+            dict(totals, stage=name, mean_seconds=totals['seconds'] / totals['calls'])
+            for name, totals in self.stages.items()
+        ]
+        stages.sort(key=lambda entry: entry['seconds'], reverse=True)
+        
+        slide_types = {}
+        for slide in self.slides:
+            totals = slide_types.setdefault(slide['type'], {'type': slide['type'], 'slides': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+            totals['slides'] += 1
+            totals['seconds'] += slide['seconds']
+            totals['max_seconds'] = max(totals['max_seconds'], slide['seconds'])
+        
+        for totals in slide_types.values():
+            totals['mean_seconds'] = totals['seconds'] / totals['slides']
+        
+        return {
+            'elapsed': self.elapsed,
+            'peak_bytes': self.peak_bytes if self.trace_memory else None,
+            'stages': stages,
+            'slide_types': sorted(slide_types.values(), key=lambda entry: entry['seconds'], reverse=True),
+            'slowest_slides': sorted(self.slides, key=lambda slide: slide['seconds'], reverse=True)[:top],
+            'pstats': self.pstats_path
+        }
+
+def get_active_profiler():
+    """
+    Get the profiler stages currently report to.
+    
+    Returns:
+        Profiler: The active profiler, or None.
+    """
+    return _active
+
+def stage(name):
+    """
+    Measure a block of work as a stage of the active profiler.
+    
+    Args:
+        name (str): Stage name.
+    
+    Returns:
+        A context manager; a no-op when no profiler is active.
+    """
+    return _active.stage(name) if _active is not None else _NULL_STAGE
+
+def slide(index, slide_type):
+    """
+    Measure the creation of a slide with the active profiler.
+    
+    Args:
+        index (int): Zero-based position of the slide in the configuration.
+        slide_type (str): The slide's type.
+    
+    Returns:
+        A context manager; a no-op when no profiler is active.
+    """
+    return _active.slide(index, slide_type) if _active is not None else _NULL_STAGE
+
+def iter_stage(name, iterable):
+    """
+    Measure the time spent producing each item of an iterable as a stage.
+    
+    Args:
+        name (str): Stage name.
+        iterable: The iterable, e.g. a generator that parses items lazily.
+    
+    Returns:
+        An iterator over the same items; the iterable itself when no
+            profiler is active.
+    """
+    if _active is None:
+        return iterable
+    return _iter_stage(name, iter(iterable))
+
+def _iter_stage(name, iterator):
+    """
+    Generator behind iter_stage.
+    """
+    while True:
+        with stage(name):
+            item = next(iterator, _NULL_STAGE)
+        if item is _NULL_STAGE:
+            return
+        yield item
+
+def timed(name):
+    """
+    Decorate a function so each call is measured as a stage.
+    
+    Args:
+        name (str): Stage name.
+    
+    Returns:
+        function: The decorator.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return func(*args, **kwargs)
+            with _active.stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def format_report(report):
+    """
+    Format a profiling report as text tables.
+    
+    Args:
+        report (dict): Report from Profiler.report().
+    
+    Returns:
+        str: The formatted report.
+    """
+    lines = [f"Total: {report['elapsed'] * 1000:.1f} ms"]
+    if report['peak_bytes'] is not None:
+        lines[0] += f", peak traced memory {_format_bytes(report['peak_bytes'])}"
+    
+    lines.append("")
+    lines.append(f"{'Stage':<24} {'Calls':>7} {'Total ms':>10} {'Mean ms':>9} {'Max ms':>9} {'Alloc':>10} {'Peak':>10}")
+    for entry in report['stages']:
+        lines.append(
+            f"{entry['stage']:<24} {entry['calls']:>7} {entry['seconds'] * 1000:>10.1f} "
+            f"{entry['mean_seconds'] * 1000:>9.2f} {entry['max_seconds'] * 1000:>9.2f} "
+            f"{_format_bytes(entry['alloc_bytes']):>10} {_format_bytes(entry['peak_bytes']):>10}"
+        )
+    
+    if report['slide_types']:
+        lines.append("")
+        lines.append(f"{'Slide type':<24} {'Slides':>7} {'Total ms':>10} {'Mean ms':>9} {'Max ms':>9}")
+        for entry in report['slide_types']:
+            lines.append(
+                f"{entry['type']:<24} {entry['slides']:>7} {entry['seconds'] * 1000:>10.1f} "
+                f"{entry['mean_seconds'] * 1000:>9.2f} {entry['max_seconds'] * 1000:>9.2f}"
+            )
+    
+    if report['slowest_slides']:
+        lines.append("")
+        lines.append(f"{'Slowest slides':<24} {'Type':<18} {'ms':>9} {'Alloc':>10}")
+        for entry in report['slowest_slides']:
+            lines.append(
+                f"{'#' + str(entry['index'] + 1):<24} {entry['type']:<18} "
+                f"{entry['seconds'] * 1000:>9.2f} {_format_bytes(entry['alloc_bytes']):>10}"
+            )
+    
+    if report['pstats']:
+        lines.append("")
+        lines.append(f"cProfile statistics: {report['pstats']} (view with python -m pstats)")
+    
+    return '\n'.join(lines)
+
+def _format_bytes(count):
+    """
+    Format a byte count for the report tables.
+    
+    Args:
+        count (int): Number of bytes, or None.
+    
+    Returns:
+        str: Human-readable size, or '-' for None.
+    """
+    if count is None:
+        return '-'
+    
+    for unit in ('B', 'KB', 'MB'):
+        if abs(count) < 1024:
+            return f"{count:.0f} {unit}" if unit == 'B' else f"{count:.1f} {unit}"
+        count /= 1024
+    return f"{count:.1f} GB"
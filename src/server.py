@@ -0,0 +1,401 @@
+"""
+Generation Daemon Module
+
+This module runs a long-lived generation daemon for build systems that
+call the generator many times. The daemon imports everything once, warms
+up the compiled schema validators, the templates and the rendering code
+paths, and then pre-forks worker processes that share the warm state.
+Each worker accepts jobs from a Unix domain socket: a client (see
+src.client) sends its command line and working directory, the worker runs
+it as main.py would and streams the output and log back, followed by the
+exit status. Workers are replaced when they exit, and are recycled after
+a number of jobs to bound their memory.
+"""
+
+import os
+import io
+import gc
+import json
+import time
+import errno
+import signal
+import socket
+import logging
+import traceback
+from contextlib import redirect_stdout, redirect_stderr
+
+from src.client import get_socket_path, runs_locally, PROTOCOL_VERSION
+from src.ppt_generator import render_presentation
+from src.template_cache import load_template
+from src.validators import get_schema_validator, get_slide_validator
+
+logger = logging.getLogger(__name__)
+
+# Jobs a worker handles before it is replaced by a fresh fork
+DEFAULT_MAX_JOBS = 500
+
+# Pending connections the socket queues while every worker is busy
+LISTEN_BACKLOG = 128
+
+# Largest request accepted from a client, in bytes
+MAX_REQUEST_SIZE = 1024 * 1024
+
+# Pause before replacing a worker that failed, so a broken worker
+# cannot turn into a fork loop
+RESPAWN_DELAY = 0.5
+
+# Deck rendered once before forking, to load the lazily imported code paths
+_WARM_UP_CONFIG = {
+    'slides': [
+        {'type': 'title', 'title': 'Warm-up', 'subtitle': 'Daemon'},
+        {
+            'type': 'title_only',
+            'title': 'Warm-up',
+            'elements': [
+                {
+                    'type': 'table', 'left': 1, 'top': 2, 'width': 4, 'height': 2, 'has_header': True,
+                    'data': [['A', 'B'], ['1', '2']]
+                },
+                {
+                    'type': 'chart', 'chart_type': 'column', 'left': 5, 'top': 2, 'width': 4, 'height': 3,
+                    'data': {'categories': ['a', 'b'], 'series': [{'name': 's', 'values': [1, 2]}]}
+                },
+                {'type': 'text_box', 'left': 1, 'top': 5, 'width': 4, 'height': 1, 'text': 'Warm-up'}
+            ]
+        }
+    ]
+}
+
+def warm_up(templates=()):
+    """
+    Load everything jobs share before the workers are forked.
+    
+    Args:
+        templates (iterable): Template paths to parse into the template cache.
+    """
+    get_schema_validator()
+    get_slide_validator()
+    load_template()
+    for template_path in templates:
+        load_template(template_path)
+    
+    render_presentation(_WARM_UP_CONFIG)
+    
+    # Keep the warm objects out of the collector, so collections in the
+    # workers do not touch (and copy) the pages they share with the parent
+    gc.collect()
+    gc.freeze()
+
+def serve(main, socket_path=None, workers=None, max_jobs=DEFAULT_MAX_JOBS, templates=()):
+    """
+    Run the daemon until interrupted with Ctrl+C or SIGTERM.
+    
+    Args:
+        main (callable): Runs one command line and returns its exit status,
+            like main.main.
+        socket_path (str, optional): Path of the Unix domain socket;
+            get_socket_path() by default.
+        workers (int, optional): Number of worker processes; the number of
+            CPUs by default.
+        max_jobs (int): Jobs per worker before it is replaced; 0 for no limit.
+        templates (iterable): Template paths to load before forking.
+    
+    Returns:
+        int: Exit status.
+    """
+    if not hasattr(os, 'fork') or not hasattr(socket, 'AF_UNIX'):
+        logger.error("The generation daemon needs fork() and Unix domain sockets")
+        return 1
+    
+    socket_path = socket_path or get_socket_path()
+    workers = workers or os.cpu_count() or 1
+    
+    try:
+        listener = _bind(socket_path)
+    except OSError as e:
+        logger.error(f"Cannot listen on {socket_path}: {e}")
+        return 1
+    
+    children = set()
+    previous_handlers = {signum: signal.signal(signum, _interrupt) for signum in (signal.SIGINT, signal.SIGTERM)}
+    
+    try:
+        start = time.perf_counter()
+        warm_up(templates)
+        logger.info(
+            f"Serving on {socket_path} with {workers} workers "
+            f"(warm-up took {(time.perf_counter() - start) * 1000:.0f} ms)"
+        )
+        
+        while True:
+            while len(children) < workers:
+                children.add(_fork_worker(listener, main, max_jobs))
+            
+            pid, status = os.wait()
+            children.discard(pid)
+            if not (os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0):
+                logger.warning(f"Worker {pid} exited abnormally (wait status {status})")
+                time.sleep(RESPAWN_DELAY)
+    
+    except KeyboardInterrupt:
+        logger.info("Stopping the generation daemon")
+    
+    finally:
+        for signum, handler in previous_handlers.items():
+            signal.signal(signum, handler)
+        for pid in children:
+            _kill(pid)
+        for pid in children:
+            _reap(pid)
+        listener.close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+    
+    return 0
+
+def _bind(socket_path):
+    """
+    Create the listening socket, replacing a stale one.
+    
+    Args:
+        socket_path (str): Path of the socket.
+    
+    Returns:
+        socket.socket: The listening socket, usable by the current user only.
+    
+    Raises:
+        OSError: If the socket cannot be created or another daemon is
+            already listening on it.
+    """
+    if os.path.exists(socket_path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(socket_path)
+        except OSError:
+            # Left behind by a daemon that did not shut down cleanly
+            os.remove(socket_path)
+        else:
+            raise OSError(errno.EADDRINUSE, "another daemon is already listening")
+        finally:
+            probe.close()
+    
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)
+    try:
+        listener.bind(socket_path)
+    except OSError:
+        listener.close()
+        raise
+    finally:
+        os.umask(old_umask)
+    
+    listener.listen(LISTEN_BACKLOG)
+    return listener
+
+def _fork_worker(listener, main, max_jobs):
+    """
+    Fork a worker process that accepts jobs from the socket.
+    
+    Args:
+        listener (socket.socket): The listening socket.
+        main (callable): Runs one command line.
+        max_jobs (int): Jobs to handle before exiting; 0 for no limit.
+    
+    Returns:
+        int: The worker's process ID.
+    """
+    pid = os.fork()
+    if pid:
+        return pid
+    
+    # In the worker: Ctrl+C in the daemon's terminal reaches the whole
+    # process group, but only the parent should act on it
+    status = 0
+    try:
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        
+        handled = 0
+        while not max_jobs or handled < max_jobs:
+            conn, _ = listener.accept()
+            with conn:
+                _handle_connection(conn, main)
+            handled += 1
+    
+    except BaseException:
+        traceback.print_exc()
+        status = 1
+    
+    finally:
+        # Never return into the parent's code
+        os._exit(status)
+
+def _handle_connection(conn, main):
+    """
+    Read a job from a client, run it and send back its output and status.
+    
+    Args:
+        conn (socket.socket): The client's connection.
+        main (callable): Runs one command line.
+    """
+    try:
+        with conn.makefile('rb') as requests:
+            line = requests.readline(MAX_REQUEST_SIZE + 1)
+        
+        try:
+            argv, cwd = _parse_request(line)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            _send(conn, {'stream': 'stderr', 'data': f"Invalid request to the generation daemon: {e}\n"})
+            _send(conn, {'exit': 2})
+            return
+        
+        start = time.perf_counter()
+        status = _run_job(conn, main, argv, cwd)
+        logger.info(f"[{status}] {' '.join(argv)} ({(time.perf_counter() - start) * 1000:.0f} ms)")
+        
+        _send(conn, {'exit': status})
+    
+    except OSError as e:
+        logger.debug(f"Client connection failed: {e}")
+
+def _parse_request(line):
+    """
+    Parse and check a job request.
+    
+    Args:
+        line (bytes): The request frame.
+    
+    Returns:
+        tuple: (argv, cwd).
+    
+    Raises:
+        ValueError: If the request is malformed or asks for a command the
+            daemon does not run.
+    """
+    if len(line) > MAX_REQUEST_SIZE:
+        raise ValueError("request too large")
+    
+    request = json.loads(line)
+    if request.get('version') != PROTOCOL_VERSION:
+        raise ValueError(f"unsupported protocol version {request.get('version')}")
+    
+    argv = [str(arg) for arg in request['argv']]
+    if argv and runs_locally(argv):
+        raise ValueError(f"'{' '.join(argv)}' must be run without the daemon")
+    
+    return argv, str(request['cwd'])
+
+def _run_job(conn, main, argv, cwd):
+    """
+    Run one command line with its output sent to the client.
+    
+    The working directory, logging configuration and standard streams are
+    the client's for the duration of the job and restored afterwards.
+    
+    Args:
+        conn (socket.socket): The client's connection.
+        main (callable): Runs one command line.
+        argv (list): The command line arguments.
+        cwd (str): The client's working directory.
+    
+    Returns:
+        int: The job's exit status.
+    """
+    stdout = _ClientStream(conn, 'stdout')
+    stderr = _ClientStream(conn, 'stderr')
+    
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    handler = logging.StreamHandler(stderr)
+    if saved_handlers:
+        handler.setFormatter(saved_handlers[0].formatter)
+    root.handlers = [handler]
+    
+    saved_cwd = os.getcwd()
+    
+    try:
+        os.chdir(cwd)
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                status = main(argv)
+            except SystemExit as e:
+                status = e.code
+            except Exception:
+                traceback.print_exc()
+                status = 1
+    
+    except OSError as e:
+        stderr.write(f"Cannot run job in {cwd}: {e}\n")
+        status = 1
+    
+    finally:
+        root.handlers = saved_handlers
+        root.setLevel(saved_level)
+        os.chdir(saved_cwd)
+    
+    if status is None:
+        return 0
+    if not isinstance(status, int):
+        # sys.exit("message") prints the message and exits with 1
+        stderr.write(f"{status}\n")
+        return 1
+    return status
+
+class _ClientStream(io.TextIOBase):
+    """
+    Text stream whose writes are sent to a client as output frames.
+    """
+    
+    def __init__(self, conn, name):
+        """
+        Initialize the stream.
+        
+        Args:
+            conn (socket.socket): The client's connection.
+            name (str): 'stdout' or 'stderr'.
+        """
+        self._conn = conn
+        self.name = name
+    
+    def writable(self):
+        return True
+    
+    def write(self, text):
+        if text:
+            try:
+                _send(self._conn, {'stream': self.name, 'data': text})
+            except OSError:
+                # The client went away; finish the job regardless
+                pass
+        return len(text)
+
+def _send(conn, frame):
+    """
+    Send one newline-delimited JSON frame to a client.
+    """
+    conn.sendall(json.dumps(frame).encode('utf-8') + b'\n')
+
+def _interrupt(signum, frame):
+    """
+    Turn SIGINT and SIGTERM into KeyboardInterrupt, so the daemon shuts
+    down cleanly even when started in the background with SIGINT ignored.
+    """
+    raise KeyboardInterrupt
+
+def _kill(pid):
+    """
+    Ask a worker to terminate.
+    """
+    try:
+        os.kill(pid, signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+
+def _reap(pid):
+    """
+    Wait for a worker to exit.
+    """
+    try:
+        os.waitpid(pid, 0)
+    except ChildProcessError:
+        pass
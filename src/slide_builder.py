@@ -10,12 +10,41 @@ import os
 from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN
 from pptx.dml.color import RGBColor
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.packuri import PackURI
+from pptx.parts.slide import SlidePart
 
 from src.element_factory import ElementFactory
 from src.utils import format_text_frame
+from src.image_cache import add_picture
+from src.data_sources import iter_table_rows
 
 logger = logging.getLogger(__name__)
 
+# Map slide types to the standard layout name and its index in the default template
+SLIDE_LAYOUTS = {
+    'title': ('Title Slide', 0),
+    'title_and_content': ('Title and Content', 1),
+    'section': ('Section Header', 2),
+    'two_content': ('Two Content', 3),
+    'comparison': ('Comparison', 4),
+    'title_only': ('Title Only', 5),
+    'blank': ('Blank', 6),
+    'content_with_caption': ('Content with Caption', 7),
+    'picture_with_caption': ('Picture with Caption', 8)
+}
+
+# Suffix added to the title of continuation slides for paginated tables
+CONTINUATION_SUFFIX = ' (cont.)'
+
+# Row height estimate for paginated tables: each text line takes the font
+# size times this factor, plus the default top and bottom cell margins
+TABLE_LINE_SPACING = 1.2
+TABLE_CELL_MARGINS = Inches(0.1)
+
+# Space kept free below a paginated table that has no explicit height
+TABLE_BOTTOM_MARGIN = Inches(0.5)
+
 class SlideBuilder:
     """
     A class for building individual slides in a PowerPoint presentation.
@@ -30,18 +59,30 @@ class SlideBuilder:
         """
         self.presentation = presentation
         self.element_factory = ElementFactory()
+        self._layout_index = None
+        self._slide_ids = None
     
-    def create_slide(self, slide_data, theme_settings):
+    def create_slide(self, slide_data, theme_settings, resolver=None):
         """
         Create a slide based on the provided data.
         
         Args:
             slide_data (dict): Dictionary containing slide data.
             theme_settings (dict): Dictionary of theme settings.
+            resolver (VariableResolver, optional): Resolver used to substitute
+                variables in the slide before it is built.
             
         Returns:
-            Slide: The created slide object.
+            Slide: The created slide object. For a slide with a paginated
+                table this is the first of its slides.
         """
+        table_location = self._find_paginated_table(slide_data)
+        if table_location is not None:
+            return self._create_paginated_slides(slide_data, table_location, theme_settings, resolver)
+        
+        if resolver is not None:
+            slide_data = resolver.resolve(slide_data)
+        
         # Get slide type
         slide_type = slide_data.get('type', 'blank')
         
@@ -49,7 +90,7 @@ class SlideBuilder:
         layout = self._get_slide_layout(slide_type)
         
         # Create the slide
-        slide = self.presentation.slides.add_slide(layout)
+        slide = self._add_slide(layout)
         
         # Apply background
         self._apply_background(slide, slide_data, theme_settings)
@@ -81,6 +122,236 @@ class SlideBuilder:
         
         return slide
     
+    def _add_slide(self, layout):
+        """
+        Add a slide the way slides.add_slide does, in constant time.
+        
+        python-pptx scans every existing slide relationship and slide ID for
+        each new slide, which makes decks with thousands of slides (such as
+        paginated tables) quadratic. A new slide part cannot already be
+        related, and the next slide ID is tracked here instead.
+        
+        Args:
+            layout: The slide layout to use.
+            
+        Returns:
+            Slide: The new slide.
+        """
+        prs_part = self.presentation.part
+        sldIdLst = prs_part._element.get_or_add_sldIdLst()
+        
+        # Resynchronise if slides were added or removed behind our back
+        if self._slide_ids is None or self._slide_ids[0] != len(sldIdLst):
+            self._slide_ids = (len(sldIdLst), sldIdLst._next_id)
+        
+        partname = PackURI('/ppt/slides/slide%d.xml' % (len(sldIdLst) + 1))
+        slide_part = SlidePart.new(partname, prs_part.package, layout.part)
+        rId = prs_part._rels._add_relationship(RT.SLIDE, slide_part)
+        
+        slide = slide_part.slide
+        slide.shapes.clone_layout_placeholders(layout)
+        
+        count, slide_id = self._slide_ids
+        sldIdLst._add_sldId(id=slide_id, rId=rId)
+        self._slide_ids = (count + 1, slide_id + 1)
+        
+        return slide
+    
+    def _find_paginated_table(self, slide_data):
+        """
+        Find the first table on a slide that has 'paginate: true'.
+        
+        Args:
+            slide_data (dict): Slide configuration data.
+            
+        Returns:
+            tuple: (key, index) locating the table, where index is None for
+                tables given as slide content, or None if there is none.
+        """
+        elements = slide_data.get('elements')
+        if isinstance(elements, list):
+            for idx, element_data in enumerate(elements):
+                if self._is_paginated_table(element_data):
+                    return 'elements', idx
+        
+        for key in ('content', 'left_content', 'right_content'):
+            if self._is_paginated_table(slide_data.get(key)):
+                return key, None
+        
+        return None
+    
+    def _is_paginated_table(self, element_data):
+        """
+        Check whether element data describes a table to paginate.
+        
+        Args:
+            element_data: Element or content data.
+            
+        Returns:
+            bool: True for a table with 'paginate: true'.
+        """
+        return (
+            isinstance(element_data, dict)
+            and element_data.get('type') == 'table'
+            and element_data.get('paginate', False) is True
+        )
+    
+    def _create_paginated_slides(self, slide_data, table_location, theme_settings, resolver=None):
+        """
+        Spread a table over as many slides as it needs.
+        
+        Every page repeats the slide's other content and the table's header
+        row, and continuation pages get "(cont.)" appended to their title.
+        Pages are built one at a time as the rows are read, so only a single
+        page of rows is held besides the input data.
+        
+        Args:
+            slide_data (dict): Slide configuration data.
+            table_location (tuple): (key, index) from _find_paginated_table.
+            theme_settings (dict): Theme settings.
+            resolver (VariableResolver, optional): Variable resolver.
+            
+        Returns:
+            Slide: The first slide created.
+        """
+        key, idx = table_location
+        table_data = slide_data[key][idx] if idx is not None else slide_data[key]
+        
+        # Rows from a data source are converted as pages are built, not up front.
+        # Pages are resolved when they are built, but the source is read now
+        if table_data.get('source'):
+            source = table_data['source']
+            rows = iter_table_rows(resolver.resolve(source) if resolver is not None else source)
+        else:
+            rows = iter(table_data.get('data') or [])
+        header = None
+        if table_data.get('has_header', True):
+            header = next(rows, None)
+        
+        frame_height = self._table_frame_height(slide_data, key, table_data)
+        first_slide = None
+        
+        for page_number, (page_rows, page_height) in enumerate(
+            self._paginate_rows(rows, header, frame_height, table_data, theme_settings)
+        ):
+            page_table = dict(table_data, data=[header] + page_rows if header is not None else page_rows)
+            del page_table['paginate']
+            page_table.pop('source', None)
+            
+            page = dict(slide_data)
+            if idx is not None:
+                # Size the table to its rows rather than rows * 0.5 inches
+                if 'height' not in table_data:
+                    page_table['height'] = page_height / Inches(1)
+                page[key] = list(slide_data[key])
+                page[key][idx] = page_table
+            else:
+                page[key] = page_table
+            
+            if page_number > 0 and 'title' in slide_data:
+                page['title'] = f"{slide_data['title']}{CONTINUATION_SUFFIX}"
+            
+            slide = self.create_slide(page, theme_settings, resolver)
+            if first_slide is None:
+                first_slide = slide
+            
+            logger.debug(f"Built table page {page_number + 1} with {len(page_rows)} rows")
+        
+        return first_slide
+    
+    def _paginate_rows(self, rows, header, frame_height, table_data, theme_settings):
+        """
+        Group table rows into pages that fit the table frame.
+        
+        Args:
+            rows (iterator): Body rows of the table.
+            header (list): Header row repeated on every page, or None.
+            frame_height (int): Height available for the table in EMU.
+            table_data (dict): Table configuration data. 'rows_per_page'
+                caps the number of body rows per page.
+            theme_settings (dict): Theme settings.
+            
+        Yields:
+            tuple: (rows, height) for each page, with the page's estimated
+                table height in EMU (including the header). At least one
+                page is always produced.
+        """
+        row_limit = table_data.get('rows_per_page')
+        font_size = theme_settings['body_font_size']
+        header_height = self._estimate_row_height(header, font_size) if header is not None else 0
+        
+        page_rows = []
+        used = header_height
+        
+        for row in rows:
+            row_height = self._estimate_row_height(row, font_size)
+            
+            if page_rows and (used + row_height > frame_height or (row_limit and len(page_rows) >= row_limit)):
+                yield page_rows, used
+                page_rows = []
+                used = header_height
+            
+            page_rows.append(row)
+            used += row_height
+        
+        yield page_rows, used
+    
+    def _estimate_row_height(self, row, font_size):
+        """
+        Estimate the rendered height of a table row.
+        
+        Args:
+            row: The row's cell values.
+            font_size (int): Default font size in points.
+            
+        Returns:
+            int: Row height in EMU.
+        """
+        text_height = 0
+        
+        for cell_data in row if isinstance(row, list) else [row]:
+            size = font_size
+            text = cell_data
+            if isinstance(cell_data, dict):
+                text = cell_data.get('text', '')
+                style = cell_data.get('style')
+                if isinstance(style, dict) and isinstance(style.get('size'), (int, float)):
+                    size = style['size']
+            
+            lines = str(text).count('\n') + 1
+            text_height = max(text_height, lines * size)
+        
+        return int(Pt(text_height * TABLE_LINE_SPACING)) + TABLE_CELL_MARGINS
+    
+    def _table_frame_height(self, slide_data, key, table_data):
+        """
+        Get the height available to a paginated table on each slide.
+        
+        Args:
+            slide_data (dict): Slide configuration data.
+            key (str): 'elements' or the content key holding the table.
+            table_data (dict): Table configuration data.
+            
+        Returns:
+            int: Frame height in EMU.
+        """
+        slide_height = self.presentation.slide_height
+        
+        if key == 'elements':
+            if 'height' in table_data:
+                return Inches(table_data['height'])
+            return slide_height - Inches(table_data.get('top', 1)) - TABLE_BOTTOM_MARGIN
+        
+        # Tables given as content fill a content placeholder of the layout
+        layout = self._get_slide_layout(slide_data.get('type', 'blank'))
+        placeholders = [ph for ph in layout.placeholders if ph.placeholder_format.type == 7]
+        position = 1 if key == 'right_content' else 0
+        
+        if len(placeholders) > position and placeholders[position].height:
+            return placeholders[position].height
+        
+        return slide_height - Inches(2)
+    
     def _get_slide_layout(self, slide_type):
         """
         Get the appropriate slide layout for the given slide type.
@@ -91,27 +362,45 @@ class SlideBuilder:
         Returns:
             SlideLayout: The slide layout to use.
         """
-        # Map slide types to indices in the slide layout collection
-        slide_layouts = {
-            'title': 0,              # Title Slide
-            'title_and_content': 1,  # Title and Content
-            'section': 2,            # Section Header
-            'two_content': 3,        # Two Content
-            'comparison': 4,         # Comparison
-            'title_only': 5,         # Title Only
-            'blank': 6,              # Blank
-            'content_with_caption': 7,  # Content with Caption
-            'picture_with_caption': 8   # Picture with Caption
-        }
-        
-        layout_idx = slide_layouts.get(slide_type, 6)  # Default to blank
-        
-        # Handle case where presentation doesn't have enough layouts
-        if layout_idx >= len(self.presentation.slide_layouts):
-            logger.warning(f"Slide layout index {layout_idx} not available, using blank (6)")
-            layout_idx = min(6, len(self.presentation.slide_layouts) - 1)
-        
-        return self.presentation.slide_layouts[layout_idx]
+        if self._layout_index is None:
+            self._layout_index = self._build_layout_index()
+        
+        layout = self._layout_index.get(slide_type)
+        if layout is None:
+            layout = self._layout_index['blank']  # Default to blank
+        
+        return layout
+    
+    def _build_layout_index(self):
+        """
+        Map every slide type to a layout once per presentation.
+        
+        Layouts are matched by name first, so templates that order their
+        layouts differently still get the right one, and fall back to the
+        standard layout index.
+        
+        Returns:
+            dict: Mapping of slide type to SlideLayout.
+        """
+        layouts = list(self.presentation.slide_layouts)
+        by_name = {}
+        for layout in layouts:
+            by_name.setdefault(layout.name.strip().lower(), layout)
+        
+        index = {}
+        for slide_type, (layout_name, layout_idx) in SLIDE_LAYOUTS.items():
+            layout = by_name.get(layout_name.lower())
+            
+            if layout is None:
+                # Handle case where presentation doesn't have enough layouts
+                if layout_idx >= len(layouts):
+                    logger.warning(f"Slide layout index {layout_idx} not available, using blank (6)")
+                    layout_idx = min(6, len(layouts) - 1)
+                layout = layouts[layout_idx]
+            
+            index[slide_type] = layout
+        
+        return index
     
     def _apply_background(self, slide, slide_data, theme_settings):
         """
@@ -157,7 +446,10 @@ class SlideBuilder:
                     top = Inches(0)
                     width = self.presentation.slide_width
                     height = self.presentation.slide_height
-                    slide.shapes.add_picture(image_path, left, top, width, height)
+                    image_optimizer = self.element_factory.image_optimizer
+                    if image_optimizer and bg_data.get('optimize', True):
+                        image_path = image_optimizer.optimize(image_path, width, height)
+                    add_picture(slide.shapes, image_path, left, top, width, height)
                     logger.debug(f"Added image background: {image_path}")
                 else:
                     logger.warning(f"Background image not found: {image_path}")
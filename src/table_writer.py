@@ -0,0 +1,269 @@
+"""
+Table Writer Module
+
+This module fills large tables by generating the a:tr/a:tc XML for the
+whole table in one pass and parsing it once, instead of formatting each
+cell through python-pptx proxies. Cell styles are interned, so every
+distinct combination of run, paragraph and fill properties is serialized
+only once per table. The result is identical to filling the table cell by
+cell.
+"""
+
+import re
+import logging
+from xml.sax.saxutils import escape
+
+from lxml import etree
+from pptx.dml.color import RGBColor
+from pptx.enum.text import PP_ALIGN
+from pptx.oxml import element_class_lookup
+from pptx.oxml.ns import nsdecls
+from pptx.oxml.xmlchemy import OxmlElement
+
+from src.utils import get_rgb_color, get_run_style, apply_run_style
+
+logger = logging.getLogger(__name__)
+
+# Unlike python-pptx's own parser this one keeps whitespace-only text, which
+# is significant inside a:t elements
+_parser = etree.XMLParser(resolve_entities=False)
+_parser.set_element_class_lookup(element_class_lookup)
+
+_NSDECL = ' ' + nsdecls('a')
+
+# Control characters python-pptx escapes in run text (tab and line feed excepted)
+_CTRL_CHARS = re.compile(r'([\x00-\x08\x0B-\x1F])')
+
+_EMPTY_TEXT_BODY = '<a:txBody><a:bodyPr/><a:lstStyle/><a:p/></a:txBody>'
+
+class _TableStyles:
+    """
+    Interned XML fragments for the cell styles used in one table.
+    """
+    
+    def __init__(self):
+        self._rPr = {}
+        self._pPr = {}
+        self._tcPr = {}
+    
+    def rPr(self, style_keys):
+        """
+        Get the a:rPr XML for a sequence of run styles applied in order.
+        
+        Args:
+            style_keys (tuple): Style tuples as passed to format_text_frame.
+        
+        Returns:
+            str: Serialized a:rPr element.
+        """
+        xml = self._rPr.get(style_keys)
+        if xml is None:
+            rPr = OxmlElement('a:rPr')
+            for style_key in style_keys:
+                apply_run_style(rPr, get_run_style(style_key))
+            xml = self._rPr[style_keys] = _serialize(rPr)
+        return xml
+    
+    def pPr(self, alignment):
+        """
+        Get the a:pPr XML for a paragraph alignment.
+        
+        Args:
+            alignment (PP_ALIGN): Paragraph alignment.
+        
+        Returns:
+            str: Serialized a:pPr element.
+        """
+        xml = self._pPr.get(alignment)
+        if xml is None:
+            pPr = OxmlElement('a:p').get_or_add_pPr()
+            pPr.algn = alignment
+            xml = self._pPr[alignment] = _serialize(pPr)
+        return xml
+    
+    def tcPr(self, fill_color):
+        """
+        Get the a:tcPr XML for a cell fill.
+        
+        Args:
+            fill_color (tuple): RGB fill color, or None for no fill.
+        
+        Returns:
+            str: Serialized a:tcPr element.
+        """
+        xml = self._tcPr.get(fill_color)
+        if xml is None:
+            if fill_color is None:
+                xml = '<a:tcPr/>'
+            else:
+                xml = f'<a:tcPr><a:solidFill><a:srgbClr val="{RGBColor(*fill_color)}"/></a:solidFill></a:tcPr>'
+            self._tcPr[fill_color] = xml
+        return xml
+
+def write_table(table, table_data, height, element_data, theme_settings):
+    """
+    Replace a table's rows with rows generated from 2-D data.
+    
+    Produces the same cells as filling the table through python-pptx:
+    dict cells with their own style, plain cells in the body style, the
+    header row in the accent style, and zebra striping if requested.
+    
+    Args:
+        table: The table created for the data (any number of rows).
+        table_data (list): Rows of cell values or cell dicts.
+        height (int): Total table height in EMU, split evenly across rows.
+        element_data (dict): Table configuration data.
+        theme_settings (dict): Theme settings.
+    """
+    tbl = table._tbl
+    rows = len(table_data)
+    cols = len(tbl.tblGrid.gridCol_lst)
+    styles = _TableStyles()
+    
+    # Row templates shared by every plain cell
+    body_style = (theme_settings['body_font'], theme_settings['body_font_size'],
+                  _rgb_key(theme_settings['text_color']), None, None, None)
+    header_style = (None, None, _rgb_key(theme_settings['accent_color']), True, None, None)
+    has_header = element_data.get('has_header', True)
+    
+    zebra_color = None
+    table_style = element_data.get('style', {})
+    if table_style.get('zebra_striping', False):
+        if 'alternate_row_color' in table_style:
+            zebra_color = get_rgb_color(table_style['alternate_row_color'])
+        else:
+            # Lighten accent color
+            zebra_color = tuple(min(255, c + 40) for c in theme_settings['accent_color'])
+    
+    row_height = height // rows
+    parts = [f'<a:tbl{_NSDECL}>']
+    
+    for i, row_data in enumerate(table_data):
+        if i == rows - 1:
+            row_height = height - (rows - 1) * row_height
+        parts.append(f'<a:tr h="{int(row_height)}">')
+        
+        row_fill = zebra_color if i % 2 == 1 else None
+        plain_styles = (body_style, header_style) if i == 0 and has_header else (body_style,)
+        filled = 0
+        
+        for j, cell_data in enumerate(row_data):
+            if j >= cols:
+                continue
+            filled = j + 1
+            
+            fill_color = None
+            alignment = None
+            
+            if isinstance(cell_data, dict):
+                # Complex cell with formatting
+                text = cell_data.get('text', '')
+                run_styles = ()
+                
+                if 'style' in cell_data:
+                    style = cell_data['style']
+                    if 'fill_color' in style:
+                        fill_color = get_rgb_color(style['fill_color'])
+                    run_styles = ((
+                        style.get('font', theme_settings['body_font']),
+                        style.get('size', theme_settings['body_font_size']),
+                        _rgb_key(get_rgb_color(style.get('color', theme_settings['text_color']))),
+                        style.get('bold', False),
+                        style.get('italic', False),
+                        style.get('underline', False)
+                    ),)
+                    alignment = style.get('align', PP_ALIGN.LEFT)
+            else:
+                # Simple cell with just text
+                text = str(cell_data)
+                run_styles = plain_styles
+            
+            parts.append('<a:tc>')
+            parts.append(_text_body_xml(text, styles.rPr(run_styles) if run_styles else None,
+                                        styles.pPr(alignment) if alignment is not None else None))
+            parts.append(styles.tcPr(row_fill if row_fill is not None else fill_color))
+            parts.append('</a:tc>')
+        
+        # Cells without data keep their defaults (apart from zebra striping)
+        for _ in range(filled, cols):
+            parts.append('<a:tc>' + _EMPTY_TEXT_BODY + styles.tcPr(row_fill) + '</a:tc>')
+        
+        parts.append('</a:tr>')
+    
+    parts.append('</a:tbl>')
+    generated = etree.fromstring(''.join(parts), _parser)
+    
+    for tr in tbl.tr_lst:
+        tbl.remove(tr)
+    tbl.extend(list(generated))
+    
+    logger.debug(f"Bulk-wrote {rows}x{cols} table using {len(styles._rPr)} run styles")
+
+def _text_body_xml(text, rPr_xml, pPr_xml):
+    """
+    Build the a:txBody XML for cell text, as setting cell.text would.
+    
+    Each line feed starts a paragraph and each vertical tab a line break.
+    
+    Args:
+        text (str): Cell text.
+        rPr_xml (str): Run properties for every run, or None.
+        pPr_xml (str): Paragraph properties for every paragraph, or None.
+    
+    Returns:
+        str: Serialized a:txBody element.
+    """
+    parts = ['<a:txBody><a:bodyPr/><a:lstStyle/>']
+    
+    for p_text in text.split('\n'):
+        segments = p_text.split('\v')
+        if len(segments) == 1 and not p_text and pPr_xml is None:
+            parts.append('<a:p/>')
+            continue
+        
+        parts.append('<a:p>')
+        if pPr_xml is not None:
+            parts.append(pPr_xml)
+        
+        for idx, r_text in enumerate(segments):
+            # Breaks only go between segments; empty segments get no run
+            if idx > 0:
+                parts.append('<a:br/>')
+            if r_text:
+                parts.append('<a:r>')
+                if rPr_xml is not None:
+                    parts.append(rPr_xml)
+                parts.append('<a:t>')
+                parts.append(escape(_CTRL_CHARS.sub(lambda m: '_x%04X_' % ord(m.group(1)), r_text)))
+                parts.append('</a:t></a:r>')
+        
+        parts.append('</a:p>')
+    
+    parts.append('</a:txBody>')
+    return ''.join(parts)
+
+def _rgb_key(color):
+    """
+    Normalize a color the way format_text_frame does, for use in a style key.
+    
+    Args:
+        color: RGB color value.
+    
+    Returns:
+        tuple: The color as a tuple, or None if it is not an RGB triple.
+    """
+    if isinstance(color, (tuple, list)) and len(color) == 3:
+        return tuple(color)
+    return None
+
+def _serialize(element):
+    """
+    Serialize a standalone element for embedding in the generated table XML.
+    
+    Args:
+        element: An element in the DrawingML namespace.
+    
+    Returns:
+        str: The element's XML without its namespace declaration.
+    """
+    return etree.tostring(element, encoding='unicode').replace(_NSDECL, '')
@@ -0,0 +1,120 @@
+"""
+Template Cache Module
+
+This module keeps parsed presentation templates in memory so that repeated
+generator runs in one process (batch workers, daemons, watch mode) do not
+re-open and re-parse the same .pptx file.
+"""
+
+import io
+import os
+import copy
+import hashlib
+import logging
+from collections import OrderedDict
+
+import pptx
+from pptx import Presentation
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of distinct templates kept in memory
+MAX_CACHED_TEMPLATES = 8
+
+# Path of the template python-pptx uses for Presentation() without arguments
+DEFAULT_TEMPLATE_PATH = os.path.join(os.path.dirname(pptx.__file__), 'templates', 'default.pptx')
+
+# (path, mtime, size) -> {'sha1': str, 'presentation': Presentation}
+_templates = OrderedDict()
+
+# sha1 -> pristine Presentation, so identical files at different paths share one parse
+_by_hash = {}
+
+_stats = {'hits': 0, 'misses': 0}
+
+def load_template(template_path=None):
+    """
+    Get a fresh presentation based on a template.
+    
+    The template is parsed once and kept as a pristine in-memory package;
+    every call hands out a deep copy of it, which is considerably cheaper
+    than unzipping and parsing the file again.
+    
+    Args:
+        template_path (str, optional): Path to a PowerPoint template file.
+            Defaults to python-pptx's built-in blank template.
+    
+    Returns:
+        Presentation: A new presentation object owned by the caller.
+    """
+    entry = _get_entry(template_path or DEFAULT_TEMPLATE_PATH)
+    return copy.deepcopy(entry['presentation'])
+
+def template_fingerprint(template_path=None):
+    """
+    Get the SHA-1 content hash of a template.
+    
+    Args:
+        template_path (str, optional): Path to a PowerPoint template file.
+            Defaults to python-pptx's built-in blank template.
+    
+    Returns:
+        str: Hex digest of the template file contents.
+    """
+    return _get_entry(template_path or DEFAULT_TEMPLATE_PATH)['sha1']
+
+def get_template_cache_stats():
+    """
+    Get template cache statistics.
+    
+    Returns:
+        dict: Dictionary with 'hits', 'misses' and 'entries' keys.
+    """
+    return dict(_stats, entries=len(_templates))
+
+def clear_template_cache():
+    """
+    Drop every cached template.
+    """
+    _templates.clear()
+    _by_hash.clear()
+
+def _get_entry(template_path):
+    """
+    Look up (or load) the cache entry for a template file.
+    
+    Args:
+        template_path (str): Path to the template file.
+    
+    Returns:
+        dict: Cache entry with 'sha1' and 'presentation' keys.
+    """
+    stat = os.stat(template_path)
+    key = (os.path.abspath(template_path), stat.st_mtime_ns, stat.st_size)
+    
+    entry = _templates.get(key)
+    if entry is not None:
+        _stats['hits'] += 1
+        _templates.move_to_end(key)
+        return entry
+    
+    _stats['misses'] += 1
+    with open(template_path, 'rb') as f:
+        blob = f.read()
+    sha1 = hashlib.sha1(blob).hexdigest()
+    
+    presentation = _by_hash.get(sha1)
+    if presentation is None:
+        presentation = Presentation(io.BytesIO(blob))
+        _by_hash[sha1] = presentation
+        logger.debug(f"Loaded template into cache: {template_path}")
+    
+    entry = {'sha1': sha1, 'presentation': presentation}
+    _templates[key] = entry
+    
+    if len(_templates) > MAX_CACHED_TEMPLATES:
+        _, evicted = _templates.popitem(last=False)
+        if not any(e['sha1'] == evicted['sha1'] for e in _templates.values()):
+            _by_hash.pop(evicted['sha1'], None)
+    
+    return entry
@@ -6,18 +6,328 @@ This module provides helper functions for the PowerPoint Generator.
 
 import os
 import re
+import copy
 import logging
+import struct
+import functools
+from collections import OrderedDict
+import yaml
 from pptx.util import Pt
 from pptx.enum.text import PP_ALIGN
 from pptx.dml.color import RGBColor
+from pptx.oxml.ns import qn
+from pptx.oxml.xmlchemy import OxmlElement
+from pptx.text.text import Font
+
+from src.profiling import timed
+from src.errors import ConfigError
 
 logger = logging.getLogger(__name__)
 
+# Prefer the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
+def load_yaml(stream):
+    """
+    Parse YAML content using the fastest available safe loader.
+    
+    Args:
+        stream: A string or open file containing YAML.
+        
+    Returns:
+        The parsed data structure.
+    """
+    return yaml.load(stream, Loader=YamlLoader)
+
+def load_config_file(file_path):
+    """
+    Load a YAML configuration file.
+    
+    Args:
+        file_path (str): Path to the YAML file.
+        
+    Returns:
+        The parsed configuration.
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return load_yaml(f)
+
+def load_config(source):
+    """
+    Load a configuration given in memory.
+    
+    Args:
+        source: An already parsed mapping, YAML (or JSON) text as str or
+            UTF-8 bytes, or a readable text or binary stream of YAML.
+        
+    Returns:
+        dict: The parsed configuration.
+        
+    Raises:
+        ConfigError: If the YAML cannot be parsed or is not a mapping.
+    """
+    if isinstance(source, dict):
+        return source
+    
+    try:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = bytes(source).decode('utf-8')
+        config = load_yaml(source)
+    except (yaml.YAMLError, UnicodeDecodeError) as e:
+        raise ConfigError(f"Cannot parse configuration: {e}") from e
+    
+    if not isinstance(config, dict):
+        raise ConfigError(f"Configuration must be a mapping, not {type(config).__name__}")
+    return config
+
+# Top-level keys that must be known before the first slide is built
+STREAM_HEADER_KEYS = ('variables', 'settings')
+
+class ConfigStream:
+    """
+    Reads a YAML configuration file one slide at a time.
+    
+    The top-level keys before 'slides' are read up front into 'header'.
+    Slides are then composed from the parser's event stream and constructed
+    one mapping at a time, so only the slide currently being built is held
+    in memory. If 'variables' or 'settings' come after 'slides' (as with
+    files written by yaml.dump, which sorts keys), a lightweight event scan
+    reads them ahead of the slides. Other keys that follow 'slides' (such
+    as 'transitions') are added to 'header' once the slides are consumed.
+    
+    Additional YAML documents after the first (separated by '---') are also
+    treated as slides: each may be a single slide mapping or a list of them.
+    """
+    
+    def __init__(self, file_path):
+        """
+        Open the file and read the configuration header.
+        
+        Args:
+            file_path (str): Path to the YAML file.
+        """
+        self.file_path = file_path
+        self.header = {}
+        self._file = open(file_path, 'r', encoding='utf-8')
+        self._loader = YamlLoader(self._file)
+        self._anchors = {}
+        self._in_slides = False
+        
+        try:
+            self._read_header()
+        except Exception:
+            self.close()
+            raise
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """
+        Release the parser and close the file.
+        """
+        if self._loader is not None:
+            self._loader.dispose()
+            self._loader = None
+        if not self._file.closed:
+            self._file.close()
+    
+    def _read_header(self):
+        """
+        Consume top-level keys up to the start of the 'slides' sequence.
+        """
+        loader = self._loader
+        loader.get_event()  # StreamStartEvent
+        
+        if loader.check_event(yaml.StreamEndEvent):
+            return
+        
+        loader.get_event()  # DocumentStartEvent
+        if not loader.check_event(yaml.MappingStartEvent):
+            raise yaml.YAMLError("Streaming mode requires the first document to be a mapping")
+        loader.get_event()
+        
+        while not loader.check_event(yaml.MappingEndEvent):
+            key = self._construct(self._compose_node())
+            
+            if key == 'slides':
+                if not loader.check_event(yaml.SequenceStartEvent):
+                    raise yaml.YAMLError("Streaming mode requires 'slides' to be a list")
+                loader.get_event()
+                self._in_slides = True
+                
+                if any(k not in self.header for k in STREAM_HEADER_KEYS):
+                    self._scan_trailing_header()
+                return
+            
+            self.header[key] = self._construct(self._compose_node())
+        
+        self._finish_document()
+    
+    def slides(self):
+        """
+        Iterate over the slides in the file.
+        
+        Yields:
+            dict: One slide mapping at a time.
+        """
+        loader = self._loader
+        
+        if self._in_slides:
+            while not loader.check_event(yaml.SequenceEndEvent):
+                yield self._construct(self._compose_node())
+            loader.get_event()
+            self._in_slides = False
+            
+            # Remaining top-level keys of the first document
+            while not loader.check_event(yaml.MappingEndEvent):
+                key = self._construct(self._compose_node())
+                if key in STREAM_HEADER_KEYS:
+                    # Already read ahead by _scan_trailing_header
+                    _skip_node(loader)
+                    continue
+                self.header[key] = self._construct(self._compose_node())
+            
+            self._finish_document()
+        
+        # Any further documents hold slides (or lists of slides)
+        while loader is not None and not loader.check_event(yaml.StreamEndEvent):
+            loader.get_event()  # DocumentStartEvent
+            data = self._construct(self._compose_node())
+            loader.get_event()  # DocumentEndEvent
+            
+            if isinstance(data, list):
+                yield from data
+            elif data is not None:
+                yield data
+        
+        self.close()
+    
+    def _scan_trailing_header(self):
+        """
+        Read header keys that appear after 'slides' using a second parser.
+        
+        The slides are skipped at the event level, without composing or
+        constructing them, so the scan keeps memory flat.
+        """
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            scanner = ConfigStream.__new__(ConfigStream)
+            scanner._loader = YamlLoader(f)
+            scanner._anchors = {}
+            loader = scanner._loader
+            
+            try:
+                for _ in range(3):
+                    loader.get_event()  # Stream, document and mapping start
+                
+                while not loader.check_event(yaml.MappingEndEvent):
+                    key = scanner._construct(scanner._compose_node())
+                    if key in STREAM_HEADER_KEYS and key not in self.header:
+                        self.header[key] = scanner._construct(scanner._compose_node())
+                    else:
+                        _skip_node(loader)
+            finally:
+                loader.dispose()
+    
+    def _finish_document(self):
+        """
+        Consume the end of the first document's top-level mapping.
+        """
+        self._loader.get_event()  # MappingEndEvent
+        self._loader.get_event()  # DocumentEndEvent
+    
+    def _construct(self, node):
+        """
+        Construct a Python object from a composed node.
+        """
+        return self._loader.construct_document(node)
+    
+    def _compose_node(self):
+        """
+        Compose the next node from parser events.
+        
+        This mirrors yaml.composer.Composer but works on the event API of
+        both the pure Python and the libyaml loaders.
+        """
+        loader = self._loader
+        event = loader.get_event()
+        
+        if isinstance(event, yaml.AliasEvent):
+            if event.anchor not in self._anchors:
+                raise yaml.composer.ComposerError(
+                    None, None, f"found undefined alias {event.anchor}", event.start_mark
+                )
+            return self._anchors[event.anchor]
+        
+        if isinstance(event, yaml.ScalarEvent):
+            tag = event.tag
+            if tag is None or tag == '!':
+                tag = loader.resolve(yaml.ScalarNode, event.value, event.implicit)
+            node = yaml.ScalarNode(tag, event.value, event.start_mark, event.end_mark, style=event.style)
+        
+        elif isinstance(event, yaml.SequenceStartEvent):
+            tag = event.tag
+            if tag is None or tag == '!':
+                tag = loader.resolve(yaml.SequenceNode, None, event.implicit)
+            node = yaml.SequenceNode(tag, [], event.start_mark, None, flow_style=event.flow_style)
+            while not loader.check_event(yaml.SequenceEndEvent):
+                node.value.append(self._compose_node())
+            node.end_mark = loader.get_event().end_mark
+        
+        elif isinstance(event, yaml.MappingStartEvent):
+            tag = event.tag
+            if tag is None or tag == '!':
+                tag = loader.resolve(yaml.MappingNode, None, event.implicit)
+            node = yaml.MappingNode(tag, [], event.start_mark, None, flow_style=event.flow_style)
+            while not loader.check_event(yaml.MappingEndEvent):
+                key_node = self._compose_node()
+                node.value.append((key_node, self._compose_node()))
+            node.end_mark = loader.get_event().end_mark
+        
+        else:
+            raise yaml.composer.ComposerError(
+                None, None, f"unexpected event {event!r}", event.start_mark
+            )
+        
+        if event.anchor is not None:
+            self._anchors[event.anchor] = node
+        
+        return node
+
+def _skip_node(loader):
+    """
+    Consume the events of the next node without composing it.
+    
+    Args:
+        loader: A YAML loader positioned at the start of a node.
+    """
+    depth = 0
+    while True:
+        event = loader.get_event()
+        if isinstance(event, (yaml.SequenceStartEvent, yaml.MappingStartEvent)):
+            depth += 1
+        elif isinstance(event, (yaml.SequenceEndEvent, yaml.MappingEndEvent)):
+            depth -= 1
+        if depth == 0:
+            return
+
+# Number of distinct run styles whose rPr XML is kept for reuse
+RUN_STYLE_CACHE_SIZE = 256
+
 def format_text_frame(text_frame, font=None, size=None, color=None, bold=None, 
                      italic=None, underline=None, alignment=None, line_spacing=None):
     """
     Apply formatting to a text frame.
     
+    The run properties for a style are built once and cached, then copied
+    onto every run in a single pass over the paragraphs.
+    
     Args:
         text_frame: The text frame to format.
         font (str, optional): Font name.
@@ -32,36 +342,131 @@ def format_text_frame(text_frame, font=None, size=None, color=None, bold=None,
     if not hasattr(text_frame, 'paragraphs'):
         return
     
-    # Set paragraph properties that apply to all runs
-    if alignment is not None:
-        for paragraph in text_frame.paragraphs:
-            paragraph.alignment = alignment
+    # Colors that are not RGB triples are ignored
+    if isinstance(color, (tuple, list)) and len(color) == 3:
+        color = tuple(color)
+    else:
+        color = None
     
-    if line_spacing is not None:
-        for paragraph in text_frame.paragraphs:
-            paragraph.line_spacing = line_spacing
+    style_key = (font, size, color, bold, italic, underline)
+    has_run_style = any(value is not None for value in style_key)
+    style = None
     
-    # Set run-level properties
-    for paragraph in text_frame.paragraphs:
-        for run in paragraph.runs:
-            if font is not None:
-                run.font.name = font
-            
-            if size is not None:
-                run.font.size = Pt(size)
-            
-            if color is not None:
-                if isinstance(color, (tuple, list)) and len(color) == 3:
-                    run.font.color.rgb = RGBColor(*color)
-            
-            if bold is not None:
-                run.font.bold = bold
-            
-            if italic is not None:
-                run.font.italic = italic
-            
-            if underline is not None:
-                run.font.underline = underline
+    for p in text_frame._txBody.p_lst:
+        # Set paragraph properties that apply to all runs
+        if alignment is not None:
+            p.get_or_add_pPr().algn = alignment
+        
+        if line_spacing is not None:
+            p.get_or_add_pPr().line_spacing = line_spacing
+        
+        if not has_run_style:
+            continue
+        
+        # Set run-level properties
+        for r in p.r_lst:
+            if style is None:
+                style = get_run_style(style_key)
+            apply_run_style(r.get_or_add_rPr(), style)
+
+def get_run_style(style_key):
+    """
+    Get the compiled run properties for a style, using the cache when possible.
+    
+    Args:
+        style_key (tuple): (font, size, color, bold, italic, underline).
+        
+    Returns:
+        tuple: Compiled style, see _compile_run_style.
+    """
+    try:
+        return _compile_run_style(*style_key)
+    except TypeError:
+        # Unhashable values (e.g. nested lists) are compiled without caching
+        return _compile_run_style.__wrapped__(*style_key)
+
+@functools.lru_cache(maxsize=RUN_STYLE_CACHE_SIZE)
+def _compile_run_style(font, size, color, bold, italic, underline):
+    """
+    Build the a:rPr attributes and child elements for a run style.
+    
+    The style is applied to a scratch element through python-pptx's own
+    Font properties, so the cached XML is exactly what setting each property
+    on every run would produce.
+    
+    Args:
+        font (str): Font name, or None.
+        size (int): Font size in points, or None.
+        color (tuple): RGB color, or None.
+        bold (bool): Bold, or None.
+        italic (bool): Italic, or None.
+        underline (bool): Underline, or None.
+        
+    Returns:
+        tuple: (attributes, children, typeface, rgb) where attributes holds
+            (name, value) pairs in assignment order, children the template
+            child elements in schema order, and typeface/rgb the values to
+            update on runs that already have those children.
+    """
+    rPr = OxmlElement('a:rPr')
+    run_font = Font(rPr)
+    
+    if font is not None:
+        run_font.name = font
+    
+    if size is not None:
+        run_font.size = Pt(size)
+    
+    if color is not None:
+        run_font.color.rgb = RGBColor(*color)
+    
+    if bold is not None:
+        run_font.bold = bold
+    
+    if italic is not None:
+        run_font.italic = italic
+    
+    if underline is not None:
+        run_font.underline = underline
+    
+    latin = rPr.latin
+    solid_fill = rPr.find(qn('a:solidFill'))
+    
+    return (
+        tuple(rPr.attrib.items()),
+        tuple(rPr),
+        latin.get('typeface') if latin is not None else None,
+        solid_fill[0].get('val') if solid_fill is not None else None
+    )
+
+def apply_run_style(rPr, style):
+    """
+    Apply a compiled run style to a run's a:rPr element.
+    
+    Args:
+        rPr: The run properties element.
+        style (tuple): Compiled style from _compile_run_style.
+    """
+    attributes, children, typeface, rgb = style
+    
+    for name, value in attributes:
+        rPr.set(name, value)
+    
+    if not children:
+        return
+    
+    if len(rPr) == 0:
+        # Fresh run: the template children are already in schema order
+        for child in children:
+            rPr.append(copy.deepcopy(child))
+        return
+    
+    # Merge into existing children the same way the Font properties do
+    if typeface is not None:
+        rPr.get_or_add_latin().set('typeface', typeface)
+    
+    if rgb is not None:
+        rPr.get_or_change_to_solidFill().get_or_change_to_srgbClr().set('val', rgb)
 
 def apply_theme_settings(presentation, theme_settings):
     """
@@ -76,31 +481,149 @@ def apply_theme_settings(presentation, theme_settings):
     # Most formatting is applied at the individual element level.
     logger.debug("Applied theme settings to presentation")
 
+# Number of resolved strings cached per variable set
+STRING_CACHE_SIZE = 8192
+
+# Number of variable sets whose resolvers are kept alive between decks
+RESOLVER_CACHE_SIZE = 16
+_resolver_cache = OrderedDict()
+
+# Matches both {{var}} and ${var} references in a single pass
+VARIABLE_PATTERN = re.compile(r'\{\{([^{}]+)\}\}|\$\{([^{}]+)\}')
+
+class VariableResolver:
+    """
+    Substitutes variable references using a precompiled pattern.
+    
+    A resolver is built once per deck. Variable values are converted to
+    strings up front and every string is rewritten in a single pass over
+    the text, so the cost no longer grows with the number of variables.
+    """
+    
+    def __init__(self, variables):
+        """
+        Initialize the resolver with a set of variables.
+        
+        Args:
+            variables (dict): Dictionary of variables.
+        """
+        self.variables = variables or {}
+        self._values = {str(name): str(value) for name, value in self.variables.items()}
+        # Resolved strings are cached per resolver, i.e. per variable set
+        self._resolve_cached = functools.lru_cache(maxsize=STRING_CACHE_SIZE)(self._substitute)
+    
+    def resolve_string(self, text):
+        """
+        Resolve variables in a single string.
+        
+        Args:
+            text (str): The string to process.
+            
+        Returns:
+            str: The resolved string, or the original object if nothing changed.
+        """
+        # Both syntaxes contain '{', so strings without it can be skipped
+        if not self._values or '{' not in text:
+            return text
+        
+        return self._resolve_cached(text)
+    
+    @timed('resolve_variables')
+    def _substitute(self, text):
+        """
+        Run the substitution pattern over a string.
+        """
+        result, count = VARIABLE_PATTERN.subn(self._replace, text)
+        return result if count else text
+    
+    def _replace(self, match):
+        """
+        Return the value for a matched reference, leaving unknown names as-is.
+        """
+        name = match.group(1) or match.group(2)
+        return self._values.get(name, match.group(0))
+    
+    def resolve(self, data):
+        """
+        Resolve variables in a data structure.
+        
+        Containers are only copied along the paths where a string actually
+        changed; everything else is returned as the original object.
+        
+        Args:
+            data: The data structure to process (dict, list, str).
+            
+        Returns:
+            The processed data structure with variables resolved.
+        """
+        if isinstance(data, str):
+            return self.resolve_string(data)
+        
+        elif isinstance(data, dict):
+            result = None
+            for key, value in data.items():
+                resolved = self.resolve(value)
+                if resolved is not value:
+                    if result is None:
+                        result = dict(data)
+                    result[key] = resolved
+            return data if result is None else result
+        
+        elif isinstance(data, list):
+            # Lists of numbers (chart values, table columns) need no walk
+            if not any(isinstance(item, (str, dict, list)) for item in data):
+                return data
+            
+            result = None
+            for idx, item in enumerate(data):
+                resolved = self.resolve(item)
+                if resolved is not item:
+                    if result is None:
+                        result = list(data)
+                    result[idx] = resolved
+            return data if result is None else result
+        
+        return data
+
+def get_variable_resolver(variables):
+    """
+    Get a resolver for a set of variables, reusing one built earlier for
+    an identical set so its string cache stays warm across decks.
+    
+    Args:
+        variables (dict): Dictionary of variables.
+        
+    Returns:
+        VariableResolver: The resolver for these variables.
+    """
+    key = tuple((str(name), str(value)) for name, value in (variables or {}).items())
+    
+    resolver = _resolver_cache.get(key)
+    if resolver is None:
+        resolver = VariableResolver(variables)
+        _resolver_cache[key] = resolver
+        if len(_resolver_cache) > RESOLVER_CACHE_SIZE:
+            _resolver_cache.popitem(last=False)
+    else:
+        _resolver_cache.move_to_end(key)
+    
+    return resolver
+
 def resolve_variables(data, variables):
     """
     Resolve variables in a data structure.
     
     Args:
         data: The data structure to process (dict, list, str).
-        variables (dict): Dictionary of variables.
+        variables (dict or VariableResolver): Dictionary of variables, or a
+            resolver already built for them.
         
     Returns:
         The processed data structure with variables resolved.
     """
-    if isinstance(data, dict):
-        return {k: resolve_variables(v, variables) for k, v in data.items()}
-    elif isinstance(data, list):
-        return [resolve_variables(item, variables) for item in data]
-    elif isinstance(data, str):
-        # Replace variables in string
-        result = data
-        for var_name, var_value in variables.items():
-            # Match both {{var}} and ${var} syntax
-            result = result.replace('{{' + var_name + '}}', str(var_value))
-            result = result.replace('${' + var_name + '}', str(var_value))
-        return result
-    else:
-        return data
+    if not isinstance(variables, VariableResolver):
+        variables = VariableResolver(variables)
+    return variables.resolve(data)
 
 def get_rgb_color(color_value):
     """
@@ -154,6 +677,9 @@ def get_rgb_color(color_value):
     logger.warning(f"Could not parse color value: {color_value}, using black")
     return (0, 0, 0)
 
+# JPEG start-of-frame markers that carry the image dimensions
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
 def get_image_dimensions(image_path):
     """
     Get the dimensions of an image file.
@@ -164,19 +690,201 @@ def get_image_dimensions(image_path):
     Returns:
         tuple: (width, height) in pixels, or None if the file doesn't exist.
     """
+    info = probe_image(image_path)
+    if info is None:
+        return None
+    return info[0], info[1]
+
+def probe_image(image_path):
+    """
+    Get the pixel size and resolution of an image file.
+    
+    PNG, JPEG, GIF and BMP files are measured from their headers without
+    decoding the image; other formats fall back to Pillow. Results are
+    cached per file path, modification time and size.
+    
+    Args:
+        image_path (str): Path to the image file.
+        
+    Returns:
+        tuple: (width, height, (horz_dpi, vert_dpi)), or None if the file
+            doesn't exist or can't be read. DPI defaults to 72 when the file
+            doesn't record a usable value, matching python-pptx.
+    """
     try:
-        from PIL import Image
+        stat = os.stat(image_path)
+    except OSError:
+        logger.warning(f"Image file not found: {image_path}")
+        return None
+    
+    return _probe_image_cached(os.path.abspath(image_path), stat.st_mtime_ns, stat.st_size)
+
+@functools.lru_cache(maxsize=1024)
+def _probe_image_cached(image_path, mtime_ns, size):
+    """
+    Probe an image file (cached on path, modification time and size).
+    """
+    try:
+        with open(image_path, 'rb') as f:
+            info = _probe_image_header(f)
+        if info is not None:
+            return info
         
-        if not os.path.exists(image_path):
-            logger.warning(f"Image file not found: {image_path}")
-            return None
+        from PIL import Image
         
         with Image.open(image_path) as img:
-            return img.size
+            return img.size[0], img.size[1], _normalize_dpi(img.info.get('dpi'))
     except Exception as e:
         logger.error(f"Error getting image dimensions: {e}")
         return None
 
+def _normalize_dpi(dpi):
+    """
+    Normalize a raw (horz, vert) DPI pair the same way python-pptx does.
+    
+    Args:
+        dpi (tuple or None): Raw DPI values.
+        
+    Returns:
+        tuple: (horz_dpi, vert_dpi) integers, 72 where a value is missing or
+            outside 1-2048.
+    """
+    def int_dpi(value):
+        try:
+            value = int(round(float(value)))
+            return value if 1 <= value <= 2048 else 72
+        except (TypeError, ValueError):
+            return 72
+    
+    if isinstance(dpi, tuple) and len(dpi) == 2:
+        return int_dpi(dpi[0]), int_dpi(dpi[1])
+    return 72, 72
+
+def _probe_image_header(f):
+    """
+    Read image size and DPI from the file header.
+    
+    Args:
+        f: Binary file object positioned at the start of the image.
+        
+    Returns:
+        tuple: (width, height, dpi), or None if the format isn't handled
+            here (or needs a full decoder to get the DPI right).
+    """
+    head = f.read(32)
+    
+    if head.startswith(b'\x89PNG\r\n\x1a\n') and head[12:16] == b'IHDR':
+        width, height = struct.unpack('>II', head[16:24])
+        return width, height, _probe_png_dpi(f)
+    
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        width, height = struct.unpack('<HH', head[6:10])
+        return width, height, (72, 72)
+    
+    if head[:2] == b'BM' and len(head) >= 26:
+        header_size = struct.unpack('<I', head[14:18])[0]
+        if header_size == 12:
+            width, height = struct.unpack('<HH', head[18:22])
+            return width, height, (72, 72)
+        
+        f.seek(18)
+        data = f.read(28)
+        if len(data) < 28:
+            return None
+        width, height = struct.unpack('<ii', data[:8])
+        ppm_x, ppm_y = struct.unpack('<ii', data[20:28])
+        return width, abs(height), _normalize_dpi((ppm_x / 39.3701, ppm_y / 39.3701))
+    
+    if head[:2] == b'\xff\xd8':
+        f.seek(2)
+        return _probe_jpeg(f)
+    
+    return None
+
+def _probe_png_dpi(f):
+    """
+    Read the DPI from a PNG pHYs chunk, scanning chunks up to the image data.
+    
+    Args:
+        f: Binary file object for a PNG file.
+        
+    Returns:
+        tuple: (horz_dpi, vert_dpi).
+    """
+    f.seek(8)
+    while True:
+        chunk_header = f.read(8)
+        if len(chunk_header) < 8:
+            return 72, 72
+        
+        length, chunk_type = struct.unpack('>I4s', chunk_header)
+        if chunk_type in (b'IDAT', b'IEND'):
+            return 72, 72
+        
+        if chunk_type == b'pHYs' and length >= 9:
+            ppu_x, ppu_y, unit = struct.unpack('>IIB', f.read(9))
+            if unit == 1:
+                return _normalize_dpi((ppu_x * 0.0254, ppu_y * 0.0254))
+            return 72, 72
+        
+        f.seek(length + 4, os.SEEK_CUR)
+
+def _probe_jpeg(f):
+    """
+    Read the size from the JPEG SOF segment and the DPI from JFIF APP0.
+    
+    Args:
+        f: Binary file object positioned just after the SOI marker.
+        
+    Returns:
+        tuple: (width, height, dpi), or None when only EXIF records the
+            resolution or the stream can't be parsed.
+    """
+    dpi = None
+    has_exif = False
+    
+    while True:
+        byte = f.read(1)
+        if not byte:
+            return None
+        if byte != b'\xff':
+            continue
+        
+        marker = f.read(1)
+        while marker == b'\xff':
+            marker = f.read(1)
+        if not marker:
+            return None
+        
+        code = marker[0]
+        if code == 0xD8 or code == 0x01 or 0xD0 <= code <= 0xD7:
+            continue
+        if code == 0xD9:
+            return None
+        
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack('>H', length_bytes)[0]
+        segment = f.read(length - 2)
+        
+        if code == 0xE0 and segment[:5] == b'JFIF\x00' and len(segment) >= 12:
+            unit, density_x, density_y = struct.unpack('>BHH', segment[7:12])
+            if unit == 1:
+                dpi = _normalize_dpi((density_x, density_y))
+            elif unit == 2:
+                dpi = _normalize_dpi((density_x * 2.54, density_y * 2.54))
+        
+        elif code == 0xE1 and segment[:6] == b'Exif\x00\x00':
+            has_exif = True
+        
+        elif code in JPEG_SOF_MARKERS and len(segment) >= 5:
+            height, width = struct.unpack('>HH', segment[1:5])
+            if dpi is None and has_exif:
+                # Pillow reads the resolution from EXIF in this case
+                return None
+            return width, height, dpi or (72, 72)
+
 def calculate_aspect_ratio(width, height, max_width=None, max_height=None):
     """
     Calculate dimensions while preserving aspect ratio.
@@ -7,11 +7,17 @@ This module provides functions for validating YAML input files.
 import os
 import yaml
 import logging
-import jsonschema
-from jsonschema import validate
+from jsonschema.validators import validator_for
+
+from src.utils import load_config_file, ConfigStream, get_variable_resolver
+from src.data_sources import normalize_source
 
 logger = logging.getLogger(__name__)
 
+# Compiled validators, built on first use and shared by every deck
+_schema_validator = None
+_slide_validator = None
+
 # Define the YAML schema
 YAML_SCHEMA = {
     "type": "object",
@@ -64,6 +70,21 @@ YAML_SCHEMA = {
                         }
                     }
                 },
+                "images": {
+                    "type": "object",
+                    "properties": {
+                        "optimize": {"type": "boolean"},
+                        "dpi": {"type": "number", "minimum": 1},
+                        "quality": {"type": "integer", "minimum": 1, "maximum": 100},
+                        "cache_dir": {"type": "string"}
+                    }
+                },
+                "charts": {
+                    "type": "object",
+                    "properties": {
+                        "workbook": {"enum": ["embedded", "minimal", "none"]}
+                    }
+                },
                 "properties": {
                     "type": "object",
                     "properties": {
@@ -100,7 +121,8 @@ YAML_SCHEMA = {
                         "type": "object",
                         "properties": {
                             "color": {"type": ["string", "array"]},
-                            "image": {"type": "string"}
+                            "image": {"type": "string"},
+                            "optimize": {"type": "boolean"}
                         }
                     },
                     "elements": {
@@ -135,6 +157,20 @@ YAML_SCHEMA = {
                                 "line_width": {"type": "number", "minimum": 0},
                                 "path": {"type": "string"},
                                 "data": {"type": ["array", "object"]},
+                                "source": {"type": ["string", "object"]},
+                                "workbook": {"enum": ["embedded", "minimal", "none"]},
+                                "downsample": {"enum": ["lttb", "minmax", "none"]},
+                                "max_points": {"type": "integer", "minimum": 3},
+                                "aggregate": {
+                                    "type": ["boolean", "object"],
+                                    "properties": {
+                                        "top": {"type": "integer", "minimum": 1},
+                                        "method": {"enum": ["sum", "mean"]},
+                                        "other_label": {"type": "string"}
+                                    }
+                                },
+                                "paginate": {"type": "boolean"},
+                                "rows_per_page": {"type": "integer", "minimum": 1},
                                 "code": {"type": "string"},
                                 "background_color": {"type": ["string", "array"]}
                             }
@@ -192,11 +228,172 @@ def validate_yaml_file(file_path):
     
     try:
         # Load YAML file
-        with open(file_path, 'r', encoding='utf-8') as f:
-            yaml_data = yaml.safe_load(f)
+        yaml_data = load_config_file(file_path)
+    
+    except yaml.YAMLError as e:
+        return {'valid': False, 'errors': [f"YAML parsing error: {str(e)}"]}
+    
+    except Exception as e:
+        return {'valid': False, 'errors': [f"Unexpected error: {str(e)}"]}
+    
+    return validate_config(yaml_data)
+
+def validate_yaml_stream(file_path):
+    """
+    Validate a YAML file one slide at a time without loading it whole.
+    
+    Args:
+        file_path (str): Path to the YAML file.
+        
+    Returns:
+        dict: A dictionary with 'valid' (bool) and 'errors' (list) keys.
+    """
+    if not os.path.exists(file_path):
+        return {'valid': False, 'errors': [f"File not found: {file_path}"]}
+    
+    try:
+        with ConfigStream(file_path) as stream:
+            leading_keys = set(stream.header)
+            errors = list(iter_schema_errors(dict(stream.header, slides=[])))
+            for i, slide in enumerate(stream.slides()):
+                errors.extend(iter_slide_errors(slide, i, stream.header.get('variables')))
+            
+            # Keys after the slides are only known once they have been read
+            trailing = {k: v for k, v in stream.header.items() if k not in leading_keys}
+            if trailing:
+                errors.extend(iter_schema_errors(dict(trailing, slides=[])))
+        
+        return {'valid': len(errors) == 0, 'errors': errors}
+    
+    except yaml.YAMLError as e:
+        return {'valid': False, 'errors': [f"YAML parsing error: {str(e)}"]}
+    
+    except Exception as e:
+        return {'valid': False, 'errors': [f"Unexpected error: {str(e)}"]}
+
+def get_schema_validator():
+    """
+    Get the compiled validator for YAML_SCHEMA.
+    
+    The schema is checked and the validator built only once per process;
+    every later call returns the same instance.
+    
+    Returns:
+        jsonschema validator instance for the full document schema.
+    """
+    global _schema_validator
+    if _schema_validator is None:
+        _schema_validator = _compile_validator(YAML_SCHEMA)
+    return _schema_validator
+
+def get_slide_validator():
+    """
+    Get the compiled validator for a single entry of the 'slides' array.
+    
+    Returns:
+        jsonschema validator instance for the slide schema.
+    """
+    global _slide_validator
+    if _slide_validator is None:
+        _slide_validator = _compile_validator(YAML_SCHEMA['properties']['slides']['items'])
+    return _slide_validator
+
+def _compile_validator(schema):
+    """
+    Check a schema and build a reusable validator for it.
+    
+    Args:
+        schema (dict): The JSON schema.
+        
+    Returns:
+        jsonschema validator instance.
+    """
+    validator_class = validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema)
+
+def _json_pointer(path):
+    """
+    Format a jsonschema error path as a JSON pointer.
+    
+    Args:
+        path (iterable): Path components (keys and indices).
+        
+    Returns:
+        str: JSON pointer such as '/slides/2/type', or '/' for the document root.
+    """
+    parts = [str(p).replace('~', '~0').replace('/', '~1') for p in path]
+    return '/' + '/'.join(parts)
+
+def _format_schema_error(error, prefix=()):
+    """
+    Format a schema validation error with its JSON pointer location.
+    
+    Args:
+        error: The jsonschema ValidationError.
+        prefix (tuple): Path components to prepend to the error path.
+        
+    Returns:
+        str: Formatted error message.
+    """
+    return f"Schema validation error at {_json_pointer(tuple(prefix) + tuple(error.absolute_path))}: {error.message}"
+
+def iter_schema_errors(yaml_data):
+    """
+    Iterate over all schema errors in a parsed configuration.
+    
+    Args:
+        yaml_data (dict): The parsed YAML data.
+        
+    Yields:
+        str: Formatted error messages with JSON pointer paths.
+    """
+    for error in get_schema_validator().iter_errors(yaml_data):
+        yield _format_schema_error(error)
+
+def iter_slide_errors(slide, index, variables=None):
+    """
+    Iterate over all schema and additional-constraint errors in one slide.
+    
+    This is the per-slide fast path: it only needs the slide itself, so
+    callers can validate slides one at a time while streaming a large deck.
+    
+    Args:
+        slide (dict): The slide data.
+        index (int): Zero-based position of the slide in the deck.
+        variables (dict, optional): The deck's variables, resolved in data
+            source paths before they are checked.
         
+    Yields:
+        str: Formatted error messages.
+    """
+    schema_errors = [
+        _format_schema_error(error, ('slides', index))
+        for error in get_slide_validator().iter_errors(slide)
+    ]
+    if schema_errors:
+        yield from schema_errors
+        return
+    
+    yield from _slide_image_errors(slide)
+    yield from _slide_source_errors(slide, variables)
+    yield from _slide_structure_errors(slide, index)
+
+def validate_config(yaml_data):
+    """
+    Validate an already parsed configuration against the schema.
+    
+    Args:
+        yaml_data (dict): The parsed YAML data.
+        
+    Returns:
+        dict: A dictionary with 'valid' (bool) and 'errors' (list) keys.
+    """
+    try:
         # Validate against schema
-        validate(instance=yaml_data, schema=YAML_SCHEMA)
+        errors = list(iter_schema_errors(yaml_data))
+        if errors:
+            return {'valid': False, 'errors': errors}
         
         # Perform additional validation
         extra_validation = validate_additional_constraints(yaml_data)
@@ -205,12 +402,6 @@ def validate_yaml_file(file_path):
         
         return {'valid': True, 'errors': []}
     
-    except yaml.YAMLError as e:
-        return {'valid': False, 'errors': [f"YAML parsing error: {str(e)}"]}
-    
-    except jsonschema.exceptions.ValidationError as e:
-        return {'valid': False, 'errors': [f"Schema validation error: {e.message}"]}
-    
     except Exception as e:
         return {'valid': False, 'errors': [f"Unexpected error: {str(e)}"]}
 
@@ -228,39 +419,114 @@ def validate_additional_constraints(yaml_data):
     
     # Check for image paths
     for slide in yaml_data.get('slides', []):
-        # Check background image path
-        if 'background' in slide and 'image' in slide['background']:
-            img_path = slide['background']['image']
-            if not os.path.exists(img_path):
-                errors.append(f"Background image not found: {img_path}")
-        
-        # Check image elements
-        for element in slide.get('elements', []):
-            if element.get('type') == 'image' and 'path' in element:
-                img_path = element['path']
-                if not os.path.exists(img_path):
-                    errors.append(f"Image not found: {img_path}")
+        errors.extend(_slide_image_errors(slide))
+    
+    # Check data source paths
+    for slide in yaml_data.get('slides', []):
+        errors.extend(_slide_source_errors(slide, yaml_data.get('variables')))
     
     # Additional slide-specific validation
     for i, slide in enumerate(yaml_data.get('slides', [])):
-        slide_type = slide.get('type', '')
+        errors.extend(_slide_structure_errors(slide, i))
+    
+    return {'valid': len(errors) == 0, 'errors': errors}
+
+def _slide_image_errors(slide):
+    """
+    Check that the images referenced by a slide exist.
+    
+    Args:
+        slide (dict): The slide data.
         
-        # Title slides should have a title
-        if slide_type == 'title' and 'title' not in slide:
-            errors.append(f"Slide {i+1}: Title slide should have a title")
+    Returns:
+        list: Error messages.
+    """
+    errors = []
+    
+    # Check background image path
+    if 'background' in slide and 'image' in slide['background']:
+        img_path = slide['background']['image']
+        if not os.path.exists(img_path):
+            errors.append(f"Background image not found: {img_path}")
+    
+    # Check image elements
+    for element in slide.get('elements', []):
+        if element.get('type') == 'image' and 'path' in element:
+            img_path = element['path']
+            if not os.path.exists(img_path):
+                errors.append(f"Image not found: {img_path}")
+    
+    return errors
+
+def _slide_source_errors(slide, variables=None):
+    """
+    Check that the data sources referenced by a slide exist and can be read.
+    
+    Args:
+        slide (dict): The slide data.
+        variables (dict, optional): The deck's variables, resolved in the
+            source before its path is checked, as they are when rendering.
         
-        # Title and content slides should have title and content
-        if slide_type == 'title_and_content':
-            if 'title' not in slide:
-                errors.append(f"Slide {i+1}: Title and content slide should have a title")
-            if 'content' not in slide:
-                errors.append(f"Slide {i+1}: Title and content slide should have content")
+    Returns:
+        list: Error messages.
+    """
+    errors = []
+    resolver = get_variable_resolver(variables) if isinstance(variables, dict) else None
+    
+    elements = list(slide.get('elements', []))
+    for key in ('content', 'left_content', 'right_content'):
+        if isinstance(slide.get(key), dict):
+            elements.append(slide[key])
+    
+    for element in elements:
+        if not isinstance(element, dict) or not element.get('source'):
+            continue
+        
+        source = element['source']
+        if resolver is not None:
+            source = resolver.resolve(source)
         
-        # Two content slides should have title and at least one content section
-        if slide_type == 'two_content':
-            if 'title' not in slide:
-                errors.append(f"Slide {i+1}: Two content slide should have a title")
-            if 'left_content' not in slide and 'right_content' not in slide:
-                errors.append(f"Slide {i+1}: Two content slide should have at least one content section")
-    
-    return {'valid': len(errors) == 0, 'errors': errors}
\ No newline at end of file
+        try:
+            spec = normalize_source(source)
+        except ValueError as e:
+            errors.append(str(e))
+            continue
+        
+        if not os.path.exists(spec['path']):
+            errors.append(f"Data source not found: {spec['path']}")
+    
+    return errors
+
+def _slide_structure_errors(slide, i):
+    """
+    Check slide-type specific requirements.
+    
+    Args:
+        slide (dict): The slide data.
+        i (int): Zero-based position of the slide in the deck.
+        
+    Returns:
+        list: Error messages.
+    """
+    errors = []
+    slide_type = slide.get('type', '')
+    
+    # Title slides should have a title
+    if slide_type == 'title' and 'title' not in slide:
+        errors.append(f"Slide {i+1}: Title slide should have a title")
+    
+    # Title and content slides should have title and content
+    if slide_type == 'title_and_content':
+        if 'title' not in slide:
+            errors.append(f"Slide {i+1}: Title and content slide should have a title")
+        if 'content' not in slide:
+            errors.append(f"Slide {i+1}: Title and content slide should have content")
+    
+    # Two content slides should have title and at least one content section
+    if slide_type == 'two_content':
+        if 'title' not in slide:
+            errors.append(f"Slide {i+1}: Two content slide should have a title")
+        if 'left_content' not in slide and 'right_content' not in slide:
+            errors.append(f"Slide {i+1}: Two content slide should have at least one content section")
+    
+    return errors
@@ -0,0 +1,308 @@
+"""
+Watcher Module
+
+This module waits for files to change, for watch mode. On Linux it uses
+inotify through ctypes, watching the directories that hold the files so
+that editors which save by writing a new file and renaming it over the
+old one are noticed too. Elsewhere, or if inotify is unavailable, it
+falls back to polling the files' size and modification time. Bursts of
+events, such as an editor writing a file in several steps, are debounced
+into a single rebuild.
+"""
+
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Quiet time after the last change before a rebuild starts, in seconds
+DEFAULT_DEBOUNCE = 0.05
+
+# Interval between checks of the polling watcher, in seconds
+DEFAULT_POLL_INTERVAL = 0.1
+
+# inotify flags (see inotify(7))
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+)
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+class PollingWatcher:
+    """
+    Detects changes by comparing the size and mtime of files.
+    """
+    
+    def __init__(self, interval=DEFAULT_POLL_INTERVAL):
+        """
+        Initialize the watcher.
+        
+        Args:
+            interval (float): Seconds between checks.
+        """
+        self.interval = interval
+        self._stats = {}
+    
+    def set_paths(self, paths):
+        """
+        Replace the set of watched files.
+        
+        Args:
+            paths (iterable): File paths.
+        """
+        # Files that were already watched keep their last seen state, so a
+        # change made while a build was running is still picked up
+        self._stats = {
+            path: self._stats[path] if path in self._stats else self._stat(path)
+            for path in {os.path.abspath(p) for p in paths}
+        }
+    
+    def wait(self, timeout=None):
+        """
+        Wait for watched files to change.
+        
+        Args:
+            timeout (float, optional): Maximum seconds to wait.
+        
+        Returns:
+            set: The paths that changed; empty if the timeout expired.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        
+        while True:
+            changed = set()
+            for path, previous in self._stats.items():
+                current = self._stat(path)
+                if current != previous:
+                    self._stats[path] = current
+                    changed.add(path)
+            
+            if changed:
+                return changed
+            
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return changed
+                time.sleep(min(self.interval, remaining))
+            else:
+                time.sleep(self.interval)
+    
+    def close(self):
+        """
+        Release the watcher's resources.
+        """
+        self._stats = {}
+    
+    @staticmethod
+    def _stat(path):
+        """
+        Get the part of a file's status that changes when it is written.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+class InotifyWatcher:
+    """
+    Detects changes with Linux inotify, watching the files' directories.
+    """
+    
+    def __init__(self):
+        """
+        Initialize the watcher.
+        
+        Raises:
+            OSError: If inotify is not available.
+        """
+        libc_name = ctypes.util.find_library('c')
+        if not sys.platform.startswith('linux') or not libc_name:
+            raise OSError(errno.ENOSYS, "inotify is not available on this platform")
+        
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._libc.inotify_add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._libc.inotify_rm_watch.argtypes = (ctypes.c_int, ctypes.c_int)
+        
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        
+        # directory -> watch descriptor, and back
+        self._watches = {}
+        self._directories = {}
+        # directory -> names of watched files in it
+        self._files = {}
+    
+    def set_paths(self, paths):
+        """
+        Replace the set of watched files.
+        
+        Args:
+            paths (iterable): File paths.
+        """
+        files = {}
+        for path in {os.path.abspath(p) for p in paths}:
+            directory, name = os.path.split(path)
+            files.setdefault(directory, set()).add(name)
+        
+        for directory in set(self._watches) - set(files):
+            wd = self._watches.pop(directory)
+            self._directories.pop(wd, None)
+            self._libc.inotify_rm_watch(self._fd, wd)
+        
+        for directory in set(files) - set(self._watches):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                logger.warning(f"Cannot watch {directory}: {os.strerror(error)}")
+                continue
+            self._watches[directory] = wd
+            self._directories[wd] = directory
+        
+        self._files = files
+    
+    def wait(self, timeout=None):
+        """
+        Wait for watched files to change.
+        
+        Args:
+            timeout (float, optional): Maximum seconds to wait.
+        
+        Returns:
+            set: The paths that changed; empty if the timeout expired.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            readable, _, _ = select.select([self._fd], [], [], remaining)
+            if not readable:
+                return set()
+            
+            changed = self._read_events()
+            if changed:
+                return changed
+    
+    def _read_events(self):
+        """
+        Read pending events and map them to watched files.
+        
+        Returns:
+            set: The watched paths the events refer to.
+        """
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        
+        changed = set()
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            
+            if mask & IN_Q_OVERFLOW:
+                # Events were lost, so treat every file as changed
+                return {os.path.join(d, n) for d, names in self._files.items() for n in names}
+            
+            directory = self._directories.get(wd)
+            if directory is None:
+                continue
+            
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                changed.update(os.path.join(directory, n) for n in self._files.get(directory, ()))
+            elif name in self._files.get(directory, ()):
+                changed.add(os.path.join(directory, name))
+        
+        return changed
+    
+    def close(self):
+        """
+        Release the inotify file descriptor.
+        """
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+def create_watcher(polling=False, poll_interval=DEFAULT_POLL_INTERVAL):
+    """
+    Create the best available watcher.
+    
+    Args:
+        polling (bool): Use the polling watcher even if inotify is available.
+        poll_interval (float): Seconds between checks of the polling watcher.
+    
+    Returns:
+        InotifyWatcher or PollingWatcher: The watcher.
+    """
+    if not polling:
+        try:
+            return InotifyWatcher()
+        except (OSError, AttributeError) as e:
+            logger.debug(f"inotify unavailable ({e}), polling for changes")
+    
+    return PollingWatcher(poll_interval)
+
+def watch(build, watcher=None, debounce=DEFAULT_DEBOUNCE):
+    """
+    Run a build, then run it again whenever one of its files changes.
+    
+    Runs until interrupted with Ctrl+C.
+    
+    Args:
+        build (callable): Builds once and returns the paths to watch for
+            the next build.
+        watcher (optional): Watcher to use; create_watcher() by default.
+        debounce (float): Seconds without further changes to wait for
+            before rebuilding.
+    """
+    watcher = watcher or create_watcher()
+    
+    try:
+        watcher.set_paths(build())
+        
+        while True:
+            changed = watcher.wait()
+            
+            # Let a burst of writes settle before rebuilding
+            while True:
+                more = watcher.wait(debounce)
+                if not more:
+                    break
+                changed |= more
+            
+            logger.info(f"Changed: {', '.join(sorted(os.path.relpath(p) for p in changed))}")
+            watcher.set_paths(build())
+    
+    except KeyboardInterrupt:
+        logger.info("Stopped watching")
+    
+    finally:
+        watcher.close()